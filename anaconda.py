@@ -199,6 +199,10 @@ if __name__ == "__main__":
     anaconda_logging.init(write_to_journal=conf.target.is_hardware)
     anaconda_logging.logger.setupVirtio(opts.virtiolog)
 
+    # Start a new trace of the installation tasks.
+    from pyanaconda.core.tracing import tracer
+    tracer.enable(process_name="anaconda", truncate=True)
+
     # Load the remaining configuration after a logging is set up.
     if opts.profile_id:
         conf.set_from_profile(
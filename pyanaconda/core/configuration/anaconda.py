@@ -51,6 +51,19 @@ class AnacondaSection(Section):
         """Run Anaconda in the debugging mode."""
         return self._get_option("debug", bool)
 
+    @property
+    def resource_sampling_interval(self):
+        """Interval of sampling the resource usage in seconds.
+
+        The value 0 disables the sampling.
+        """
+        value = self._get_option("resource_sampling_interval", float)
+
+        if value < 0:
+            raise ValueError("Invalid value: {}".format(value))
+
+        return value
+
     @property
     def activatable_modules(self):
         """List of Anaconda DBus modules that can be activated.
@@ -364,6 +377,10 @@ class AnacondaConfiguration(Configuration):
         if opts.debug:
             self.anaconda._set_option("debug", True)
 
+            # Sample the resource usage in the debugging mode.
+            if not self.anaconda.resource_sampling_interval:
+                self.anaconda._set_option("resource_sampling_interval", 1)
+
         # Set "nosave flags".
         if "can_copy_input_kickstart" in opts:
             self.target._set_option("can_copy_input_kickstart", opts.can_copy_input_kickstart)
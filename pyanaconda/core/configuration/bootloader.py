@@ -71,3 +71,21 @@ class BootloaderSection(Section):
         :return: a list of kernel arguments
         """
         return self._get_option("preserved_arguments", str).split()
+
+    @property
+    def initramfs_max_workers(self):
+        """Maximal number of kernels whose initramfs images are created at the same time.
+
+        It applies only if dracut is called directly, not through
+        new-kernel-pkg. The value 0 chooses the number by the number of CPUs and
+        the available memory. The value 1 creates the images one
+        after another.
+
+        :return: a number of workers
+        """
+        value = self._get_option("initramfs_max_workers", int)
+
+        if value < 0:
+            raise ValueError("Invalid value: {}".format(value))
+
+        return value
@@ -17,8 +17,11 @@
 #
 #  Author(s):  Vendula Poncova <vponcova@redhat.com>
 #
+from blivet.size import Size
+
 from pyanaconda.core.configuration.base import Section
-from pyanaconda.core.constants import SOURCE_TYPE_CLOSEST_MIRROR, SOURCE_TYPE_CDN
+from pyanaconda.core.constants import SOURCE_TYPE_CLOSEST_MIRROR, SOURCE_TYPE_CDN, \
+    IMAGE_COPIER_RSYNC, IMAGE_COPIER_NATIVE
 
 
 class PayloadSection(Section):
@@ -120,3 +123,97 @@ class PayloadSection(Section):
     def default_rpm_gpg_keys(self):
         """List of GPG keys to import into RPM database at end of installation."""
         return self._get_option("default_rpm_gpg_keys", str).split()
+
+    @property
+    def prefetch_packages(self):
+        """Start to download packages at the beginning of the installation.
+
+        The resolved packages are downloaded in the background while
+        the storage is configured. Only locations outside of the target
+        system are used for the download, for example /var/tmp. The
+        remaining packages are downloaded during the payload installation.
+        """
+        return self._get_option("prefetch_packages", bool)
+
+    @property
+    def stream_live_tarball(self):
+        """Extract remote tarballs of the liveimg payload during the download.
+
+        The tarball is not stored on the disk. It is passed to the tar
+        command straight from the network and its checksum is verified
+        after the extraction. The installation fails if the download
+        is interrupted.
+        """
+        return self._get_option("stream_live_tarball", bool)
+
+    @property
+    def block_copy_live_image(self):
+        """Deploy live images at the block level if possible.
+
+        The root file system image of the Live OS or liveimg payload
+        is written to the root device and grown to its size. It is
+        possible only if the image has an ext file system, the root
+        has an ext file system, it is empty and there are
+        no other file systems mounted in the target system. Otherwise,
+        the content of the image is copied file by file.
+        """
+        return self._get_option("block_copy_live_image", bool)
+
+    @property
+    def live_image_copier(self):
+        """Copier of the content of live images.
+
+        Valid values:
+
+        RSYNC   Copy the content with rsync.
+        NATIVE  Copy the content in parallel by the installer itself.
+                Use rsync if the copying fails.
+        """
+        value = self._get_option("live_image_copier", str)
+
+        if value not in (IMAGE_COPIER_RSYNC, IMAGE_COPIER_NATIVE):
+            raise ValueError("Invalid value: {}".format(value))
+
+        return value
+
+    @property
+    def download_cache(self):
+        """Path or URL of a shared cache of downloaded packages and images.
+
+        Downloaded files are stored under their checksums and reused by
+        other installations. Packages are identified by checksums from
+        the repository metadata, images by the checksums specified in
+        the kickstart file. Cached files are verified the same way as
+        downloaded files.
+
+        A local directory, for example on a shared NFS or a cache
+        partition, is updated with verified downloads. A HTTP or HTTPS
+        URL is used as a read-only cache. A local cache can be served
+        to other machines with:
+
+            python3 -m pyanaconda.modules.payloads.base.download_cache PATH
+
+        The cache is disabled if no path is specified.
+        """
+        return self._get_option("download_cache", str)
+
+    @property
+    def metadata_cache_dir(self):
+        """Path to a persistent cache of repository metadata.
+
+        Downloaded metadata of repositories are stored in this directory
+        and reused whenever a repository provides the same repomd.xml file,
+        even after a restart of the installer. The directory can be placed
+        on a local disk or an image. The cache is disabled if no path is
+        specified.
+        """
+        return self._get_option("metadata_cache_dir", str)
+
+    @property
+    def metadata_cache_size(self):
+        """Maximal size of the persistent cache of repository metadata.
+
+        The least recently used metadata are removed from the cache
+        if the cache is bigger.
+        """
+        return self._get_option("metadata_cache_size", Size)
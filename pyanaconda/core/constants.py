@@ -113,8 +113,8 @@ THREAD_STORAGE_WATCHER = "AnaStorageWatcher"
 THREAD_WAIT_FOR_CONNECTING_NM = "AnaWaitForConnectingNMThread"
 THREAD_PAYLOAD = "AnaPayloadThread"
 THREAD_PAYLOAD_RESTART = "AnaPayloadRestartThread"
+THREAD_PAYLOAD_PREFETCH = "AnaPayloadPrefetchThread"
 THREAD_EXCEPTION_HANDLING_TEST = "AnaExceptionHandlingTest"
-THREAD_LIVE_PROGRESS = "AnaLiveProgressThread"
 THREAD_SOFTWARE_WATCHER = "AnaSoftwareWatcher"
 THREAD_CHECK_SOFTWARE = "AnaCheckSoftwareThread"
 THREAD_SOURCE_WATCHER = "AnaSourceWatcher"
@@ -125,6 +125,7 @@ THREAD_KEYBOARD_INIT = "AnaKeyboardThread"
 THREAD_ADD_LAYOUTS_INIT = "AnaAddLayoutsInitThread"
 THREAD_NTP_SERVER_CHECK = "AnaNTPserver"
 THREAD_DBUS_TASK = "AnaTaskThread"
+THREAD_RESOURCE_SAMPLER = "AnaResourceSamplerThread"
 THREAD_SUBSCRIPTION = "AnaSubscriptionThread"
 THREAD_SUBSCRIPTION_SPOKE_INIT = "AnaSubscriptionSpokeInitThread"
 
@@ -428,6 +429,10 @@ SOURCE_REPO_FILE_TYPES = (
     SOURCE_TYPE_CDN,
 )
 
+# Copiers of live images.
+IMAGE_COPIER_RSYNC = "RSYNC"
+IMAGE_COPIER_NATIVE = "NATIVE"
+
 # Payload sources overriden by the CDN
 
 # This set lists sources the Red Hat CDN should automatically
@@ -0,0 +1,422 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import json
+import os
+import threading
+import time
+
+from collections import namedtuple
+
+from pyanaconda.core.constants import THREAD_RESOURCE_SAMPLER
+from pyanaconda.anaconda_loggers import get_module_logger
+
+log = get_module_logger(__name__)
+
+__all__ = ["RESOURCE_SAMPLES_PATH", "RESOURCE_REPORT_PATH", "ResourceSampler",
+           "resource_sampler", "get_process_group"]
+
+# The files with the samples and the report.
+RESOURCE_SAMPLES_PATH = "/tmp/resources.log"
+RESOURCE_REPORT_PATH = "/tmp/resources-report.log"
+
+# The group of the main Anaconda process.
+ANACONDA_GROUP = "anaconda"
+
+# The prefixes of Anaconda DBus modules and add-ons.
+MODULES_PREFIX = "pyanaconda.modules."
+ADDONS_PREFIX = "org_"
+
+# The phase before the first installation queue.
+INITIAL_PHASE = "Setup"
+
+ProcessStat = namedtuple("ProcessStat", ["ppid", "cpu_ticks", "start_time", "rss_pages"])
+
+
+def get_process_group(cmdline):
+    """Get the group of a process with the given command line.
+
+    The main Anaconda process is in the anaconda group. DBus modules
+    run as "python3 -m <module>" and they are in the groups named by
+    the module. Add-ons are named by their full Python module.
+
+    :param cmdline: a list of arguments of the process
+    :return: a name of the group or None
+    """
+    for arg in cmdline[:2]:
+        if os.path.basename(arg) == "anaconda":
+            return ANACONDA_GROUP
+
+    for option, value in zip(cmdline, cmdline[1:]):
+        if option != "-m":
+            continue
+
+        if value.startswith(MODULES_PREFIX):
+            return value[len(MODULES_PREFIX):]
+
+        if value.startswith(ADDONS_PREFIX):
+            return value
+
+    return None
+
+
+class ProcReader(object):
+    """Reader of the process information in /proc.
+
+    The files are read directly, so there is no process
+    started for a sample.
+    """
+
+    def __init__(self, proc_root="/proc"):
+        self._proc_root = proc_root
+
+    def _read(self, *path):
+        """Read a file in /proc."""
+        with open(os.path.join(self._proc_root, *path), "rb") as f:
+            return f.read().decode("utf-8", "replace")
+
+    def get_pids(self):
+        """Get the running processes."""
+        return [int(name) for name in os.listdir(self._proc_root) if name.isdigit()]
+
+    def get_stat(self, pid):
+        """Get the status of the process.
+
+        :return: an instance of ProcessStat
+        """
+        content = self._read(str(pid), "stat")
+
+        # The name of the command can contain spaces and brackets.
+        fields = content[content.rindex(")") + 2:].split()
+
+        return ProcessStat(
+            ppid=int(fields[1]),
+            cpu_ticks=int(fields[11]) + int(fields[12]),
+            start_time=int(fields[19]),
+            rss_pages=int(fields[21]),
+        )
+
+    def get_cmdline(self, pid):
+        """Get the command line of the process."""
+        return self._read(str(pid), "cmdline").split("\0")
+
+    def get_io(self, pid):
+        """Get the read and written bytes of the process.
+
+        :return: a tuple of read and written bytes
+        """
+        values = dict(
+            line.split(": ", 1) for line in self._read(str(pid), "io").splitlines()
+        )
+        return int(values["read_bytes"]), int(values["write_bytes"])
+
+    def get_memory(self):
+        """Get the available memory and the used swap in kB."""
+        values = {}
+
+        for line in self._read("meminfo").splitlines():
+            name, value = line.split(":", 1)
+            values[name] = int(value.split()[0])
+
+        return (
+            values.get("MemAvailable", 0),
+            values.get("SwapTotal", 0) - values.get("SwapFree", 0)
+        )
+
+    def get_pressure(self, resource):
+        """Get the pressure stall information of a resource.
+
+        :param resource: cpu, memory or io
+        :return: a percentage of time in the last 10 seconds or None
+        """
+        try:
+            content = self._read("pressure", resource)
+        except OSError:
+            return None
+
+        for line in content.splitlines():
+            if line.startswith("some "):
+                values = dict(item.split("=") for item in line.split()[1:])
+                return float(values["avg10"])
+
+        return None
+
+
+class ResourceSampler(object):
+    """Sampler of the resource usage of the installer.
+
+    The sampler reads the memory, CPU and I/O usage of the main
+    Anaconda process, every DBus module and their child processes,
+    and the pressure stall information of the system. The usage of
+    child processes is added to the group of their module. Every
+    sample is tagged with the current installation phase and the
+    running installation tasks.
+
+    The samples are written to a file as JSON lines. A report with
+    the peak memory usage of every group and phase is created at
+    the end.
+    """
+
+    def __init__(self, proc_root="/proc"):
+        self._reader = ProcReader(proc_root)
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._clock_ticks = os.sysconf("SC_CLK_TCK")
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._samples_file = None
+        self._phase = INITIAL_PHASE
+        self._tasks = []
+        self._process_groups = {}
+        self._process_usage = {}
+        self._last_time = None
+        self._peaks = {}
+        self._min_available_memory = None
+        self._max_pressure = {}
+
+    @property
+    def is_running(self):
+        """Is the sampler running?"""
+        return self._thread is not None
+
+    def set_phase(self, name):
+        """Set the current installation phase."""
+        with self._lock:
+            self._phase = name
+
+    def start_task(self, name):
+        """Add a running installation task."""
+        with self._lock:
+            self._tasks.append(name)
+
+    def finish_task(self, name):
+        """Remove a finished installation task."""
+        with self._lock:
+            if name in self._tasks:
+                self._tasks.remove(name)
+
+    def start(self, interval, samples_path=RESOURCE_SAMPLES_PATH):
+        """Start to sample in a separate thread.
+
+        :param float interval: a number of seconds between samples
+        :param str samples_path: a path to the file with samples
+        """
+        if self.is_running:
+            return
+
+        log.debug("Sampling the resource usage every %s seconds.", interval)
+        self._samples_file = open(samples_path, "w")
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            name=THREAD_RESOURCE_SAMPLER,
+            target=self._run,
+            args=(interval, ),
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sampling."""
+        if not self.is_running:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._samples_file.close()
+        self._samples_file = None
+
+    def _run(self, interval):
+        """Sample until the sampler is stopped."""
+        while not self._stop_event.is_set():
+            try:
+                sample = self.sample()
+                self._samples_file.write(json.dumps(sample) + "\n")
+                self._samples_file.flush()
+            except Exception as e:  # pylint: disable=broad-except
+                log.error("Failed to sample the resource usage: %s", e)
+
+            self._stop_event.wait(interval)
+
+    def sample(self):
+        """Take a sample of the resource usage.
+
+        :return: a dictionary with the sample
+        """
+        now = time.monotonic()
+        stats = {}
+
+        for pid in self._reader.get_pids():
+            try:
+                stats[pid] = self._reader.get_stat(pid)
+            except (OSError, ValueError, IndexError):
+                # The process has already finished.
+                continue
+
+        groups = {}
+        usage = {}
+
+        for pid, stat in stats.items():
+            group = self._get_group(pid, stats)
+
+            if not group:
+                continue
+
+            try:
+                read_bytes, write_bytes = self._reader.get_io(pid)
+            except (OSError, ValueError, KeyError):
+                read_bytes, write_bytes = 0, 0
+
+            key = (pid, stat.start_time)
+            usage[key] = (stat.cpu_ticks, read_bytes, write_bytes)
+            previous = self._process_usage.get(key, (0, 0, 0))
+            values = groups.setdefault(group, {"rss": 0, "cpu": 0, "read": 0, "write": 0})
+            values["rss"] += stat.rss_pages * self._page_size // 1024
+
+            # Count only the usage since the last sample.
+            if self._last_time is not None:
+                values["cpu"] += stat.cpu_ticks - previous[0]
+                values["read"] += (read_bytes - previous[1]) // 1024
+                values["write"] += (write_bytes - previous[2]) // 1024
+
+        # Convert the CPU ticks to a percentage of one CPU.
+        elapsed = now - self._last_time if self._last_time is not None else 0
+
+        for values in groups.values():
+            values["cpu"] = round(
+                100 * values["cpu"] / self._clock_ticks / elapsed if elapsed else 0, 1
+            )
+
+        self._process_usage = usage
+        self._last_time = now
+        self._process_groups = {
+            key: value for key, value in self._process_groups.items()
+            if key[0] in stats and stats[key[0]].start_time == key[1]
+        }
+
+        available_memory, used_swap = self._reader.get_memory()
+
+        with self._lock:
+            sample = {
+                "time": round(now, 3),
+                "phase": self._phase,
+                "tasks": list(self._tasks),
+                "available_memory": available_memory,
+                "used_swap": used_swap,
+                "pressure": {
+                    resource: self._reader.get_pressure(resource)
+                    for resource in ("cpu", "memory", "io")
+                },
+                "groups": groups,
+            }
+
+            self._update_peaks(sample)
+
+        return sample
+
+    def _get_group(self, pid, stats):
+        """Get the group of the process and its parents.
+
+        The groups of processes are cached. The process
+        is identified by its pid and start time.
+        """
+        key = (pid, stats[pid].start_time)
+
+        if key not in self._process_groups:
+            try:
+                group = get_process_group(self._reader.get_cmdline(pid))
+            except OSError:
+                group = None
+
+            ppid = stats[pid].ppid
+
+            if not group and ppid in stats and ppid != pid:
+                group = self._get_group(ppid, stats)
+
+            self._process_groups[key] = group
+
+        return self._process_groups[key]
+
+    def _update_peaks(self, sample):
+        """Update the peak values with the sample."""
+        for group, values in sample["groups"].items():
+            key = (group, sample["phase"])
+            self._peaks[key] = max(self._peaks.get(key, 0), values["rss"])
+
+        if self._min_available_memory is None \
+                or sample["available_memory"] < self._min_available_memory:
+            self._min_available_memory = sample["available_memory"]
+
+        for resource, value in sample["pressure"].items():
+            if value is not None:
+                self._max_pressure[resource] = max(self._max_pressure.get(resource, 0), value)
+
+    def get_report(self):
+        """Get a report of the peak resource usage.
+
+        :return: a string with the report
+        """
+        with self._lock:
+            peaks = dict(self._peaks)
+            min_available_memory = self._min_available_memory
+            max_pressure = dict(self._max_pressure)
+
+        if not peaks:
+            return "No resource usage was sampled."
+
+        groups = sorted({group for group, phase in peaks})
+        phases = list(dict.fromkeys(phase for group, phase in peaks))
+        lines = ["Peak RSS per module (MiB):"]
+
+        for group in groups:
+            group_peaks = [(peaks[(group, p)], p) for p in phases if (group, p) in peaks]
+            rss, phase = max(group_peaks)
+            lines.append("  {}: {} (in {})".format(group, rss // 1024, phase))
+
+        lines.append("Peak RSS per phase (MiB):")
+
+        for phase in phases:
+            values = [(g, peaks[(g, phase)]) for g in groups if (g, phase) in peaks]
+            total = sum(rss for _group, rss in values)
+            lines.append("  {}: {} total, {}".format(
+                phase, total // 1024, ", ".join(
+                    "{} {}".format(g, rss // 1024) for g, rss in values
+                )
+            ))
+
+        lines.append("Minimal available memory: {} MiB".format(min_available_memory // 1024))
+
+        if max_pressure:
+            lines.append("Maximal pressure in 10 seconds: {}".format(", ".join(
+                "{} {}%".format(r, v) for r, v in sorted(max_pressure.items())
+            )))
+
+        return "\n".join(lines)
+
+    def write_report(self, path=RESOURCE_REPORT_PATH):
+        """Write the report to a file and to the log.
+
+        :param str path: a path to the report
+        """
+        report = self.get_report()
+        log.info("Resource usage report:\n%s", report)
+
+        with open(path, "w") as f:
+            f.write(report + "\n")
+
+
+resource_sampler = ResourceSampler()
@@ -0,0 +1,184 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import fcntl
+import json
+import os
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+
+from pyanaconda.anaconda_loggers import get_module_logger
+
+log = get_module_logger(__name__)
+
+__all__ = ["TRACE_FILE_PATH", "Tracer", "tracer"]
+
+# The trace file shared by all Anaconda processes.
+TRACE_FILE_PATH = "/tmp/anaconda-trace.json"
+
+# Outcomes of traced spans.
+TRACE_OUTCOME_SUCCEEDED = "succeeded"
+TRACE_OUTCOME_FAILED = "failed"
+
+
+class Tracer(object):
+    """Tracer of installation tasks.
+
+    The tracer records spans of time in the Chrome trace format, so
+    the trace can be opened in Perfetto or chrome://tracing. All
+    processes append events to the same file. The closing bracket
+    of the JSON array is never written, which is allowed by the
+    format. Timestamps come from the monotonic clock, so they are
+    comparable between processes.
+
+    The tracer does nothing until it is enabled.
+    """
+
+    def __init__(self):
+        self._path = None
+        self._fd = None
+        self._lock = threading.Lock()
+        self._named_threads = set()
+
+    @property
+    def enabled(self):
+        """Is the tracer enabled?"""
+        return self._path is not None
+
+    def enable(self, path=TRACE_FILE_PATH, process_name=None, truncate=False):
+        """Enable the tracer.
+
+        :param str path: a path to the trace file
+        :param str process_name: a name of the current process
+        :param bool truncate: should the tracer start a new trace?
+        """
+        self.disable()
+
+        with self._lock:
+            self._path = path
+            self._named_threads = set()
+
+            if truncate:
+                try:
+                    os.truncate(path, 0)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    log.debug("Failed to truncate the trace file: %s", e)
+
+        self._write_metadata(
+            "process_name",
+            {"name": process_name or os.path.basename(sys.argv[0])},
+        )
+
+    def disable(self):
+        """Disable the tracer."""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+
+            self._path = None
+            self._fd = None
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """Trace the span of the code block.
+
+        The outcome of the span is recorded in the arguments.
+        Errors are recorded and raised again.
+
+        :param str name: a name of the span
+        :param str category: a category of the span
+        :param args: additional arguments of the span
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = self._get_timestamp()
+        args["outcome"] = TRACE_OUTCOME_SUCCEEDED
+
+        try:
+            yield
+        except BaseException as e:
+            args["outcome"] = TRACE_OUTCOME_FAILED
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self._write_event({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": self._get_timestamp() - start,
+                "args": args,
+            })
+
+    @staticmethod
+    def _get_timestamp():
+        """Get the current timestamp in microseconds."""
+        return time.monotonic_ns() // 1000
+
+    def _write_metadata(self, name, args):
+        """Write a metadata event."""
+        self._write_event({"name": name, "ph": "M", "args": args})
+
+    def _write_event(self, event):
+        """Write an event of the current process and thread."""
+        event["pid"] = os.getpid()
+        event["tid"] = threading.get_native_id()
+
+        with self._lock:
+            is_new_thread = event["tid"] not in self._named_threads
+            self._named_threads.add(event["tid"])
+
+        if is_new_thread:
+            self._write_metadata("thread_name", {"name": threading.current_thread().name})
+
+        try:
+            self._write(json.dumps(event) + ",\n")
+        except (OSError, TypeError, ValueError) as e:
+            log.debug("Failed to write a trace event: %s", e)
+
+    def _write(self, data):
+        """Append data to the trace file.
+
+        The file is locked, so the events of different
+        processes don't mix. The first writer starts the array.
+        """
+        with self._lock:
+            if self._path is None:
+                return
+
+            if self._fd is None:
+                self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+            try:
+                if not os.fstat(self._fd).st_size:
+                    data = "[\n" + data
+
+                os.write(self._fd, data.encode("utf-8"))
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+tracer = Tracer()
@@ -18,8 +18,10 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import codecs
 import os
 import os.path
+import selectors
 import subprocess
 # Used for ascii_lowercase, ascii_uppercase constants
 import tempfile
@@ -52,6 +54,9 @@ from pykickstart.constants import KS_SCRIPT_ONERROR
 
 _child_env = {}
 
+# The size of chunks of the program output.
+PROGRAM_OUTPUT_CHUNK_SIZE = 64 * 1024
+
 
 def setenv(name, value):
     """ Set an environment variable to be used by child processes.
@@ -252,12 +257,130 @@ def startX(argv, output_redirect=None, timeout=X_TIMEOUT):
             raise TimeoutError("Timeout trying to start %s" % argv[0])
 
 
+class _ProgramOutput(object):
+    """Output stream of a running program.
+
+    The output is processed in chunks as it comes, so the memory usage
+    doesn't depend on the size of the output. Complete lines are logged
+    and passed to the callback. Only the captured output is kept.
+    """
+
+    def __init__(self, binary_output=False, log_output=True, capture_output=True,
+                 stdout=None, output_callback=None):
+        """Create a new output stream.
+
+        Only the captured text output has to be valid UTF-8. Otherwise,
+        invalid characters are replaced.
+
+        :param binary_output: whether to treat the output as binary data
+        :param log_output: whether to log the output
+        :param capture_output: whether to keep the output
+        :param stdout: Optional file object to write the output to.
+        :param output_callback: a function called with every line or None
+        """
+        self._binary_output = binary_output
+        self._log_output = log_output
+        self._stdout = stdout
+        self._output_callback = output_callback
+        self._decoder = codecs.getincrementaldecoder("utf-8")(
+            "strict" if capture_output and not binary_output else "replace"
+        )
+        self._decode_error = None
+        self._chunks = [] if capture_output else None
+        self._line = ""
+        self._ends_with_newline = True
+
+    def feed(self, data):
+        """Process the next chunk of the output.
+
+        :param data: a chunk of bytes or an empty chunk at the end
+        """
+        text = self._decode(data, final=not data)
+
+        if self._binary_output:
+            self._write(data)
+        else:
+            self._write(text)
+
+        self._process_lines(text, final=not data)
+
+    def _decode(self, data, final=False):
+        """Decode the chunk.
+
+        Decoding errors of the text output are raised at the end,
+        so the program is not left with a full pipe.
+        """
+        try:
+            return self._decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            self._decode_error = self._decode_error or e
+            self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+            return self._decoder.decode(data, final)
+
+    def _write(self, output):
+        """Write the output to the file and keep it."""
+        if not output:
+            return
+
+        self._ends_with_newline = output[-1:] in ("\n", b"\n")
+
+        if self._stdout:
+            self._stdout.write(output)
+
+        if self._chunks is not None:
+            self._chunks.append(output)
+
+    def _process_lines(self, text, final=False):
+        """Log complete lines and pass them to the callback."""
+        lines = (self._line + text).splitlines(True)
+        self._line = ""
+
+        # Keep the incomplete line if it is not too long.
+        if lines and not final and not lines[-1].endswith(("\n", "\r")) \
+                and len(lines[-1]) < PROGRAM_OUTPUT_CHUNK_SIZE:
+            self._line = lines.pop()
+
+        if self._log_output and lines:
+            with program_log_lock:
+                for line in lines:
+                    program_log.info(line.strip())
+
+        if self._output_callback:
+            for line in lines:
+                self._output_callback(line.strip())
+
+    def finish(self):
+        """Finish the output.
+
+        :return: the captured output or None
+        :raise: UnicodeDecodeError if the text output can't be decoded
+        """
+        self.feed(b"")
+
+        if self._decode_error:
+            raise self._decode_error
+
+        # The text output always ends with a newline.
+        if not self._binary_output and not self._ends_with_newline:
+            self._write("\n")
+
+        if self._chunks is None:
+            return None
+
+        return (b"" if self._binary_output else "").join(self._chunks)
+
+
 def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_output=True,
-                 binary_output=False, filter_stderr=False):
+                 binary_output=False, filter_stderr=False, capture_output=True,
+                 output_callback=None):
     """ Run an external program, log the output and return it to the caller
 
-        NOTE/WARNING: UnicodeDecodeError will be raised if the output of the of the
-                      external command can't be decoded as UTF-8.
+        The output is processed while the program runs, so the program log
+        and the output file are updated continuously. The output is kept in
+        the memory only if it should be captured.
+
+        NOTE/WARNING: UnicodeDecodeError will be raised if the captured output of
+                      the external command can't be decoded as UTF-8.
 
         :param argv: The command to run and argument
         :param root: The directory to chroot to before running command.
@@ -267,7 +390,9 @@ def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_ou
         :param log_output: whether to log the output of command
         :param binary_output: whether to treat the output of command as binary data
         :param filter_stderr: whether to exclude the contents of stderr from the returned output
-        :return: The return code of the command and the output
+        :param capture_output: whether to return the output
+        :param output_callback: a function called with every line of the output or None
+        :return: The return code of the command and the output or None
     """
     try:
         if filter_stderr:
@@ -278,38 +403,35 @@ def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_ou
         proc = startProgram(argv, root=root, stdin=stdin, stdout=subprocess.PIPE, stderr=stderr,
                             env_prune=env_prune)
 
-        (output_string, err_string) = proc.communicate()
-        if not binary_output:
-            output_string = output_string.decode("utf-8")
-            if output_string and output_string[-1] != "\n":
-                output_string = output_string + "\n"
+        output = _ProgramOutput(
+            binary_output=binary_output,
+            log_output=log_output,
+            capture_output=capture_output,
+            stdout=stdout,
+            output_callback=output_callback
+        )
+        streams = {proc.stdout: output}
 
-        if log_output:
-            with program_log_lock:
-                if binary_output:
-                    # try to decode as utf-8 and replace all undecodable data by
-                    # "safe" printable representations when logging binary output
-                    decoded_output_lines = output_string.decode("utf-8", "replace")
-                else:
-                    # output_string should already be a Unicode string
-                    decoded_output_lines = output_string.splitlines(True)
-
-                for line in decoded_output_lines:
-                    program_log.info(line.strip())
+        # If stderr was filtered, log it separately
+        if filter_stderr:
+            streams[proc.stderr] = _ProgramOutput(
+                binary_output=True,
+                log_output=log_output,
+                capture_output=False,
+            )
 
-        if stdout:
-            stdout.write(output_string)
+        try:
+            _read_program_output(streams)
+        finally:
+            proc.wait()
 
-        # If stderr was filtered, log it separately
-        if filter_stderr and err_string and log_output:
-            # try to decode as utf-8 and replace all undecodable data by
-            # "safe" printable representations when logging binary output
-            decoded_err_string = err_string.decode("utf-8", "replace")
-            err_lines = decoded_err_string.splitlines(True)
+            for pipe in streams:
+                pipe.close()
 
-            with program_log_lock:
-                for line in err_lines:
-                    program_log.info(line.strip())
+        if filter_stderr:
+            streams[proc.stderr].finish()
+
+        output_string = output.finish()
 
     except OSError as e:
         with program_log_lock:
@@ -322,10 +444,33 @@ def _run_program(argv, root='/', stdin=None, stdout=None, env_prune=None, log_ou
     return (proc.returncode, output_string)
 
 
+def _read_program_output(streams):
+    """Read the output of a program until all pipes are closed.
+
+    :param streams: a dictionary of pipes and output streams
+    """
+    with selectors.DefaultSelector() as selector:
+        for pipe in streams:
+            selector.register(pipe, selectors.EVENT_READ)
+
+        while selector.get_map():
+            for key, _events in selector.select():
+                data = os.read(key.fd, PROGRAM_OUTPUT_CHUNK_SIZE)
+
+                if not data:
+                    selector.unregister(key.fileobj)
+                    continue
+
+                streams[key.fileobj].feed(data)
+
+
 def execWithRedirect(command, argv, stdin=None, stdout=None,
-                     root='/', env_prune=None, log_output=True, binary_output=False):
+                     root='/', env_prune=None, log_output=True, binary_output=False,
+                     output_callback=None):
     """ Run an external program and redirect the output to a file.
 
+        The output is not kept in the memory.
+
         :param command: The command to run
         :param argv: The argument list
         :param stdin: The file object to read stdin from.
@@ -334,11 +479,13 @@ def execWithRedirect(command, argv, stdin=None, stdout=None,
         :param env_prune: environment variable to remove before execution
         :param log_output: whether to log the output of command
         :param binary_output: whether to treat the output of command as binary data
+        :param output_callback: a function called with every line of the output or None
         :return: The return code of the command
     """
     argv = [command] + argv
     return _run_program(argv, stdin=stdin, stdout=stdout, root=root, env_prune=env_prune,
-                        log_output=log_output, binary_output=binary_output)[0]
+                        log_output=log_output, binary_output=binary_output,
+                        capture_output=False, output_callback=output_callback)[0]
 
 
 def execWithCapture(command, argv, stdin=None, root='/', log_output=True, filter_stderr=False):
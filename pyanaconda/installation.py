@@ -33,7 +33,7 @@ from pyanaconda.core.i18n import _
 from pyanaconda.core.threads import thread_manager
 from pyanaconda.kickstart import runPostScripts, runPreInstallScripts
 from pyanaconda.kexec import setup_kexec
-from pyanaconda.installation_tasks import Task, TaskQueue, DBusTask
+from pyanaconda.installation_tasks import Task, TaskQueue, DBusTask, RESOURCE_CHROOT
 from pykickstart.constants import SNAPSHOT_WHEN_POST_INSTALL
 
 from pyanaconda.anaconda_loggers import get_module_logger
@@ -41,6 +41,9 @@ log = get_module_logger(__name__)
 
 __all__ = ["RunInstallationTask"]
 
+# The maximal number of concurrently running configuration tasks.
+CONFIGURATION_MAX_WORKERS = 4
+
 
 def _writeKS(ksdata):
     path = conf.target.system_root + "/root/anaconda-ks.cfg"
@@ -96,7 +99,11 @@ class RunInstallationTask(InstallationTask):
 
     def _prepare_configuration(self, payload, ksdata):
         """Configure the installed system."""
-        configuration_queue = TaskQueue("Configuration queue")
+        configuration_queue = TaskQueue(
+            "Configuration queue",
+            max_workers=CONFIGURATION_MAX_WORKERS
+        )
+        subscription_config = None
 
         # connect progress reporting
         configuration_queue.queue_started.connect(self._queue_started_cb)
@@ -114,46 +121,15 @@ class RunInstallationTask(InstallationTask):
             subscription_config.append_dbus_tasks(SUBSCRIPTION, subscription_dbus_tasks)
             configuration_queue.append(subscription_config)
 
-        # schedule the execute methods of ksdata that require an installed system to be present
-        os_config = TaskQueue(
-            "Installed system configuration",
-            _("Configuring installed system")
-        )
-
-        # add installation tasks for the Security DBus module
-        if is_module_available(SECURITY):
-            security_proxy = SECURITY.get_proxy()
-            security_dbus_tasks = security_proxy.InstallWithTasks()
-            os_config.append_dbus_tasks(SECURITY, security_dbus_tasks)
-
-        # add installation tasks for the Timezone DBus module
-        # run these tasks before tasks of the Services module
-        if is_module_available(TIMEZONE):
-            timezone_proxy = TIMEZONE.get_proxy()
-            timezone_dbus_tasks = timezone_proxy.InstallWithTasks()
-            os_config.append_dbus_tasks(TIMEZONE, timezone_dbus_tasks)
-
-        # add installation tasks for the Services DBus module
-        if is_module_available(SERVICES):
-            services_proxy = SERVICES.get_proxy()
-            services_dbus_tasks = services_proxy.InstallWithTasks()
-            os_config.append_dbus_tasks(SERVICES, services_dbus_tasks)
-
-        # add installation tasks for the Localization DBus module
-        if is_module_available(LOCALIZATION):
-            localization_proxy = LOCALIZATION.get_proxy()
-            localization_dbus_tasks = localization_proxy.InstallWithTasks()
-            os_config.append_dbus_tasks(LOCALIZATION, localization_dbus_tasks)
-
-        # add the Firewall configuration task
-        if conf.target.can_configure_network:
-            firewall_proxy = NETWORK.get_proxy(FIREWALL)
-            firewall_dbus_task = firewall_proxy.InstallWithTask()
-            os_config.append_dbus_tasks(NETWORK, [firewall_dbus_task])
+        # the subscription is configured before anything else
+        first_items = [subscription_config] if subscription_config is not None else []
 
-        configuration_queue.append(os_config)
+        # schedule the execute methods of ksdata that require an installed system to be present
+        os_config = self._prepare_system_configuration()
+        configuration_queue.append(os_config, requires=first_items)
 
         # schedule network configuration (if required)
+        # it runs concurrently with the installed system configuration
         if conf.target.can_configure_network and conf.system.provides_network_config:
             overwrite = payload.type in PAYLOAD_LIVE_TYPES
             network_config = TaskQueue(
@@ -165,9 +141,10 @@ class RunInstallationTask(InstallationTask):
                 network.write_configuration,
                 (overwrite, )
             ))
-            configuration_queue.append(network_config)
+            configuration_queue.append(network_config, requires=first_items)
 
         # add installation tasks for the Users DBus module
+        # users are created after the authentication is configured
         if is_module_available(USERS):
             user_config = TaskQueue(
                 "User creation",
@@ -176,9 +153,10 @@ class RunInstallationTask(InstallationTask):
             users_proxy = USERS.get_proxy()
             users_dbus_tasks = users_proxy.InstallWithTasks()
             user_config.append_dbus_tasks(USERS, users_dbus_tasks)
-            configuration_queue.append(user_config)
+            configuration_queue.append(user_config, requires=[os_config])
 
         # Anaconda addon configuration
+        # all following items require all previous items
         addon_config = TaskQueue(
             "Anaconda addon configuration",
             _("Configuring addons")
@@ -282,6 +260,104 @@ class RunInstallationTask(InstallationTask):
 
         return configuration_queue
 
+    @staticmethod
+    def _prepare_system_configuration():
+        """Configure the installed system with the DBus modules.
+
+        The tasks of different modules run concurrently unless they are
+        ordered explicitly. Tasks that run commands in the chroot of the
+        target system, like systemctl, authselect or firewall-offline-cmd,
+        hold the chroot resource, so they never overlap.
+
+        :return: a task queue
+        """
+        os_config = TaskQueue(
+            "Installed system configuration",
+            _("Configuring installed system"),
+            max_workers=CONFIGURATION_MAX_WORKERS
+        )
+
+        # add installation tasks for the Security DBus module
+        # authselect runs in the chroot
+        if is_module_available(SECURITY):
+            security_proxy = SECURITY.get_proxy()
+            security_dbus_tasks = security_proxy.InstallWithTasks()
+            os_config.append_dbus_tasks(
+                SECURITY, security_dbus_tasks,
+                requires=[],
+                resources=[RESOURCE_CHROOT]
+            )
+
+        # add installation tasks for the Timezone DBus module
+        # run these tasks before tasks of the Services module
+        # the NTP service is enabled with systemctl in the chroot
+        timezone_tasks = []
+
+        if is_module_available(TIMEZONE):
+            timezone_proxy = TIMEZONE.get_proxy()
+            timezone_dbus_tasks = timezone_proxy.InstallWithTasks()
+            timezone_tasks = os_config.append_dbus_tasks(
+                TIMEZONE, timezone_dbus_tasks,
+                requires=[],
+                resources=[RESOURCE_CHROOT]
+            )
+
+        # add installation tasks for the Services DBus module
+        # the services and the firewall are enabled with systemctl in the chroot
+        if is_module_available(SERVICES):
+            services_proxy = SERVICES.get_proxy()
+            services_dbus_tasks = services_proxy.InstallWithTasks()
+            os_config.append_dbus_tasks(
+                SERVICES, services_dbus_tasks,
+                requires=timezone_tasks[-1:],
+                resources=[RESOURCE_CHROOT]
+            )
+
+        # add installation tasks for the Localization DBus module
+        # the available locales are listed in the chroot
+        if is_module_available(LOCALIZATION):
+            localization_proxy = LOCALIZATION.get_proxy()
+            localization_dbus_tasks = localization_proxy.InstallWithTasks()
+            os_config.append_dbus_tasks(
+                LOCALIZATION, localization_dbus_tasks,
+                requires=[],
+                resources=[RESOURCE_CHROOT]
+            )
+
+        # add the Firewall configuration task
+        if conf.target.can_configure_network:
+            firewall_proxy = NETWORK.get_proxy(FIREWALL)
+            firewall_dbus_task = firewall_proxy.InstallWithTask()
+            os_config.append_dbus_tasks(
+                NETWORK, [firewall_dbus_task],
+                requires=[],
+                resources=[RESOURCE_CHROOT]
+            )
+
+        return os_config
+
+    @staticmethod
+    def _connect_resource_sampler(queue):
+        """Report the running phases and tasks to the resource sampler.
+
+        The sampler runs in the Boss module, but the queue can run
+        in the user interface, so the changes are sent over DBus.
+        """
+        if not conf.anaconda.resource_sampling_interval:
+            return
+
+        boss_proxy = BOSS.get_proxy()
+        queue.queue_started.connect(lambda x: boss_proxy.SetInstallationPhase(x.name))
+
+        # The task signals of the queue are emitted only for its own
+        # items, so connect directly to the tasks of the nested queues.
+        for item in queue.nested_items:
+            if isinstance(item, TaskQueue):
+                continue
+
+            item.started.connect(lambda x: boss_proxy.StartInstallationTask(x.name))
+            item.completed.connect(lambda x: boss_proxy.FinishInstallationTask(x.name))
+
     def _wait_for_threads_to_finish(self):
         """Wait for background processing threads to finish.
 
@@ -332,6 +408,13 @@ class RunInstallationTask(InstallationTask):
             populate_task = localization_proxy.PopulateMissingKeyboardConfigurationWithTask()
             setup_environment.append_dbus_tasks(LOCALIZATION, [populate_task])
 
+        # Start to download packages while the storage is configured.
+        if payload.type == PAYLOAD_TYPE_DNF and conf.payload.prefetch_packages:
+            setup_environment.append(Task(
+                "Start the package prefetch",
+                payload.start_package_prefetch
+            ))
+
         installation_queue.append(setup_environment)
 
         # Do partitioning.
@@ -511,6 +594,9 @@ class RunInstallationTask(InstallationTask):
                                 next(task_completed_counter), x.elapsed_time)
         )
 
+        # tag the sampled resource usage with the running tasks
+        self._connect_resource_sampler(queue)
+
         # start the task queue
         queue.start()
 
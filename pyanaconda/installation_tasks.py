@@ -17,16 +17,36 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import threading
 import time
 
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 from dasbus.error import DBusError
 from pyanaconda.core.signal import Signal
+from pyanaconda.core.tracing import tracer
 from pyanaconda.errors import errorHandler, ERROR_RAISE
 from pyanaconda.modules.common.task import sync_run_task
 from pyanaconda.anaconda_loggers import get_module_logger
 
 log = get_module_logger(__name__)
 
+# Exclusive resources of installation tasks. Tasks that run systemctl
+# and other tools in the chroot of the target system can't overlap.
+RESOURCE_CHROOT = "chroot"
+
+# Errors of concurrent tasks are handled one by one.
+_error_handler_lock = threading.Lock()
+
+
+def _handle_error(error):
+    """Handle an error of a task.
+
+    :return: True if the error should be raised
+    """
+    with _error_handler_lock:
+        return errorHandler.cb(error) == ERROR_RAISE
+
 
 class BaseTask(object):
     """A base class for Task and TaskQueue.
@@ -34,6 +54,9 @@ class BaseTask(object):
     It holds shared methods, properties and signals.
     """
 
+    # the category of the task in the trace
+    trace_category = "task"
+
     def __init__(self, name):
         self._name = name
         self._parent = None
@@ -64,6 +87,10 @@ class BaseTask(object):
         """Set the parent task queue."""
         self._parent = queue
 
+    def _get_parent_name(self):
+        """Get the name of the parent task queue."""
+        return self._parent.name if self._parent else None
+
     def start(self):
         """Start the task."""
         # trigger the "started" signal
@@ -72,7 +99,8 @@ class BaseTask(object):
         # run the task
         start_timestamp = time.time()
 
-        self._run()
+        with tracer.span(self.name, self.trace_category, parent=self._get_parent_name()):
+            self._run()
 
         done_timestamp = time.time()
         self._elapsed_time = done_timestamp - start_timestamp
@@ -89,13 +117,26 @@ class TaskQueue(BaseTask):
     """TaskQueue represents a queue of TaskQueues or Tasks.
 
     TaskQueues and Tasks can be mixed in a single TaskQueue.
+
+    The items of the queue form a dependency graph. By default, every
+    item requires all items appended before it, so the queue is run
+    in the order of the items. An item can require a subset of the
+    previous items instead and it can hold exclusive resources. If
+    the queue has more than one worker, the items that don't depend
+    on each other and don't share resources run concurrently.
     """
 
-    def __init__(self, name, status_message=None):
+    trace_category = "queue"
+
+    def __init__(self, name, status_message=None, max_workers=1):
         super().__init__(name)
         self._status_message = status_message
+        self._max_workers = max_workers
         # the list backing this TaskQueue instance
         self._queue = []
+        # the prerequisites and resources of the items
+        self._requirements = {}
+        self._resources = {}
         # triggered if a TaskQueue contained in this one was started/completed
         self.queue_started = Signal()
         self.queue_completed = Signal()
@@ -181,15 +222,103 @@ class TaskQueue(BaseTask):
 
         return message.strip()
 
+    @property
+    def max_workers(self):
+        """The maximal number of concurrently running items."""
+        return self._max_workers
+
+    def get_requirements(self, item):
+        """Get the prerequisites of the given item.
+
+        :param item: a task or a queue of this queue
+        :return: a list of tasks and queues
+        """
+        return [i for i in self._queue if i in self._requirements[item]]
+
+    def get_resources(self, item):
+        """Get the exclusive resources of the given item.
+
+        :param item: a task or a queue of this queue
+        :return: a set of resource names
+        """
+        return self._resources[item]
+
     def _run(self):
         """Run the task queue."""
-        for item in self._queue:
-            # start the item (TaskQueue/Task)
-            item.start()
+        if self._max_workers <= 1:
+            # The items are already in a topological order.
+            for item in self._queue:
+                # start the item (TaskQueue/Task)
+                item.start()
+
+            return
+
+        self._run_concurrently()
+
+    def _run_concurrently(self):
+        """Run the items of the task queue concurrently.
+
+        Start every item that has all prerequisites completed and whose
+        resources are available. Stop to start new items after a failure,
+        wait for the running items and raise the first error.
+        """
+        pending = list(self._queue)
+        completed = set()
+        running = {}
+        held_resources = set()
+        error = None
+
+        with ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="AnaTaskQueueThread"
+        ) as executor:
+            while running or (pending and not error):
+
+                for item in list(pending):
+                    if error or len(running) >= self._max_workers:
+                        break
+
+                    if not self._requirements[item] <= completed:
+                        continue
+
+                    if self._resources[item] & held_resources:
+                        continue
+
+                    pending.remove(item)
+                    held_resources |= self._resources[item]
+                    running[executor.submit(item.start)] = item
+
+                done, _not_done = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    item = running.pop(future)
+                    held_resources -= self._resources[item]
+                    completed.add(item)
+
+                    if future.exception() and not error:
+                        error = future.exception()
+
+        if error:
+            raise error
 
     # implement the Python list "interface" and make sure parent is always
     # set to a correct value
-    def append(self, item):
+    def append(self, item, requires=None, resources=()):
+        """Append a task or a queue.
+
+        :param item: a task or a queue
+        :param requires: a list of previous items or None for all of them
+        :param resources: a list of exclusive resources
+        """
+        if requires is None:
+            requires = self._queue
+
+        if any(i not in self._queue for i in requires):
+            raise ValueError("The prerequisites of '{}' are not in the queue.".format(item.name))
+
+        self._requirements[item] = set(requires)
+        self._resources[item] = set(resources)
+
         item.started.connect(self.task_started.emit)
         item.completed.connect(self.task_completed.emit)
 
@@ -205,15 +334,27 @@ class TaskQueue(BaseTask):
         self._queue.append(item)
         item.set_parent(self)
 
-    def append_dbus_tasks(self, service_id, dbus_tasks):
+    def append_dbus_tasks(self, service_id, dbus_tasks, requires=None, resources=()):
         """Append DBus Tasks from a module to the TaskQueue.
 
+        The tasks of the module run in the given order. The first
+        task requires the given items.
+
         :param service_id: DBusServiceIdentifier instance corresponding to an Anaconda DBus module
         :param dbus_tasks: list of DBus Tasks paths
+        :param requires: a list of previous items or None for all of them
+        :param resources: a list of exclusive resources
+        :return: a list of appended tasks
         """
+        tasks = []
+
         for dbus_task_path in dbus_tasks:
             task_proxy = service_id.get_proxy(dbus_task_path)
-            self.append(DBusTask(task_proxy))
+            task = DBusTask(task_proxy)
+            self.append(task, requires=tasks[-1:] if tasks else requires, resources=resources)
+            tasks.append(task)
+
+        return tasks
 
 
 class Task(BaseTask):
@@ -246,13 +387,15 @@ class Task(BaseTask):
             self._task_cb(*self._task_args, **self._task_kwargs)
         except Exception as e:  # pylint: disable=broad-except
             # Handle an error.
-            if errorHandler.cb(e) == ERROR_RAISE:
+            if _handle_error(e):
                 raise
 
 
 class DBusTask(BaseTask):
     """Wrapper for a DBus installation task."""
 
+    trace_category = "dbus-task"
+
     def __init__(self, task_proxy):
         """Create a new task.
 
@@ -280,7 +423,7 @@ class DBusTask(BaseTask):
             sync_run_task(self._task_proxy)
         except DBusError as e:
             # Handle a remote error.
-            if errorHandler.cb(e) == ERROR_RAISE:
+            if _handle_error(e):
                 raise
         finally:
             # Disconnect from the signal.
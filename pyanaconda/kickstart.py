@@ -23,9 +23,11 @@ import os
 import os.path
 import sys
 import tempfile
+import threading
 import time
 import warnings
 
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 from pyanaconda.anaconda_loggers import get_module_logger, get_stdout_logger
@@ -48,7 +50,7 @@ from pykickstart.parser import KickstartParser
 from pykickstart.parser import Script as KSScript
 from pykickstart.sections import NullSection, PostScriptSection, PreScriptSection, \
     PreInstallScriptSection, OnErrorScriptSection, TracebackScriptSection, Section
-from pykickstart.version import returnClassForVersion
+from pykickstart.version import returnClassForVersion, DEVEL
 
 log = get_module_logger(__name__)
 stdoutLog = get_stdout_logger()
@@ -77,10 +79,34 @@ class AnacondaKSScript(KSScript):
         execution.
         Output is logged by the program logger, the path specified by --log
         or to /tmp/ks-script-\\*.log
+
+        Scripts with the --parallel option can run concurrently.
     """
+
+    # Failures of concurrent scripts are handled one by one.
+    _error_lock = threading.Lock()
+
+    # Has a script already stopped the installation?
+    _fatal_error = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parallel = kwargs.get("parallel", False)
+
+    def __str__(self):
+        retval = super().__str__()
+
+        if self.parallel:
+            # Add the option to the header of the section.
+            empty, header, body = retval.split("\n", 2)
+            retval = "\n".join([empty, header + " --parallel", body])
+
+        return retval
+
     def run(self, chroot):
         """ Run the kickstart script
             @param chroot directory path to chroot into before execution
+            @return the return code of the script
         """
         if self.inChroot:
             scriptRoot = chroot
@@ -122,12 +148,21 @@ class AnacondaKSScript(KSScript):
                 with open(messages, "r") as fp:
                     err = "".join(fp.readlines())
 
-                # Show error dialog even for non-interactive
-                flags.ksprompt = True
+                with self._error_lock:
+                    # Report only the first fatal error of concurrent scripts.
+                    if AnacondaKSScript._fatal_error:
+                        return rc
+
+                    AnacondaKSScript._fatal_error = True
+
+                    # Show error dialog even for non-interactive
+                    flags.ksprompt = True
 
-                errorHandler.cb(ScriptError(self.lineno, err))
-                util.ipmi_report(IPMI_ABORTED)
-                sys.exit(0)
+                    errorHandler.cb(ScriptError(self.lineno, err))
+                    util.ipmi_report(IPMI_ABORTED)
+                    sys.exit(0)
+
+        return rc
 
 
 class AnacondaInternalScript(AnacondaKSScript):
@@ -142,6 +177,48 @@ class AnacondaInternalScript(AnacondaKSScript):
         return ""
 
 
+###
+### SUBCLASSES OF PYKICKSTART SECTIONS
+###
+
+class ParallelScriptSection(object):
+    """Mixin of script sections with the --parallel option."""
+
+    def _getParser(self):
+        op = super()._getParser()
+        op.add_argument("--parallel", dest="parallel", action="store_true",
+                        default=False, version=DEVEL, help="""
+                        Run the script concurrently with the neighbouring
+                        scripts of the same type that use this option.""")
+        return op
+
+    def handleHeader(self, lineno, args):
+        super().handleHeader(lineno, args)
+        ns = self._getParser().parse_args(args=args[1:], lineno=lineno)
+        self._script["parallel"] = ns.parallel
+
+    def finalize(self):
+        parallel = self._script.get("parallel", False)
+        count = len(self.handler.scripts)
+
+        super().finalize()
+
+        if len(self.handler.scripts) > count:
+            self.handler.scripts[-1].parallel = parallel
+
+
+class AnacondaPreScriptSection(ParallelScriptSection, PreScriptSection):
+    """The %pre section with the --parallel option."""
+
+
+class AnacondaPreInstallScriptSection(ParallelScriptSection, PreInstallScriptSection):
+    """The %pre-install section with the --parallel option."""
+
+
+class AnacondaPostScriptSection(ParallelScriptSection, PostScriptSection):
+    """The %post section with the --parallel option."""
+
+
 ###
 ### SUBCLASSES OF PYKICKSTART COMMAND HANDLERS
 ###
@@ -285,7 +362,7 @@ class AnacondaPreParser(KickstartParser):
         pass
 
     def setupSections(self):
-        self.registerSection(PreScriptSection(self.handler, dataObj=AnacondaKSScript))
+        self.registerSection(AnacondaPreScriptSection(self.handler, dataObj=AnacondaKSScript))
         self.registerSection(NullSection(self.handler, sectionOpen="%pre-install"))
         self.registerSection(NullSection(self.handler, sectionOpen="%post"))
         self.registerSection(NullSection(self.handler, sectionOpen="%onerror"))
@@ -306,9 +383,10 @@ class AnacondaKSParser(KickstartParser):
         return KickstartParser.handleCommand(self, lineno, args)
 
     def setupSections(self):
-        self.registerSection(PreScriptSection(self.handler, dataObj=self.scriptClass))
-        self.registerSection(PreInstallScriptSection(self.handler, dataObj=self.scriptClass))
-        self.registerSection(PostScriptSection(self.handler, dataObj=self.scriptClass))
+        self.registerSection(AnacondaPreScriptSection(self.handler, dataObj=self.scriptClass))
+        self.registerSection(AnacondaPreInstallScriptSection(self.handler,
+                                                             dataObj=self.scriptClass))
+        self.registerSection(AnacondaPostScriptSection(self.handler, dataObj=self.scriptClass))
         self.registerSection(TracebackScriptSection(self.handler, dataObj=self.scriptClass))
         self.registerSection(OnErrorScriptSection(self.handler, dataObj=self.scriptClass))
         self.registerSection(UselessSection(self.handler, sectionOpen="%packages"))
@@ -405,6 +483,64 @@ def appendPostScripts(ksdata):
     ksparser.readKickstartFromString(scripts, reset=False)
 
 
+def _group_scripts(scripts):
+    """Split scripts into groups that can run concurrently.
+
+    Neighbouring scripts with the --parallel option form a group.
+    Every other script is a group on its own.
+
+    :param scripts: a list of scripts
+    :return: a list of lists of scripts
+    """
+    groups = []
+
+    for script in scripts:
+        if groups and getattr(script, "parallel", False) \
+                and getattr(groups[-1][-1], "parallel", False):
+            groups[-1].append(script)
+        else:
+            groups.append([script])
+
+    return groups
+
+
+def _run_scripts(scripts, chroot):
+    """Run kickstart scripts in groups.
+
+    The groups run one after another in the order of the scripts.
+    Scripts of a group run concurrently, each with its own log file.
+    If a script with --erroronfail fails, the installation stops
+    after the other scripts of the group finish.
+
+    :param scripts: a list of scripts
+    :param chroot: a directory path to chroot into before execution
+    """
+    AnacondaKSScript._fatal_error = False
+
+    for group in _group_scripts(scripts):
+        if len(group) == 1:
+            group[0].run(chroot)
+            continue
+
+        script_log.info("Running %d kickstart script(s) concurrently", len(group))
+
+        with ThreadPoolExecutor(
+            max_workers=len(group),
+            thread_name_prefix="AnaKickstartScriptThread"
+        ) as executor:
+            futures = [executor.submit(script.run, chroot) for script in group]
+
+        failed = [s for s, f in zip(group, futures) if f.exception() or f.result()]
+
+        if failed:
+            script_log.error("Kickstart script(s) at line(s) %s failed",
+                             ", ".join(str(s.lineno) for s in failed))
+
+        # Raise the first error, for example, SystemExit of a failed script.
+        for future in futures:
+            future.result()
+
+
 def runPostScripts(scripts):
     postScripts = [s for s in scripts if s.type == KS_SCRIPT_POST]
 
@@ -412,8 +548,7 @@ def runPostScripts(scripts):
         return
 
     script_log.info("Running kickstart %%post script(s)")
-    for script in postScripts:
-        script.run(conf.target.system_root)
+    _run_scripts(postScripts, conf.target.system_root)
     script_log.info("All kickstart %%post script(s) have been run")
 
 
@@ -426,8 +561,7 @@ def runPreScripts(scripts):
     script_log.info("Running kickstart %%pre script(s)")
     stdoutLog.info(_("Running pre-installation scripts"))
 
-    for script in preScripts:
-        script.run("/")
+    _run_scripts(preScripts, "/")
 
     script_log.info("All kickstart %%pre script(s) have been run")
 
@@ -440,8 +574,7 @@ def runPreInstallScripts(scripts):
 
     script_log.info("Running kickstart %%pre-install script(s)")
 
-    for script in preInstallScripts:
-        script.run("/")
+    _run_scripts(preInstallScripts, "/")
 
     script_log.info("All kickstart %%pre-install script(s) have been run")
 
@@ -20,6 +20,7 @@
 from pyanaconda.anaconda_loggers import get_module_logger
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.dbus import DBus
+from pyanaconda.core.resource_sampler import resource_sampler
 from pyanaconda.modules.boss.boss_interface import BossInterface
 from pyanaconda.modules.boss.module_manager import ModuleManager
 from pyanaconda.modules.boss.install_manager import InstallManager
@@ -63,6 +64,10 @@ class Boss(Service):
         DBus.publish_object(BOSS.object_path, BossInterface(self))
         DBus.register_service(BOSS.service_name)
 
+        # Sample the resource usage of the installer.
+        if conf.anaconda.resource_sampling_interval:
+            resource_sampler.start(conf.anaconda.resource_sampling_interval)
+
     def get_modules(self):
         """Get service names of running modules.
 
@@ -80,6 +85,7 @@ class Boss(Service):
     def stop(self):
         """Stop all modules and then stop the boss."""
         self._module_manager.stop_modules()
+        resource_sampler.stop()
         super().stop()
 
     def read_kickstart_file(self, path):
@@ -152,6 +158,27 @@ class Boss(Service):
         """
         return self._install_manager.collect_install_system_tasks()
 
+    def set_installation_phase(self, name):
+        """Set the current installation phase.
+
+        :param str name: a name of the phase
+        """
+        resource_sampler.set_phase(name)
+
+    def start_installation_task(self, name):
+        """Add a running installation task.
+
+        :param str name: a name of the task
+        """
+        resource_sampler.start_task(name)
+
+    def finish_installation_task(self, name):
+        """Remove a finished installation task.
+
+        :param str name: a name of the task
+        """
+        resource_sampler.finish_task(name)
+
     def set_locale(self, locale):
         """Set locale of boss and all modules.
 
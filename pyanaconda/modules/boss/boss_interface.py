@@ -150,6 +150,31 @@ class BossInterface(InterfaceTemplate):
         tasks = self.implementation.finish_installation_with_tasks()
         return TaskContainer.to_object_path_list(tasks)
 
+    def SetInstallationPhase(self, name: Str):
+        """Set the current installation phase.
+
+        The phase is used to tag the sampled resource usage.
+
+        :param name: a name of the phase
+        """
+        self.implementation.set_installation_phase(name)
+
+    def StartInstallationTask(self, name: Str):
+        """Report a started installation task.
+
+        The running tasks are used to tag the sampled resource usage.
+
+        :param name: a name of the task
+        """
+        self.implementation.start_installation_task(name)
+
+    def FinishInstallationTask(self, name: Str):
+        """Report a finished installation task.
+
+        :param name: a name of the task
+        """
+        self.implementation.finish_installation_task(name)
+
     def Quit(self):
         """Stop all modules and then stop the boss."""
         self.implementation.stop()
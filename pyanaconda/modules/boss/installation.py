@@ -23,6 +23,7 @@ from pyanaconda.anaconda_loggers import get_module_logger
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.constants import SCREENSHOTS_DIRECTORY
 from pyanaconda.core.path import make_directories, join_paths
+from pyanaconda.core.resource_sampler import resource_sampler
 from pyanaconda.core.util import execWithRedirect, restorecon
 from pyanaconda.modules.common.task import Task
 
@@ -84,6 +85,7 @@ class CopyLogsTask(Task):
 
         log.info("Copying logs from the installation environment.")
         self._create_logs_directory()
+        self._write_resource_report()
         self._copy_tmp_logs()
         self._copy_lorax_packages()
         self._copy_pre_script_logs()
@@ -96,6 +98,11 @@ class CopyLogsTask(Task):
         """Create directory for Anaconda logs on the install target"""
         make_directories(join_paths(self._sysroot, TARGET_LOG_DIR))
 
+    def _write_resource_report(self):
+        """Write a report of the sampled resource usage."""
+        if resource_sampler.is_running:
+            resource_sampler.write_report()
+
     def _copy_tmp_logs(self):
         """Copy a number of log files from /tmp"""
         log_files_to_copy = [
@@ -110,6 +117,9 @@ class CopyLogsTask(Task):
             "dnf.librepo.log",
             "hawkey.log",
             "dbus.log",
+            "anaconda-trace.json",
+            "resources.log",
+            "resources-report.log",
         ]
         for logfile in log_files_to_copy:
             self._copy_file_to_sysroot(
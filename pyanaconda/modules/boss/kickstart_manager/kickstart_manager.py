@@ -16,6 +16,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+from concurrent.futures import ThreadPoolExecutor
+
 from pykickstart.errors import KickstartError
 from pykickstart.version import makeVersion
 
@@ -72,24 +74,68 @@ class KickstartManager(object):
         parser = SplitKickstartParser(handler, valid_sections=VALID_SECTIONS_ANACONDA)
         return parser.split(path)
 
-    def _distribute_to_modules(self, elements):
-        """Distribute split kickstart to modules synchronously.
-
-        :returns: list of (Line number, Message) errors reported by modules when
-                  distributing kickstart
-        :rtype: list of kickstart reports
-        """
-        reports = []
+    def _get_available_observers(self):
+        """Get observers of the available modules."""
+        observers = []
 
         for observer in self._module_observers:
             if not observer.is_service_available:
                 log.warning("Module %s not available!", observer.service_name)
                 continue
 
-            commands = observer.proxy.KickstartCommands
-            sections = observer.proxy.KickstartSections
-            addons = observer.proxy.KickstartAddons
+            observers.append(observer)
+
+        return observers
+
+    @staticmethod
+    def _call_in_parallel(calls):
+        """Call the given functions in parallel.
+
+        Every module runs in its own process, so the DBus calls
+        of different modules can be handled at the same time.
+
+        :param calls: a list of functions without arguments
+        :return: a list of results in the same order
+        :raise: the first error in the order of the calls
+        """
+        if not calls:
+            return []
+
+        with ThreadPoolExecutor(
+            max_workers=len(calls),
+            thread_name_prefix="AnaKickstartThread"
+        ) as executor:
+            futures = [executor.submit(call) for call in calls]
+
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _get_kickstart_specification(observer):
+        """Get the kickstart commands, sections and addons of a module."""
+        return (
+            observer.proxy.KickstartCommands,
+            observer.proxy.KickstartSections,
+            observer.proxy.KickstartAddons
+        )
+
+    def _distribute_to_modules(self, elements):
+        """Distribute split kickstart to modules.
+
+        The kickstart is split in the order of the modules, but
+        the modules read their kickstarts in parallel.
 
+        :returns: list of (Line number, Message) errors reported by modules when
+                  distributing kickstart
+        :rtype: list of kickstart reports
+        """
+        observers = self._get_available_observers()
+        specifications = self._call_in_parallel([
+            lambda o=observer: self._get_kickstart_specification(o)
+            for observer in observers
+        ])
+        requests = []
+
+        for observer, (commands, sections, addons) in zip(observers, specifications):
             log.info("%s handles commands %s sections %s addons %s.",
                      observer.service_name, commands, sections, addons)
 
@@ -107,9 +153,16 @@ class KickstartManager(object):
                 log.info("There are no kickstart data for %s.", observer.service_name)
                 continue
 
-            module_report = KickstartReport.from_structure(
-                observer.proxy.ReadKickstart(module_kickstart)
-            )
+            requests.append((observer, module_elements, module_kickstart))
+
+        results = self._call_in_parallel([
+            lambda o=observer, k=module_kickstart: o.proxy.ReadKickstart(k)
+            for observer, _elements, module_kickstart in requests
+        ])
+        reports = []
+
+        for (observer, module_elements, _kickstart), result in zip(requests, results):
+            module_report = KickstartReport.from_structure(result)
 
             line_references = elements.get_references_from_elements(
                 module_elements
@@ -140,22 +193,19 @@ class KickstartManager(object):
         return self._merge_module_kickstarts(kickstarts)
 
     def _generate_from_modules(self):
-        """Generate kickstart from modules.
+        """Generate kickstart from modules in parallel.
 
         :return: a map of module names and kickstart strings
         """
-        result = {}
-
-        for observer in self._module_observers:
-            if not observer.is_service_available:
-                log.warning("Module %s not available!", observer.service_name)
-                continue
-
-            module_name = observer.service_name
-            module_kickstart = observer.proxy.GenerateKickstart()
-            result[module_name] = module_kickstart
-
-        return result
+        observers = self._get_available_observers()
+        kickstarts = self._call_in_parallel([
+            observer.proxy.GenerateKickstart for observer in observers
+        ])
+
+        return {
+            observer.service_name: kickstart
+            for observer, kickstart in zip(observers, kickstarts)
+        }
 
     def _merge_module_kickstarts(self, module_kickstarts):
         """Merge kickstart from modules
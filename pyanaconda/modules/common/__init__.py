@@ -58,3 +58,8 @@ def init(log_filename=None, log_stream=sys.stderr):
     from pyanaconda.anaconda_loggers import get_module_logger
     log = get_module_logger(__name__)
     log.debug("The configuration is loaded from: %s", conf.get_sources())
+
+    # The module runs as "python3 -m <module>".
+    import __main__
+    from pyanaconda.core.tracing import tracer
+    tracer.enable(process_name=__main__.__spec__.parent if __main__.__spec__ else None)
@@ -16,14 +16,22 @@
 # Red Hat, Inc.
 #
 import math
+import threading
 from time import sleep, perf_counter
 
+from pyanaconda.core.threads import thread_manager
 from pyanaconda.modules.common.task.task_interface import TaskInterface
 from pyanaconda.modules.common.task.task import Task, ValidationTask, AbstractTask
 
 __all__ = ["sync_run_task", "async_run_task", "wait_for_task", "AbstractTask", "Task",
            "ValidationTask", "TaskInterface"]
 
+# The interval of polling in the main thread.
+TASK_POLLING_INTERVAL = 0.1
+
+# The interval of the safety check of a running task in other threads.
+TASK_CHECK_INTERVAL = 1
+
 
 def sync_run_task(task_proxy, callback=None):
     """Run a remote task synchronously.
@@ -34,14 +42,9 @@ def sync_run_task(task_proxy, callback=None):
     :param callback: a callback
     :raise: a remote error
     """
-    task_proxy.Start()
-
-    while task_proxy.IsRunning:
-
-        if callback:
-            callback(task_proxy)
-
-        sleep(0.1)
+    with _TaskWaiter(task_proxy, callback) as waiter:
+        task_proxy.Start()
+        waiter.wait()
 
     task_proxy.Finish()
 
@@ -82,13 +85,77 @@ def wait_for_task(task_proxy, timeout=math.inf):
     :param float timeout: stop waiting after this time in seconds
     :raise TimeoutError: when the task did not finish before timeout
     """
-    start = perf_counter()
-    end = start + timeout
+    with _TaskWaiter(task_proxy) as waiter:
+        waiter.wait(timeout)
 
-    while task_proxy.IsRunning and perf_counter() <= end:
-        sleep(0.1)
+    task_proxy.Finish()
 
-    if task_proxy.IsRunning:
-        raise TimeoutError()
 
-    task_proxy.Finish()
+class _TaskWaiter(object):
+    """Waiter for a stopped remote task.
+
+    Outside of the main thread, wait for the Stopped signal of the task.
+    The signal is delivered by the main loop, so IsRunning is checked
+    only once in a while in case the signal gets lost. The main loop
+    is blocked in the main thread, so the task is polled there.
+
+    If there is a callback, it is called every iteration. The iteration
+    is triggered also by the ProgressChanged signal of the task.
+    """
+
+    def __init__(self, task_proxy, callback=None):
+        """Create a new waiter.
+
+        :param task_proxy: a proxy of the remote task
+        :param callback: a callback with a task_proxy argument
+        """
+        self._task_proxy = task_proxy
+        self._callback = callback
+        self._event = threading.Event()
+        self._use_signals = not thread_manager.in_main_thread()
+
+    def __enter__(self):
+        """Start to listen to the signals of the task."""
+        if self._use_signals:
+            self._task_proxy.Stopped.connect(self._on_signal)
+
+            if self._callback:
+                self._task_proxy.ProgressChanged.connect(self._on_signal)
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Stop to listen to the signals of the task."""
+        if self._use_signals:
+            self._task_proxy.Stopped.disconnect(self._on_signal)
+
+            if self._callback:
+                self._task_proxy.ProgressChanged.disconnect(self._on_signal)
+
+    def _on_signal(self, *args):
+        """Wake up the waiting thread."""
+        self._event.set()
+
+    def wait(self, timeout=math.inf):
+        """Wait for the task to stop.
+
+        :param float timeout: stop waiting after this time in seconds
+        :raise TimeoutError: when the task did not finish before timeout
+        """
+        end = perf_counter() + timeout
+
+        while self._task_proxy.IsRunning:
+
+            if self._callback:
+                self._callback(self._task_proxy)
+
+            remaining = end - perf_counter()
+
+            if remaining < 0:
+                raise TimeoutError()
+
+            if self._use_signals:
+                self._event.wait(min(TASK_CHECK_INTERVAL, remaining))
+                self._event.clear()
+            else:
+                sleep(min(TASK_POLLING_INTERVAL, remaining))
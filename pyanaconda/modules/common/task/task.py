@@ -33,6 +33,7 @@ from pyanaconda.modules.common.task.progress import ProgressReporter
 from pyanaconda.modules.common.task.result import ResultProvider
 from pyanaconda.modules.common.task.runnable import Runnable
 from pyanaconda.core.threads import thread_manager
+from pyanaconda.core.tracing import tracer
 
 from pyanaconda.anaconda_loggers import get_module_logger
 log = get_module_logger(__name__)
@@ -104,7 +105,9 @@ class Task(AbstractTask):
             return
 
         log.info(self.name)
-        self._set_result(self.run())
+
+        with tracer.span(self.name, "module-task", task=type(self).__name__):
+            self._set_result(self.run())
 
     def _task_succeeded_callback(self):
         """Callback for a successful task.
@@ -0,0 +1,233 @@
+#
+# The shared cache of downloaded content
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import argparse
+import os
+import shutil
+import tempfile
+
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.core.configuration.anaconda import conf
+from pyanaconda.core.constants import NETWORK_CONNECTION_TIMEOUT
+from pyanaconda.core.util import requests_session
+
+log = get_module_logger(__name__)
+
+__all__ = ["DownloadCache", "get_download_cache", "serve_download_cache"]
+
+
+def get_download_cache():
+    """Get the configured download cache.
+
+    :return: an instance of DownloadCache or None
+    """
+    if not conf.payload.download_cache:
+        return None
+
+    return DownloadCache(conf.payload.download_cache)
+
+
+class DownloadCache(object):
+    """The shared cache of downloaded content.
+
+    Files are stored under their checksums, so the same package or
+    image can be reused by any installation that downloads it. The
+    cache can be a local directory, for example on a shared NFS or
+    a local cache partition, or a URL of a directory served by
+    another machine. The remote cache is read-only.
+
+    The content of the cache is not trusted. Restored files have to
+    be verified by the consumer, the same way as downloaded files.
+    """
+
+    def __init__(self, location):
+        """Create a new cache.
+
+        :param str location: a path or a URL of the cache directory
+        """
+        self._location = location.rstrip("/")
+
+    @property
+    def location(self):
+        """The path or the URL of the cache directory."""
+        return self._location
+
+    @property
+    def is_remote(self):
+        """Is the cache available only over the network?"""
+        return self._location.startswith(("http://", "https://", "ftp://"))
+
+    @staticmethod
+    def _get_relative_path(checksum_type, checksum):
+        """Get a relative path of a file with the given checksum."""
+        checksum = checksum.lower()
+        return os.path.join(checksum_type.lower(), checksum[:2], checksum)
+
+    def restore(self, checksum_type, checksum, path):
+        """Restore a cached file.
+
+        :param str checksum_type: a type of the checksum, for example sha256
+        :param str checksum: a checksum of the file in hex
+        :param str path: a path to the restored file
+        :return: True if the file was restored, otherwise False
+        """
+        relative_path = self._get_relative_path(checksum_type, checksum)
+
+        try:
+            if self.is_remote:
+                restored = self._restore_remote_file(relative_path, path)
+            else:
+                restored = self._restore_local_file(relative_path, path)
+        except OSError as e:
+            log.debug("Failed to restore %s from the download cache: %s", path, str(e))
+            return False
+
+        if restored:
+            log.debug("Restored %s from the download cache.", path)
+
+        return restored
+
+    def _restore_local_file(self, relative_path, path):
+        """Restore a file from the local cache."""
+        cached_path = os.path.join(self._location, relative_path)
+
+        if not os.path.isfile(cached_path):
+            return False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._link_file(cached_path, path)
+        return True
+
+    def _restore_remote_file(self, relative_path, path):
+        """Restore a file from the remote cache."""
+        url = "{}/{}".format(self._location, relative_path)
+
+        with requests_session() as session:
+            response = session.get(url, stream=True, timeout=NETWORK_CONNECTION_TIMEOUT)
+
+            if response.status_code != 200:
+                return False
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+
+            try:
+                with open(tmp_path, "wb") as f:
+                    for chunk in response.iter_content(1024 * 1024):
+                        f.write(chunk)
+
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+        return True
+
+    def store(self, checksum_type, checksum, path):
+        """Store a verified file in the cache.
+
+        The remote cache is read-only.
+
+        :param str checksum_type: a type of the checksum, for example sha256
+        :param str checksum: a checksum of the file in hex
+        :param str path: a path to the verified file
+        :return: True if the file was stored, otherwise False
+        """
+        if self.is_remote:
+            return False
+
+        relative_path = self._get_relative_path(checksum_type, checksum)
+        cached_path = os.path.join(self._location, relative_path)
+
+        if os.path.exists(cached_path):
+            return False
+
+        try:
+            os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+            self._link_file(path, cached_path)
+        except OSError as e:
+            log.debug("Failed to store %s in the download cache: %s", path, str(e))
+            return False
+
+        log.debug("Stored %s in the download cache.", path)
+        return True
+
+    def _link_file(self, source_path, target_path):
+        """Link a file atomically or copy it on a different file system."""
+        try:
+            # Prefer a hard link on the same file system.
+            tmp_path = target_path + ".tmp"
+            os.link(source_path, tmp_path)
+        except OSError:
+            self._copy_file(source_path, target_path)
+        else:
+            os.replace(tmp_path, target_path)
+
+    @staticmethod
+    def _copy_file(source_path, target_path):
+        """Copy a file atomically."""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(target_path),
+            prefix=".",
+        )
+        os.close(fd)
+
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, target_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+def serve_download_cache(cache_dir, address="", port=8080):
+    """Serve the download cache over HTTP.
+
+    The cache can be used by other machines if the URL of
+    the server is specified as their download cache.
+
+    :param str cache_dir: a path to the cache directory
+    :param str address: an address to bind
+    :param int port: a port to bind
+    """
+    handler = partial(SimpleHTTPRequestHandler, directory=cache_dir)
+
+    with ThreadingHTTPServer((address, port), handler) as server:
+        log.info("Serving the download cache %s at port %s.", cache_dir, port)
+        server.serve_forever()
+
+
+def main():
+    """Run the stand-alone server of the download cache."""
+    parser = argparse.ArgumentParser(description="Serve the download cache over HTTP.")
+    parser.add_argument("cache_dir", help="a path to the cache directory")
+    parser.add_argument("--address", default="", help="an address to bind")
+    parser.add_argument("--port", type=int, default=8080, help="a port to bind")
+    args = parser.parse_args()
+
+    serve_download_cache(args.cache_dir, args.address, args.port)
+
+
+if __name__ == "__main__":
+    main()
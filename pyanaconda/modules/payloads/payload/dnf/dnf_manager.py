@@ -18,10 +18,13 @@
 # Red Hat, Inc.
 #
 import multiprocessing
+import os
 import shutil
 import threading
 import traceback
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import dnf
 import dnf.exceptions
 import dnf.module.module_base
@@ -34,18 +37,21 @@ from blivet.size import Size
 from pyanaconda.anaconda_loggers import get_module_logger
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.constants import DNF_DEFAULT_TIMEOUT, DNF_DEFAULT_RETRIES, URL_TYPE_BASEURL, \
-    URL_TYPE_MIRRORLIST, URL_TYPE_METALINK, DNF_DEFAULT_REPO_COST
+    URL_TYPE_MIRRORLIST, URL_TYPE_METALINK, DNF_DEFAULT_REPO_COST, NETWORK_CONNECTION_TIMEOUT, \
+    USER_AGENT
 from pyanaconda.core.i18n import _
 from pyanaconda.core.payload import ProxyString, ProxyStringError
-from pyanaconda.core.util import get_os_release_value
+from pyanaconda.core.util import get_os_release_value, requests_session
 from pyanaconda.modules.common.errors.installation import PayloadInstallationError
 from pyanaconda.modules.common.errors.payload import UnknownCompsEnvironmentError, \
     UnknownCompsGroupError, UnknownRepositoryError
 from pyanaconda.modules.common.structures.comps import CompsEnvironmentData, CompsGroupData
 from pyanaconda.modules.common.structures.packages import PackagesConfigurationData
 from pyanaconda.modules.common.structures.payload import RepoConfigurationData
+from pyanaconda.modules.payloads.base.download_cache import get_download_cache
 from pyanaconda.modules.payloads.constants import DNF_REPO_DIRS
 from pyanaconda.modules.payloads.payload.dnf.download_progress import DownloadProgress
+from pyanaconda.modules.payloads.payload.dnf.metadata_cache import MetadataCache
 from pyanaconda.modules.payloads.payload.dnf.transaction_progress import TransactionProgress, \
     process_transaction_progress
 from pyanaconda.modules.payloads.payload.dnf.utils import get_product_release_version, \
@@ -67,6 +73,13 @@ DNF_PLUGINCONF_DIR = '/tmp/dnf.pluginconf'
 #
 DNF_EXTRA_SIZE_PER_FILE = Size("6 KiB")
 
+# The maximal number of packages that can be downloaded at the same time.
+# The default value of DNF is 3, which leaves fast networks mostly unused.
+DNF_MAX_PARALLEL_DOWNLOADS = 10
+
+# The maximal number of repositories that can load metadata at the same time.
+DNF_METADATA_MAX_WORKERS = 8
+
 
 class DNFManagerError(Exception):
     """General error for the DNF manager."""
@@ -102,7 +115,13 @@ class DNFManager(object):
         self._ignore_broken_packages = False
         self._download_location = None
         self._md_hashes = {}
+        self._md_validators = {}
         self._enabled_system_repositories = []
+        self._metadata_cache = self._create_metadata_cache()
+        self._metadata_cache_hashes = {}
+        self._fetched_md_hashes = {}
+        self._download_cache = get_download_cache()
+        self._download_cache_thread = None
 
     @property
     def _base(self):
@@ -124,6 +143,7 @@ class DNFManager(object):
         # Set installer defaults
         base.conf.gpgcheck = False
         base.conf.skip_if_unavailable = False
+        base.conf.max_parallel_downloads = DNF_MAX_PARALLEL_DOWNLOADS
 
         # Set the substitution variables.
         cls._reset_substitution(base)
@@ -149,6 +169,28 @@ class DNFManager(object):
         log.debug("The DNF base has been created.")
         return base
 
+    @staticmethod
+    def _create_metadata_cache():
+        """Create a persistent cache of repository metadata.
+
+        :return: an instance of MetadataCache or None
+        """
+        if not conf.payload.metadata_cache_dir:
+            return None
+
+        return MetadataCache(
+            cache_dir=conf.payload.metadata_cache_dir,
+            max_size=int(conf.payload.metadata_cache_size),
+        )
+
+    @property
+    def metadata_cache(self):
+        """The persistent cache of repository metadata.
+
+        :return: an instance of MetadataCache or None
+        """
+        return self._metadata_cache
+
     @classmethod
     def _reset_substitution(cls, base):
         """Reset substitution variables of the given DNF base."""
@@ -175,7 +217,10 @@ class DNFManager(object):
         self._ignore_broken_packages = False
         self._download_location = None
         self._md_hashes = {}
+        self._md_validators = {}
         self._enabled_system_repositories = []
+        self._metadata_cache_hashes = {}
+        self._fetched_md_hashes = {}
 
         log.debug("The DNF base has been reset.")
 
@@ -494,6 +539,8 @@ class DNFManager(object):
     def clear_cache(self):
         """Clear the DNF cache."""
         self._enabled_system_repositories = []
+        self._metadata_cache_hashes = {}
+        self._fetched_md_hashes = {}
         shutil.rmtree(DNF_CACHE_DIR, ignore_errors=True)
         shutil.rmtree(DNF_PLUGINCONF_DIR, ignore_errors=True)
         self._base.reset(sack=True, repos=True, goal=True)
@@ -670,12 +717,107 @@ class DNFManager(object):
 
         log.info("Downloading packages to %s.", self.download_location)
 
+        # Use packages from the download cache.
+        self._restore_cached_packages(packages)
+
         try:
             self._base.download_packages(packages, progress)
         except dnf.exceptions.DownloadError as e:
             msg = "Failed to download the following packages: " + str(e)
             raise PayloadInstallationError(msg) from None
 
+        # Update the download cache in the background.
+        self._start_storing_cached_packages(packages)
+
+    def _get_cacheable_packages(self, packages):
+        """Get packages that can be shared with the download cache.
+
+        Only packages downloaded to the download location
+        can be restored from the cache or stored in the cache.
+
+        :param packages: a list of DNF packages
+        :return: a list of DNF packages
+        """
+        if not self._download_cache or not self.download_location:
+            return []
+
+        location = self.download_location.rstrip("/") + "/"
+        return [p for p in packages if p.localPkg().startswith(location)]
+
+    def _restore_cached_packages(self, packages):
+        """Restore packages from the download cache.
+
+        The restored packages are verified by DNF and
+        downloaded again if their checksums don't match.
+
+        :param packages: a list of DNF packages
+        """
+        packages = self._get_cacheable_packages(packages)
+
+        if not packages:
+            return
+
+        def restore_package(package):
+            checksum_type, checksum = package.returnIdSum()
+            return self._download_cache.restore(checksum_type, checksum, package.localPkg())
+
+        with ThreadPoolExecutor(max_workers=DNF_MAX_PARALLEL_DOWNLOADS) as executor:
+            restored = sum(executor.map(restore_package, packages))
+
+        log.info("Restored %d of %d packages from the download cache.", restored, len(packages))
+
+    def _start_storing_cached_packages(self, packages):
+        """Start to store verified packages in the download cache.
+
+        The packages are stored in a separate thread, so the
+        installation doesn't wait for the download cache.
+        See the wait_for_download_cache method.
+
+        :param packages: a list of DNF packages
+        """
+        self.wait_for_download_cache()
+
+        # Don't use the DNF packages in the thread.
+        files = [
+            (*package.returnIdSum(), package.localPkg())
+            for package in self._get_cacheable_packages(packages)
+        ]
+
+        if not files:
+            return
+
+        self._download_cache_thread = threading.Thread(
+            name="AnaDNFDownloadCacheThread",
+            target=self._store_cached_packages,
+            args=(files, ),
+            daemon=True
+        )
+        self._download_cache_thread.start()
+
+    def _store_cached_packages(self, files):
+        """Store verified packages in the download cache.
+
+        :param files: a list of tuples with a checksum type, a checksum and a path
+        """
+        stored = 0
+
+        for checksum_type, checksum, path in files:
+            stored += self._download_cache.store(checksum_type, checksum, path)
+
+        log.info("Stored %d of %d packages in the download cache.", stored, len(files))
+
+    def wait_for_download_cache(self):
+        """Wait until the downloaded packages are stored in the download cache.
+
+        Call this method before the downloaded packages are removed.
+        """
+        if not self._download_cache_thread:
+            return
+
+        log.debug("Waiting for the download cache.")
+        self._download_cache_thread.join()
+        self._download_cache_thread = None
+
     def install_packages(self, callback, timeout=20):
         """Install the packages.
 
@@ -1003,6 +1145,8 @@ class DNFManager(object):
             log.debug("Don't load metadata from a disabled repository.")
             return
 
+        self._restore_cached_metadata(repo)
+
         try:
             repo.load()
         except dnf.exceptions.RepoError as e:
@@ -1012,6 +1156,51 @@ class DNFManager(object):
 
         log.info("Loaded metadata from '%s'.", url)
 
+    def load_repositories(self, repo_ids, max_workers=DNF_METADATA_MAX_WORKERS):
+        """Download metadata of the specified repositories in parallel.
+
+        Load metadata of the specified repositories concurrently, so
+        the total time is given by the slowest repository and not by
+        the sum of all of them. The loaded metadata are reused later
+        by the load_packages_metadata method.
+
+        An invalid repo will be disabled. Errors of all repositories
+        are collected and reported at once. Stalled transfers are
+        aborted by librepo, see the timeout and minrate options of
+        the repositories.
+
+        :param repo_ids: a list of repository identifiers
+        :param max_workers: a maximal number of repositories loaded at once
+        :raise: MetadataError if the metadata cannot be loaded
+        """
+        # Check the repositories in advance.
+        for repo_id in repo_ids:
+            self._get_repository(repo_id)
+
+        if not repo_ids:
+            return
+
+        log.debug("Load metadata for %s repositories.", len(repo_ids))
+        errors = []
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="AnaDNFMetadataThread"
+        ) as executor:
+            futures = [
+                executor.submit(self.load_repository, repo_id)
+                for repo_id in repo_ids
+            ]
+
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except MetadataError as e:
+                    errors.append(str(e))
+
+        if errors:
+            raise MetadataError("\n".join(errors))
+
     def load_packages_metadata(self):
         """Load metadata about packages in available repositories.
 
@@ -1032,6 +1221,92 @@ class DNFManager(object):
 
         log.info("Loaded packages and group metadata.")
 
+        # Update the persistent cache.
+        self._store_cached_metadata()
+
+    def _restore_cached_metadata(self, repo):
+        """Restore metadata of the repository from the persistent cache.
+
+        The cache is keyed by a hash of the repomd.xml file, so it
+        can be used only for repositories with a base URL.
+
+        A hash of the repomd.xml file that was fetched by the last
+        check of the repositories is used if available. Nothing is
+        restored if the repository already has the same metadata.
+
+        :param repo: a DNF repo
+        """
+        if not self._metadata_cache or not repo.baseurl:
+            return
+
+        local_hash = self._get_local_repomd_hash(repo)
+        md_hash = self._fetched_md_hashes.pop(repo.id, None)
+
+        # The metadata of the repo haven't been refreshed since the last load.
+        if md_hash is None and local_hash \
+                and local_hash == self._metadata_cache_hashes.get(repo.id):
+            log.debug("Metadata of the '%s' repository are already in place.", repo.id)
+            return
+
+        if md_hash is None:
+            content = self._get_repomd_content(repo)
+
+            if not content:
+                return
+
+            md_hash = calculate_hash(content)
+
+        self._metadata_cache_hashes[repo.id] = md_hash
+
+        if md_hash == local_hash:
+            log.debug("Metadata of the '%s' repository are already in place.", repo.id)
+            return
+
+        self._metadata_cache.restore(
+            md_hash=md_hash,
+            repo_id=repo.id,
+            repo_dir=repo._repo.getCachedir(),
+            solv_dir=self._base.conf.cachedir,
+        )
+
+    @staticmethod
+    def _get_local_repomd_hash(repo):
+        """Get a hash of the repomd.xml file in the DNF cache of the repository.
+
+        :param repo: a DNF repo
+        :return: a hash of the repomd.xml file or None
+        """
+        path = os.path.join(repo._repo.getCachedir(), "repodata", "repomd.xml")
+
+        try:
+            with open(path, "rt") as f:
+                return calculate_hash(f.read())
+        except OSError:
+            return None
+
+    def _store_cached_metadata(self):
+        """Store metadata of enabled repositories in the persistent cache."""
+        if not self._metadata_cache:
+            return
+
+        with self._lock:
+            repos = list(self._base.repos.iter_enabled())
+
+        for repo in repos:
+            md_hash = self._metadata_cache_hashes.get(repo.id)
+
+            if not md_hash:
+                continue
+
+            self._metadata_cache.store(
+                md_hash=md_hash,
+                repo_id=repo.id,
+                repo_dir=repo._repo.getCachedir(),
+                solv_dir=self._base.conf.cachedir,
+            )
+
+        log.debug("The metadata cache: %s", self._metadata_cache.statistics)
+
     def load_repomd_hashes(self):
         """Load a hash of the repomd.xml file for each enabled repository."""
         self._md_hashes = self._get_repomd_hashes()
@@ -1043,35 +1318,123 @@ class DNFManager(object):
         It is useful when network settings are changed so that we can verify if
         repositories are still reachable.
 
+        The repositories are checked in parallel with conditional requests
+        and the check stops on the first mismatch.
+
         :return: True if files haven't changed, otherwise False
         """
-        return bool(self._md_hashes and self._md_hashes == self._get_repomd_hashes())
+        if not self._md_hashes:
+            return False
 
-    def _get_repomd_hashes(self):
+        md_hashes = self._get_repomd_hashes(expected_hashes=self._md_hashes)
+        return md_hashes == self._md_hashes
+
+    def _get_repomd_hashes(self, expected_hashes=None):
         """Get a dictionary of repomd.xml hashes.
 
+        The repomd.xml files are downloaded in parallel with a shared
+        HTTP session. If the expected hashes are specified, we send
+        conditional requests and stop on the first mismatch, so the
+        returned dictionary might be incomplete.
+
+        :param expected_hashes: a dictionary of expected hashes or None
         :return: a dictionary of repo ids and repomd.xml hashes
         """
+        with self._lock:
+            repos = list(self._base.repos.iter_enabled())
+
         md_hashes = {}
 
-        for repo in self._base.repos.iter_enabled():
-            content = self._get_repomd_content(repo)
-            md_hash = calculate_hash(content) if content else None
-            md_hashes[repo.id] = md_hash
+        if expected_hashes is not None and set(expected_hashes) != {r.id for r in repos}:
+            log.debug("The enabled repositories have changed.")
+            return md_hashes
+
+        if not repos:
+            return md_hashes
+
+        session = requests_session()
+        executor = ThreadPoolExecutor(
+            max_workers=DNF_METADATA_MAX_WORKERS,
+            thread_name_prefix="AnaDNFRepomdThread"
+        )
+
+        try:
+            futures = {
+                executor.submit(
+                    self._get_repomd_hash,
+                    repo=repo,
+                    session=session,
+                    expected_hash=(expected_hashes or {}).get(repo.id)
+                ): repo.id for repo in repos
+            }
+
+            for future in as_completed(futures):
+                repo_id = futures[future]
+                md_hashes[repo_id] = future.result()
+
+                if expected_hashes is None:
+                    continue
+
+                if md_hashes[repo_id] != expected_hashes[repo_id]:
+                    log.debug("The repomd.xml file of the '%s' repository has changed.", repo_id)
+                    break
+        finally:
+            # Cancel the queued downloads, but wait for the running ones,
+            # because they use the session and update the cached hashes.
+            executor.shutdown(wait=True, cancel_futures=True)
+            session.close()
 
         log.debug("Loaded repomd.xml hashes: %s", md_hashes)
         return md_hashes
 
-    def _get_repomd_content(self, repo):
+    def _get_repomd_hash(self, repo, session, expected_hash=None):
+        """Get a hash of a repomd.xml file.
+
+        If the expected hash is specified, send a conditional request.
+
+        :param repo: a DNF repo
+        :param session: a requests session
+        :param expected_hash: an expected hash or None
+        :return: a hash of the repomd.xml file or None
+        """
+        content = self._get_repomd_content(
+            repo,
+            session=session,
+            conditional=expected_hash is not None
+        )
+
+        if content is None:
+            log.debug("The repomd.xml file of the '%s' repository is not modified.", repo.id)
+            md_hash = expected_hash
+        else:
+            md_hash = calculate_hash(content) if content else None
+
+        # Reuse the hash when the repository is loaded next time.
+        if md_hash:
+            self._fetched_md_hashes[repo.id] = md_hash
+
+        return md_hash
+
+    def _get_repomd_content(self, repo, session=None, conditional=False):
         """Get a content of a repomd.xml file.
 
+        HTTP and HTTPS URLs are downloaded with the specified session.
+        Other URLs are downloaded by DNF.
+
         :param repo: a DNF repo
-        :return: a content of the repomd.xml file
+        :param session: a requests session or None
+        :param conditional: True to send a conditional request
+        :return: a content of the repomd.xml file or None if not modified
         """
         for url in repo.baseurl:
             try:
                 repomd_url = "{}/repodata/repomd.xml".format(url)
 
+                if session and repomd_url.startswith(("http://", "https://")):
+                    return self._download_repomd_content(
+                        repo, repomd_url, session, conditional
+                    )
+
                 with self._base.urlopen(repomd_url, repo=repo, mode="w+t") as f:
                     return f.read()
 
@@ -1080,3 +1443,76 @@ class DNFManager(object):
                 continue
 
         return ""
+
+    def _download_repomd_content(self, repo, url, session, conditional=False):
+        """Download a content of a repomd.xml file with the given session.
+
+        Validators of an unconditional download are remembered and sent
+        with the next conditional request for the same URL.
+
+        :param repo: a DNF repo
+        :param url: a URL of the repomd.xml file
+        :param session: a requests session
+        :param conditional: True to send a conditional request
+        :return: a content of the repomd.xml file or None if not modified
+        :raise: OSError if the file cannot be downloaded
+        """
+        headers = {"user-agent": USER_AGENT}
+        validators = self._md_validators.get(repo.id, {})
+
+        if conditional and validators.get("url") == url:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = session.get(
+            url,
+            headers=headers,
+            proxies=self._get_repo_proxies(repo),
+            verify=repo.sslcacert or repo.sslverify,
+            cert=(repo.sslclientcert, repo.sslclientkey) if repo.sslclientcert else None,
+            timeout=NETWORK_CONNECTION_TIMEOUT
+        )
+
+        if conditional and response.status_code == 304:
+            return None
+
+        response.raise_for_status()
+
+        # The validators have to match the expected hash,
+        # so we remember only results of the initial download.
+        if not conditional:
+            self._md_validators[repo.id] = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+
+        return response.text
+
+    @staticmethod
+    def _get_repo_proxies(repo):
+        """Get the proxy configuration of the repo for requests.
+
+        :param repo: a DNF repo
+        :return: a dictionary of proxies
+        """
+        if not repo.proxy or repo.proxy == "_none_":
+            return {}
+
+        try:
+            proxy = ProxyString(repo.proxy)
+        except ProxyStringError as e:
+            log.debug("Failed to parse the proxy '%s': %s", repo.proxy, e)
+            return {}
+
+        proxy.username = repo.proxy_username or proxy.username
+        proxy.password = repo.proxy_password or proxy.password
+        proxy.parse_components()
+
+        return {
+            "http": proxy.url,
+            "https": proxy.url
+        }
@@ -80,7 +80,7 @@ class DownloadProgress(dnf.callback.DownloadProgress):
     def end(self, payload, status, msg):
         nevra = str(payload)
 
-        if status is dnf.callback.STATUS_OK:
+        if status in (dnf.callback.STATUS_OK, dnf.callback.STATUS_ALREADY_EXISTS):
             self.downloads[nevra] = payload.download_size
             self._report_progress()
             return
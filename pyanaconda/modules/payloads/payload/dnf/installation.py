@@ -144,13 +144,18 @@ class ResolvePackagesTask(CheckPackagesSelectionTask):
 class PrepareDownloadLocationTask(Task):
     """The installation task for setting up the download location."""
 
-    def __init__(self, dnf_manager):
+    def __init__(self, dnf_manager, prefetch_location=None):
         """Create a new task.
 
+        The prefetched packages are reused if their location is
+        picked again. Otherwise, they are removed.
+
         :param dnf_manager: a DNF manager
+        :param prefetch_location: a path to prefetched packages or None
         """
         super().__init__()
         self._dnf_manager = dnf_manager
+        self._prefetch_location = prefetch_location
 
     @property
     def name(self):
@@ -161,13 +166,77 @@ class PrepareDownloadLocationTask(Task):
 
         :return: a path of the download location
         """
+        path = pick_download_location(self._dnf_manager, self._prefetch_location)
+
+        # The prefetched packages might be still stored in the download cache.
+        self._dnf_manager.wait_for_download_cache()
+
+        if path == self._prefetch_location:
+            log.info("Using prefetched packages from %s.", path)
+            self._dnf_manager.set_download_location(path)
+            return path
+
+        if self._prefetch_location and os.path.exists(self._prefetch_location):
+            log.info("Removing prefetched packages from %s.", self._prefetch_location)
+            shutil.rmtree(self._prefetch_location)
+
+        if os.path.exists(path):
+            log.info("Removing existing package download location: %s", path)
+            shutil.rmtree(path)
+
+        self._dnf_manager.set_download_location(path)
+        return path
+
+
+class PrefetchPackagesTask(Task):
+    """The installation task for downloading packages in advance.
+
+    The resolved packages are downloaded before the target system
+    is set up, so only locations outside of the target system can
+    be used. The installation will download the remaining packages
+    to the same location later.
+
+    The location is removed if the download fails.
+    """
+
+    def __init__(self, dnf_manager):
+        """Create a new task.
+
+        :param dnf_manager: a DNF manager
+        """
+        super().__init__()
+        self._dnf_manager = dnf_manager
+
+    @property
+    def name(self):
+        return "Prefetch the packages"
+
+    def run(self):
+        """Run the task.
+
+        :return: a path of the download location or None
+        """
         path = pick_download_location(self._dnf_manager)
+        sysroot = conf.target.system_root
+
+        if path == sysroot or path.startswith(sysroot + "/"):
+            log.info("Skipping the package prefetch. The location %s isn't "
+                     "available before the target system is set up.", path)
+            return None
 
         if os.path.exists(path):
             log.info("Removing existing package download location: %s", path)
             shutil.rmtree(path)
 
         self._dnf_manager.set_download_location(path)
+
+        try:
+            self._dnf_manager.download_packages(self.report_progress)
+        except BaseException:
+            log.info("Removing partially prefetched packages from %s.", path)
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
         return path
 
 
@@ -195,6 +264,9 @@ class CleanUpDownloadLocationTask(Task):
         """
         path = self._dnf_manager.download_location
 
+        # The packages might be still stored in the download cache.
+        self._dnf_manager.wait_for_download_cache()
+
         if not os.path.exists(path):
             log.warning("The download location %s doesn't exist.", path)
             return
@@ -0,0 +1,235 @@
+#
+# The persistent cache of repository metadata
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import shutil
+import tempfile
+import threading
+
+from pyanaconda.anaconda_loggers import get_module_logger
+
+log = get_module_logger(__name__)
+
+__all__ = ["MetadataCache", "MetadataCacheStatistics"]
+
+# The placeholder of a repo id in names of cached solv files.
+SOLV_FILE_PREFIX = "repo"
+
+
+class MetadataCacheStatistics(object):
+    """Statistics of the persistent cache of repository metadata."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def __repr__(self):
+        return "{}(hits={}, misses={}, bytes_saved={})".format(
+            self.__class__.__name__, self.hits, self.misses, self.bytes_saved
+        )
+
+
+class MetadataCache(object):
+    """The persistent cache of repository metadata.
+
+    The cache stores the downloaded metadata and the generated solv
+    files of DNF repositories. Every entry is identified by a hash of
+    the repomd.xml file, so the metadata can be reused whenever a repo
+    provides the same repomd.xml file, even after a restart of the
+    installer.
+
+    The size of the cache is limited. The least recently used entries
+    are removed if the cache is too big.
+    """
+
+    def __init__(self, cache_dir, max_size):
+        """Create a new cache.
+
+        :param str cache_dir: a path to the cache directory
+        :param int max_size: a maximal size of the cache in bytes
+        """
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._statistics = MetadataCacheStatistics()
+
+    @property
+    def cache_dir(self):
+        """The path to the cache directory."""
+        return self._cache_dir
+
+    @property
+    def statistics(self):
+        """Statistics of the cache.
+
+        :return: an instance of MetadataCacheStatistics
+        """
+        return self._statistics
+
+    def _get_entry_path(self, md_hash):
+        """Get a path to the cache entry with the given hash."""
+        return os.path.join(self._cache_dir, md_hash.hex())
+
+    def restore(self, md_hash, repo_id, repo_dir, solv_dir):
+        """Restore cached metadata of a repository.
+
+        :param bytes md_hash: a hash of the repomd.xml file
+        :param str repo_id: an identifier of the repository
+        :param str repo_dir: a path to the DNF cache of the repository
+        :param str solv_dir: a path to the directory with solv files
+        :return: True if the metadata were restored, otherwise False
+        """
+        entry_path = self._get_entry_path(md_hash)
+
+        if not os.path.isdir(entry_path):
+            log.debug("No cached metadata for the '%s' repository.", repo_id)
+            self._update_statistics(misses=1)
+            return False
+
+        try:
+            # Restore the metadata.
+            shutil.rmtree(repo_dir, ignore_errors=True)
+            shutil.copytree(
+                os.path.join(entry_path, "repodata"),
+                os.path.join(repo_dir, "repodata")
+            )
+
+            # Restore the solv files.
+            os.makedirs(solv_dir, exist_ok=True)
+
+            for name in os.listdir(os.path.join(entry_path, "solv")):
+                shutil.copy2(
+                    os.path.join(entry_path, "solv", name),
+                    os.path.join(solv_dir, repo_id + name[len(SOLV_FILE_PREFIX):])
+                )
+
+            # Mark the entry as recently used.
+            os.utime(entry_path)
+        except OSError as e:
+            log.warning("Failed to restore cached metadata for the '%s' repository: %s",
+                        repo_id, str(e))
+            self._update_statistics(misses=1)
+            return False
+
+        log.debug("Restored cached metadata for the '%s' repository.", repo_id)
+        self._update_statistics(hits=1, bytes_saved=self._get_size(entry_path))
+        return True
+
+    def store(self, md_hash, repo_id, repo_dir, solv_dir):
+        """Store metadata of a repository in the cache.
+
+        :param bytes md_hash: a hash of the repomd.xml file
+        :param str repo_id: an identifier of the repository
+        :param str repo_dir: a path to the DNF cache of the repository
+        :param str solv_dir: a path to the directory with solv files
+        """
+        entry_path = self._get_entry_path(md_hash)
+
+        if os.path.isdir(entry_path):
+            log.debug("Metadata for the '%s' repository are already cached.", repo_id)
+            return
+
+        if not os.path.isdir(os.path.join(repo_dir, "repodata")):
+            log.debug("No metadata to cache for the '%s' repository.", repo_id)
+            return
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=self._cache_dir, prefix=".")
+
+        try:
+            # Store the metadata.
+            shutil.copytree(
+                os.path.join(repo_dir, "repodata"),
+                os.path.join(tmp_path, "repodata")
+            )
+
+            # Store the solv files.
+            os.makedirs(os.path.join(tmp_path, "solv"))
+
+            for name in self._find_solv_files(repo_id, solv_dir):
+                shutil.copy2(
+                    os.path.join(solv_dir, name),
+                    os.path.join(tmp_path, "solv", SOLV_FILE_PREFIX + name[len(repo_id):])
+                )
+
+            # Publish the entry.
+            os.rename(tmp_path, entry_path)
+        except OSError as e:
+            log.warning("Failed to cache metadata for the '%s' repository: %s",
+                        repo_id, str(e))
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return
+
+        log.debug("Cached metadata for the '%s' repository.", repo_id)
+        self._evict()
+
+    @staticmethod
+    def _find_solv_files(repo_id, solv_dir):
+        """Find names of solv files generated for the given repository."""
+        names = []
+
+        for name in os.listdir(solv_dir):
+            if name == repo_id + ".solv":
+                names.append(name)
+            elif name.startswith(repo_id + "-") and name.endswith(".solvx"):
+                names.append(name)
+
+        return names
+
+    def _evict(self):
+        """Remove the least recently used entries if the cache is too big."""
+        with self._lock:
+            entries = []
+
+            for name in os.listdir(self._cache_dir):
+                path = os.path.join(self._cache_dir, name)
+
+                if name.startswith(".") or not os.path.isdir(path):
+                    continue
+
+                entries.append((os.stat(path).st_mtime, self._get_size(path), path))
+
+            total_size = sum(size for _mtime, size, _path in entries)
+
+            for _mtime, size, path in sorted(entries):
+                if total_size <= self._max_size:
+                    break
+
+                log.debug("Removing the cache entry %s.", path)
+                shutil.rmtree(path, ignore_errors=True)
+                total_size -= size
+
+    @staticmethod
+    def _get_size(path):
+        """Get a total size of files in the given directory."""
+        size = 0
+
+        for root, _dirs, files in os.walk(path):
+            for name in files:
+                size += os.path.getsize(os.path.join(root, name))
+
+        return size
+
+    def _update_statistics(self, hits=0, misses=0, bytes_saved=0):
+        """Update statistics of the cache."""
+        with self._lock:
+            self._statistics.hits += hits
+            self._statistics.misses += misses
+            self._statistics.bytes_saved += bytes_saved
@@ -290,16 +290,23 @@ def _get_biggest_mount_point(mount_points, sufficient):
     return max(sufficient, default=None, key=mount_points.get)
 
 
-def pick_download_location(dnf_manager):
+def pick_download_location(dnf_manager, prefetch_location=None):
     """Pick the download location.
 
+    The space used by prefetched packages is considered to be
+    free, because the packages can be reused at their location.
+
     :param dnf_manager: the DNF manager
+    :param prefetch_location: a path to prefetched packages or None
     :return: a path to the download location
     """
     download_size = dnf_manager.get_download_size()
     install_size = dnf_manager.get_installation_size()
     mount_points = get_free_space_map()
 
+    if prefetch_location:
+        _add_prefetched_space(mount_points, prefetch_location)
+
     # Try to find mount points that are sufficient for download and install.
     sufficient = _pick_mount_points(
         mount_points,
@@ -334,6 +341,26 @@ def pick_download_location(dnf_manager):
     return location
 
 
+def _add_prefetched_space(mount_points, prefetch_location):
+    """Add the space used by prefetched packages to their mount point.
+
+    :param mount_points: a dictionary of mount points and their available space
+    :param prefetch_location: a path to prefetched packages
+    """
+    for mount_point in mount_points:
+        if join_paths(mount_point, DNF_PACKAGE_CACHE_DIR_SUFFIX) != prefetch_location:
+            continue
+
+        used_space = Size(0)
+
+        for root, _dirs, files in os.walk(prefetch_location):
+            for name in files:
+                used_space += Size(os.path.getsize(os.path.join(root, name)))
+
+        log.debug("Prefetched packages use %s at %s.", used_space, mount_point)
+        mount_points[mount_point] += used_space
+
+
 def calculate_required_space(dnf_manager):
     """Calculate the space required for the installation.
 
@@ -0,0 +1,417 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import fcntl
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+import uuid
+import blivet.util
+
+from collections import namedtuple
+
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.core.util import execWithRedirect
+from pyanaconda.modules.common.errors.installation import PayloadInstallationError
+from pyanaconda.modules.payloads.payload.live_image.tree_copier import compile_exclusion_pattern
+
+log = get_module_logger(__name__)
+
+__all__ = ["BlockDeployment", "read_ext_superblock", "get_mounts"]
+
+# The size of a buffer for writing the image. It is aligned to pages.
+BLOCK_COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+# The alignment of direct writes.
+BLOCK_COPY_ALIGNMENT = 4096
+
+# File systems that can be deployed and resized.
+EXT_FILE_SYSTEMS = ("ext2", "ext3", "ext4")
+
+# The layout of the ext superblock.
+EXT_SUPERBLOCK_OFFSET = 1024
+EXT_SUPERBLOCK_SIZE = 1024
+EXT_MAGIC = 0xEF53
+EXT_FEATURE_COMPAT_HAS_JOURNAL = 0x04
+EXT_FEATURE_INCOMPAT_64BIT = 0x80
+
+# Features supported by ext2 and ext3. Other features require ext4.
+EXT2_FEATURE_RO_COMPAT_SUPP = 0x07
+EXT2_FEATURE_INCOMPAT_SUPP = 0x12
+EXT3_FEATURE_RO_COMPAT_SUPP = 0x07
+EXT3_FEATURE_INCOMPAT_SUPP = 0x16
+
+ExtSuperblock = namedtuple("ExtSuperblock", ["fstype", "size", "uuid", "label"])
+Mount = namedtuple("Mount", ["device", "mount_point", "fstype"])
+
+
+def read_ext_superblock(path):
+    """Read the superblock of an ext file system.
+
+    :param str path: a path to an image or a block device
+    :return: an instance of ExtSuperblock or None
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(EXT_SUPERBLOCK_OFFSET)
+            data = f.read(EXT_SUPERBLOCK_SIZE)
+    except OSError as e:
+        log.debug("Failed to read the superblock of %s: %s", path, e)
+        return None
+
+    if len(data) < EXT_SUPERBLOCK_SIZE:
+        return None
+
+    magic, = struct.unpack_from("<H", data, 0x38)
+
+    if magic != EXT_MAGIC:
+        return None
+
+    blocks_count, = struct.unpack_from("<I", data, 0x04)
+    log_block_size, = struct.unpack_from("<I", data, 0x18)
+    feature_compat, feature_incompat, feature_ro_compat = \
+        struct.unpack_from("<III", data, 0x5C)
+
+    if feature_incompat & EXT_FEATURE_INCOMPAT_64BIT:
+        blocks_count_hi, = struct.unpack_from("<I", data, 0x150)
+        blocks_count |= blocks_count_hi << 32
+
+    return ExtSuperblock(
+        fstype=_get_ext_type(feature_compat, feature_incompat, feature_ro_compat),
+        size=blocks_count * (1024 << log_block_size),
+        uuid=str(uuid.UUID(bytes=data[0x68:0x78])),
+        label=data[0x78:0x88].split(b"\0")[0].decode("utf-8", "replace"),
+    )
+
+
+def _get_ext_type(feature_compat, feature_incompat, feature_ro_compat):
+    """Get the type of an ext file system from its features.
+
+    The type is detected the same way as by blkid.
+
+    :return: ext2, ext3 or ext4
+    """
+    if feature_compat & EXT_FEATURE_COMPAT_HAS_JOURNAL:
+        if feature_ro_compat & ~EXT3_FEATURE_RO_COMPAT_SUPP \
+                or feature_incompat & ~EXT3_FEATURE_INCOMPAT_SUPP:
+            return "ext4"
+
+        return "ext3"
+
+    if feature_ro_compat & ~EXT2_FEATURE_RO_COMPAT_SUPP \
+            or feature_incompat & ~EXT2_FEATURE_INCOMPAT_SUPP:
+        return "ext4"
+
+    return "ext2"
+
+
+def get_mounts():
+    """Get the current mounts in the mount order.
+
+    :return: a list of Mount instances
+    """
+    mounts = []
+
+    def unescape(value):
+        return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), value)
+
+    with open("/proc/self/mounts") as f:
+        for line in f:
+            device, mount_point, fstype = line.split()[:3]
+            mounts.append(Mount(unescape(device), unescape(mount_point), fstype))
+
+    return mounts
+
+
+class BlockDeployment(object):
+    """Deployment of a file system image on a block device.
+
+    The image of the root file system is written to the block device
+    of the mounted system root and grown to the size of the device.
+    It is much faster than copying files, but it is possible only if
+    the system root is a single empty ext file system that is large
+    enough. Other mounts at the system root have to be virtual, for
+    example /dev or /proc. They are moved away during the deployment.
+    """
+
+    def __init__(self, image_path, sysroot, exclusions=()):
+        """Create a new deployment.
+
+        :param str image_path: a path to a file system image
+        :param str sysroot: a path to the system root
+        :param exclusions: rsync-like patterns of paths to remove
+        """
+        self._image_path = image_path
+        self._sysroot = os.path.normpath(sysroot)
+        self._exclusions = exclusions
+        self._image = None
+        self._root = None
+        self._submounts = []
+
+    def check(self):
+        """Check if the image can be deployed.
+
+        :return: True or False
+        """
+        self._image = read_ext_superblock(self._image_path)
+
+        if not self._image:
+            log.debug("The image %s is not an ext file system.", self._image_path)
+            return False
+
+        mounts = get_mounts()
+        root_mounts = [m for m in mounts if m.mount_point == self._sysroot]
+
+        if not root_mounts:
+            log.debug("The system root %s is not mounted.", self._sysroot)
+            return False
+
+        self._root = root_mounts[-1]
+
+        if self._root.fstype not in EXT_FILE_SYSTEMS:
+            log.debug("The system root has the %s file system.", self._root.fstype)
+            return False
+
+        # The deployed file system replaces the file system of the system root.
+        if self._root.fstype != self._image.fstype:
+            log.debug("The image has the %s file system, but the system root has %s.",
+                      self._image.fstype, self._root.fstype)
+            return False
+
+        self._submounts = [
+            m for m in mounts[mounts.index(self._root) + 1:]
+            if m.mount_point.startswith(self._sysroot + "/")
+        ]
+
+        for mount in self._submounts:
+            if mount.device.startswith("/"):
+                log.debug("The system root has a separate file system at %s.", mount.mount_point)
+                return False
+
+        try:
+            device_size = self._get_device_size(self._root.device)
+        except OSError as e:
+            log.debug("Failed to get the size of %s: %s", self._root.device, e)
+            return False
+
+        if device_size < self._image.size:
+            log.debug("The device %s is too small for the image.", self._root.device)
+            return False
+
+        allowed_names = {"lost+found"}
+
+        for mount in self._submounts:
+            path = os.path.relpath(mount.mount_point, self._sysroot)
+            allowed_names.add(path.split("/")[0])
+
+        if not set(os.listdir(self._sysroot)).issubset(allowed_names):
+            log.debug("The system root %s is not empty.", self._sysroot)
+            return False
+
+        return True
+
+    @staticmethod
+    def _get_device_size(device):
+        """Get the size of a block device in bytes."""
+        fd = os.open(device, os.O_RDONLY)
+
+        try:
+            return os.lseek(fd, 0, os.SEEK_END)
+        finally:
+            os.close(fd)
+
+    @property
+    def image_size(self):
+        """The size of the image in bytes.
+
+        It is available after the check.
+        """
+        return self._image.size if self._image else 0
+
+    def deploy(self, callback=None):
+        """Deploy the checked image.
+
+        :param callback: a function called with the written size in bytes
+        :raise: PayloadInstallationError if the deployment fails
+        """
+        device = self._root.device
+        target = read_ext_superblock(device)
+
+        if not target:
+            raise PayloadInstallationError(
+                "Failed to read the file system of {}.".format(device)
+            )
+
+        self._run("mount", ["--make-rprivate", "/"])
+        moved_mounts = []
+
+        try:
+            self._move_submounts(moved_mounts)
+
+            if blivet.util.umount(mountpoint=self._sysroot) != 0:
+                raise PayloadInstallationError(
+                    "Failed to unmount {}.".format(self._sysroot)
+                )
+
+            try:
+                self._write_image(device, callback)
+
+                # The file system has to be checked before the resize. Keep
+                # the UUID and the label of the target, so the system can find it.
+                self._run("e2fsck", ["-f", "-p", device], valid_codes=(0, 1))
+                self._run("tune2fs", ["-U", target.uuid, "-L", target.label, device])
+                self._run("resize2fs", [device])
+            except BaseException:
+                # Mount the system root again, but don't hide the original error.
+                try:
+                    self._mount_root(device)
+                except PayloadInstallationError as e:
+                    log.error("Failed to recover the system root: %s", e)
+
+                raise
+
+            self._mount_root(device)
+            self._remove_excluded_paths()
+        finally:
+            # Always restore the submounts.
+            self._restore_submounts(moved_mounts)
+
+    def _mount_root(self, device):
+        """Mount the device at the system root."""
+        rc = blivet.util.mount(device, self._sysroot, fstype=self._root.fstype)
+
+        if rc != 0:
+            raise PayloadInstallationError(
+                "Failed to mount {} at {}.".format(device, self._sysroot)
+            )
+
+    @staticmethod
+    def _run(cmd, args, valid_codes=(0, )):
+        """Run a command and check its return code."""
+        rc = execWithRedirect(cmd, args)
+
+        if rc not in valid_codes:
+            raise PayloadInstallationError(
+                "Failed to deploy the image: {} exited with code {}".format(cmd, rc)
+            )
+
+    def _get_top_submounts(self):
+        """Get submounts that are not nested in other submounts."""
+        mount_points = []
+
+        for mount in self._submounts:
+            if any(mount.mount_point.startswith(p + "/") for p in mount_points):
+                continue
+
+            if mount.mount_point not in mount_points:
+                mount_points.append(mount.mount_point)
+
+        return mount_points
+
+    def _move_submounts(self, moved_mounts):
+        """Move the virtual submounts of the system root away.
+
+        :param moved_mounts: a list to extend with tuples of
+                             the original and the temporary mount point
+        """
+        for mount_point in self._get_top_submounts():
+            temporary = tempfile.mkdtemp(prefix="anaconda-deploy-")
+            self._run("mount", ["--move", mount_point, temporary])
+            moved_mounts.append((mount_point, temporary))
+
+    def _restore_submounts(self, moved_mounts):
+        """Move the virtual submounts back to the system root."""
+        for mount_point, temporary in moved_mounts:
+            os.makedirs(mount_point, exist_ok=True)
+            self._run("mount", ["--move", temporary, mount_point])
+            os.rmdir(temporary)
+
+    def _write_image(self, device, callback=None):
+        """Write the image to the device with large aligned writes."""
+        log.debug("Writing %s to %s.", self._image_path, device)
+
+        # The anonymous mapping is aligned to pages.
+        view = memoryview(mmap.mmap(-1, BLOCK_COPY_BUFFER_SIZE))
+        fd = os.open(device, os.O_WRONLY | os.O_DIRECT)
+
+        try:
+            with open(self._image_path, "rb", buffering=0) as f:
+                written_size = 0
+
+                while written_size < self._image.size:
+                    size = f.readinto(view[:min(BLOCK_COPY_BUFFER_SIZE,
+                                                self._image.size - written_size)])
+
+                    if not size:
+                        raise PayloadInstallationError(
+                            "Failed to deploy the image: unexpected end of the image"
+                        )
+
+                    # Direct writes have to be aligned.
+                    if size % BLOCK_COPY_ALIGNMENT:
+                        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+                        fcntl.fcntl(fd, fcntl.F_SETFL, flags & ~os.O_DIRECT)
+
+                    chunk = view[:size]
+
+                    while chunk:
+                        chunk = chunk[os.write(fd, chunk):]
+
+                    written_size += size
+
+                    if callback:
+                        callback(written_size)
+
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _remove_excluded_paths(self):
+        """Remove the excluded paths from the deployed image."""
+        for pattern in self._exclusions:
+            regex, directory_only = compile_exclusion_pattern(pattern)
+            parent = os.path.dirname(pattern.strip("/"))
+
+            # Only anchored patterns with a plain parent are supported.
+            if not pattern.startswith("/") or any(c in parent for c in "*?["):
+                log.debug("Skipping the exclusion pattern %s.", pattern)
+                continue
+
+            parent_path = os.path.join(self._sysroot, parent)
+
+            if not os.path.isdir(parent_path):
+                continue
+
+            for entry in os.scandir(parent_path):
+                path = os.path.join(parent, entry.name)
+                is_directory = entry.is_dir(follow_symlinks=False)
+
+                if directory_only and not is_directory:
+                    continue
+
+                if not regex.match(path):
+                    continue
+
+                log.debug("Removing the excluded path %s.", path)
+
+                if is_directory:
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
@@ -17,26 +17,67 @@
 #
 import glob
 import hashlib
+import itertools
 import os
-import stat
+import subprocess
+import tempfile
+import threading
 import requests
 import blivet.util
 
-from pyanaconda.anaconda_loggers import get_module_logger
-from pyanaconda.core.constants import NETWORK_CONNECTION_TIMEOUT
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from pyanaconda.anaconda_logging import program_log_lock
+from pyanaconda.anaconda_loggers import get_module_logger, get_program_logger
+from pyanaconda.core.configuration.anaconda import conf
+from pyanaconda.core.constants import NETWORK_CONNECTION_TIMEOUT, IMAGE_COPIER_NATIVE
 from pyanaconda.core.i18n import _
-from pyanaconda.core.util import execWithRedirect, requests_session
+from pyanaconda.core.util import execWithRedirect, requests_session, startProgram
 from pyanaconda.core.path import join_paths
 from pyanaconda.core.string import lower_ascii
 from pyanaconda.modules.common.structures.live_image import LiveImageConfigurationData
 from pyanaconda.modules.common.task import Task
 from pyanaconda.modules.common.errors.installation import PayloadInstallationError
+from pyanaconda.modules.payloads.base.download_cache import get_download_cache
+from pyanaconda.modules.payloads.payload.live_image.block_deployment import BlockDeployment
 from pyanaconda.modules.payloads.payload.live_image.download_progress import DownloadProgress
 from pyanaconda.modules.payloads.payload.live_image.installation_progress import \
-    InstallationProgress
+    InstallationProgress, read_output_lines, parse_rsync_progress
+from pyanaconda.modules.payloads.payload.live_image.tree_copier import TreeCopier
 from pyanaconda.modules.payloads.payload.live_image.utils import get_proxies_from_option
 
 log = get_module_logger(__name__)
+program_log = get_program_logger()
+
+# The number of parallel connections of a segmented download.
+IMAGE_DOWNLOAD_SEGMENTS = 4
+
+# The minimal size of a segment of a segmented download.
+IMAGE_DOWNLOAD_MIN_SEGMENT_SIZE = 64 * 1024 * 1024
+
+# The number of attempts to resume an interrupted segment.
+IMAGE_DOWNLOAD_RETRIES = 5
+
+# The size of a chunk of a downloaded image.
+IMAGE_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# The size of a buffer for the checksum calculation.
+IMAGE_CHECKSUM_BUFFER_SIZE = 8 * 1024 * 1024
+
+# The rsync-like patterns excluded from the installed image.
+IMAGE_EXCLUSIONS = [
+    "/dev/",
+    "/proc/",
+    "/tmp/*",
+    "/sys/",
+    "/run/",
+    "/boot/*rescue*",
+    "/boot/loader/",
+    "/boot/efi/loader/",
+    "/etc/machine-id",
+    "/etc/machine-info",
+]
 
 
 class DownloadImageTask(Task):
@@ -53,13 +94,26 @@ class DownloadImageTask(Task):
         self._url = configuration.url
         self._proxy = configuration.proxy
         self._ssl_verify = configuration.ssl_verification_enabled
+        self._checksum = configuration.checksum
         self._download_path = download_path
+        self._calculated_checksum = None
 
     @property
     def name(self):
         """Name of the task."""
         return "Download an image"
 
+    @property
+    def calculated_checksum(self):
+        """The SHA-256 checksum calculated during the download.
+
+        The checksum is calculated only if the image was
+        downloaded and the expected checksum is known.
+
+        :return: a checksum in hex or None
+        """
+        return self._calculated_checksum
+
     def run(self):
         """Run the task.
 
@@ -75,13 +129,17 @@ class DownloadImageTask(Task):
             log.info("Nothing to download.")
             return self._url.removeprefix("file://")
 
+        if self._restore_cached_image():
+            log.info("Nothing to download.")
+            return self._download_path
+
         with requests_session() as session:
             try:
                 # Send a GET request to the image URL.
                 response = self._send_request(session)
 
                 # Download the image to a file.
-                self._download_image(response)
+                self._download_image(session, response)
 
             except requests.exceptions.RequestException as e:
                 raise PayloadInstallationError(
@@ -90,6 +148,22 @@ class DownloadImageTask(Task):
 
         return self._download_path
 
+    def _restore_cached_image(self):
+        """Restore the image from the download cache.
+
+        The image is identified by its checksum. It will be
+        verified by the VerifyImageChecksumTask task later.
+
+        :return: True if the image was restored, otherwise False
+        """
+        cache = get_download_cache()
+
+        if not cache or not self._checksum:
+            return False
+
+        self.report_progress(_("Restoring the image from the download cache"))
+        return cache.restore("sha256", lower_ascii(self._checksum), self._download_path)
+
     def _send_request(self, session):
         """Send a GET request to the image URL."""
         proxies = get_proxies_from_option(
@@ -105,23 +179,72 @@ class DownloadImageTask(Task):
         response.raise_for_status()
         return response
 
-    def _download_image(self, response):
-        """Download the image to a file."""
+    def _send_range_request(self, session, start, end):
+        """Send a GET request for a range of the image."""
+        proxies = get_proxies_from_option(
+            self._proxy
+        )
+        response = session.get(
+            url=self._url,
+            proxies=proxies,
+            verify=self._ssl_verify,
+            stream=True,
+            timeout=NETWORK_CONNECTION_TIMEOUT,
+            headers={"Range": "bytes={}-{}".format(start, end)},
+        )
+        response.raise_for_status()
+
+        if response.status_code != 206:
+            raise requests.exceptions.InvalidHeader(
+                "The server ignored the range request."
+            )
+
+        return response
+
+    def _download_image(self, session, response):
+        """Download the image to a file.
+
+        Calculate the checksum of the image during the download,
+        so the image does not have to be read again.
+        """
+        sha256 = hashlib.sha256() if self._checksum else None
+
+        # Download the image in segments if possible.
+        if self._can_download_segments(response):
+            response.close()
+            total_size = int(self._get_content_length(response))
+            self._segmented_download(session, total_size, sha256)
+
         # Handle no content length header.
-        if not self._get_content_length(response):
-            download = self._direct_download
+        elif not self._get_content_length(response):
+            with open(self._download_path, "wb") as image_file:
+                self._direct_download(response, image_file, sha256)
+
         else:
-            download = self._stream_download
+            with open(self._download_path, "wb") as image_file:
+                self._stream_download(response, image_file, sha256)
 
-        # Download the image to a file.
-        with open(self._download_path, "wb") as image_file:
-            download(response, image_file)
+        if sha256:
+            self._calculated_checksum = sha256.hexdigest()
+            log.debug("sha256 of %s: %s", self._download_path, self._calculated_checksum)
 
     def _get_content_length(self, response):
         """Get the content length value."""
         return response.headers.get('content-length')
 
-    def _direct_download(self, response, image_file):
+    def _can_download_segments(self, response):
+        """Can we download the image in multiple segments?
+
+        The server has to advertise support for range requests
+        and the image has to be large enough.
+        """
+        if response.headers.get('accept-ranges', '').lower() != 'bytes':
+            return False
+
+        total_size = int(self._get_content_length(response) or 0)
+        return total_size >= 2 * IMAGE_DOWNLOAD_MIN_SEGMENT_SIZE
+
+    def _direct_download(self, response, image_file, sha256=None):
         """Download the image at once."""
         log.warning(
             "content-length header is missing for the installation "
@@ -130,9 +253,13 @@ class DownloadImageTask(Task):
 
         self.report_progress(_("Downloading {}").format(self._url))
         image_file.write(response.content)
+
+        if sha256:
+            sha256.update(response.content)
+
         log.debug("Downloaded %s.", self._url)
 
-    def _stream_download(self, response, image_file):
+    def _stream_download(self, response, image_file, sha256=None):
         """Download the image in 1 MB chunks."""
         total_size = int(self._get_content_length(response))
 
@@ -145,32 +272,233 @@ class DownloadImageTask(Task):
         progress.start()
         downloaded_size = 0
 
-        for chunks in response.iter_content(1024 * 1024):
+        for chunks in response.iter_content(IMAGE_DOWNLOAD_CHUNK_SIZE):
             if not chunks:
                 continue
 
             image_file.write(chunks)
-            image_file.flush()
+
+            if sha256:
+                sha256.update(chunks)
 
             downloaded_size += len(chunks)
             progress.update(downloaded_size)
 
         progress.end()
 
+    @staticmethod
+    def _get_segments(total_size):
+        """Split the image into segments.
+
+        :param int total_size: a size of the image in bytes
+        :return: a list of inclusive byte ranges
+        """
+        count = min(IMAGE_DOWNLOAD_SEGMENTS, total_size // IMAGE_DOWNLOAD_MIN_SEGMENT_SIZE)
+        count = max(count, 1)
+        segment_size = -(-total_size // count)
+
+        return [
+            (start, min(start + segment_size, total_size) - 1)
+            for start in range(0, total_size, segment_size)
+        ]
+
+    def _segmented_download(self, session, total_size, sha256=None):
+        """Download the image in segments over multiple connections.
+
+        Every segment is written to its place in a preallocated file.
+        An interrupted segment is resumed from the last written byte.
+        The checksum is calculated from the downloaded beginning of
+        the file while it is still in the page cache.
+        """
+        segments = self._get_segments(total_size)
+        log.debug("Downloading %s in %s segments.", self._url, len(segments))
+
+        progress = DownloadProgress(
+            url=self._url,
+            callback=self.report_progress,
+            total_size=total_size,
+        )
+        condition = threading.Condition()
+        downloaded_sizes = [0] * len(segments)
+
+        def update_downloaded_size(index, size):
+            with condition:
+                downloaded_sizes[index] = size
+                condition.notify_all()
+
+        def notify_finished_segment(future):
+            with condition:
+                condition.notify_all()
+
+        fd = os.open(self._download_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+
+        try:
+            self._preallocate_file(fd, total_size)
+            progress.start()
+
+            with ThreadPoolExecutor(
+                max_workers=len(segments),
+                thread_name_prefix="AnaImageDownloadThread"
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        self._download_segment, session, fd, start, end,
+                        partial(update_downloaded_size, index)
+                    )
+                    for index, (start, end) in enumerate(segments)
+                ]
+
+                for future in futures:
+                    future.add_done_callback(notify_finished_segment)
+
+                hashed_size = 0
+
+                while True:
+                    with condition:
+                        done = all(f.done() for f in futures)
+
+                        if not done:
+                            condition.wait(timeout=1)
+
+                        sizes = list(downloaded_sizes)
+
+                    progress.update(sum(sizes))
+
+                    if sha256:
+                        contiguous_size = self._get_contiguous_size(segments, sizes)
+                        hashed_size = self._hash_downloaded_data(
+                            fd, sha256, hashed_size, contiguous_size
+                        )
+
+                    if done:
+                        break
+
+                for future in futures:
+                    future.result()
+        finally:
+            os.close(fd)
+
+        progress.end()
+        log.debug("Downloaded %s.", self._url)
+
+    @staticmethod
+    def _get_contiguous_size(segments, downloaded_sizes):
+        """Get the size of the downloaded beginning of the image.
+
+        :param segments: a list of inclusive byte ranges
+        :param downloaded_sizes: a list of downloaded sizes of the segments
+        :return: a size in bytes
+        """
+        contiguous_size = 0
+
+        for (start, end), downloaded_size in zip(segments, downloaded_sizes):
+            contiguous_size += downloaded_size
+
+            if downloaded_size <= end - start:
+                break
+
+        return contiguous_size
+
+    @staticmethod
+    def _hash_downloaded_data(fd, sha256, hashed_size, downloaded_size):
+        """Calculate the checksum of the newly downloaded data.
+
+        :param int fd: a file descriptor of the image file
+        :param sha256: a hash object to update
+        :param int hashed_size: a size of the already hashed data
+        :param int downloaded_size: a size of the downloaded beginning
+        :return: a new size of the hashed data
+        """
+        while hashed_size < downloaded_size:
+            data = os.pread(
+                fd,
+                min(downloaded_size - hashed_size, IMAGE_CHECKSUM_BUFFER_SIZE),
+                hashed_size
+            )
+
+            if not data:
+                break
+
+            sha256.update(data)
+            hashed_size += len(data)
+
+        return hashed_size
+
+    @staticmethod
+    def _preallocate_file(fd, size):
+        """Preallocate the space for the downloaded image."""
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError as e:
+            log.debug("Failed to preallocate the image: %s", str(e))
+            os.ftruncate(fd, size)
+
+    def _download_segment(self, session, fd, start, end, callback):
+        """Download one segment of the image.
+
+        :param session: a requests session
+        :param int fd: a file descriptor of the image file
+        :param int start: the first byte of the segment
+        :param int end: the last byte of the segment
+        :param callback: a function called with the downloaded size
+        """
+        offset = start
+        attempt = 0
+
+        while offset <= end:
+            try:
+                response = self._send_range_request(session, offset, end)
+
+                with response:
+                    for chunk in response.iter_content(IMAGE_DOWNLOAD_CHUNK_SIZE):
+                        if not chunk:
+                            continue
+
+                        chunk = chunk[:end - offset + 1]
+                        written = 0
+
+                        while written < len(chunk):
+                            written += os.pwrite(fd, chunk[written:], offset + written)
+
+                        offset += len(chunk)
+                        callback(offset - start)
+
+                        if offset > end:
+                            break
+
+                if offset <= end:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        "The segment ended prematurely."
+                    )
+
+            except requests.exceptions.RequestException as e:
+                attempt += 1
+
+                if attempt > IMAGE_DOWNLOAD_RETRIES:
+                    raise
+
+                log.debug(
+                    "Resuming the download of %s at %s after an error: %s",
+                    self._url, offset, str(e)
+                )
+
 
 class VerifyImageChecksumTask(Task):
     """Task to verify the checksum of the downloaded image."""
 
-    def __init__(self, configuration: LiveImageConfigurationData, image_path):
+    def __init__(self, configuration: LiveImageConfigurationData, image_path,
+                 calculated_checksum=None):
         """Create a new task.
 
         :param configuration: a configuration of a remote image
         :type configuration: an instance of LiveImageConfigurationData
         :param image_path: a path to the image
+        :param calculated_checksum: a checksum calculated during the download or None
         """
         super().__init__()
         self._image_path = image_path
         self._checksum = configuration.checksum
+        self._calculated_checksum = calculated_checksum
 
     @property
     def name(self):
@@ -184,7 +512,12 @@ class VerifyImageChecksumTask(Task):
 
         self.report_progress(_("Checking image checksum"))
         expected_checksum = self._normalize_checksum(self._checksum)
-        calculated_checksum = self._calculate_checksum(self._image_path)
+
+        if self._calculated_checksum:
+            log.debug("Using the checksum calculated during the download.")
+            calculated_checksum = self._normalize_checksum(self._calculated_checksum)
+        else:
+            calculated_checksum = self._calculate_checksum(self._image_path)
 
         if expected_checksum != calculated_checksum:
             log.error("'%s' does not match '%s'", calculated_checksum, expected_checksum)
@@ -192,22 +525,44 @@ class VerifyImageChecksumTask(Task):
 
         log.debug("Checksum of the image does match.")
 
+        # Share the verified image with other installations.
+        cache = get_download_cache()
+
+        if cache:
+            cache.store("sha256", expected_checksum, self._image_path)
+
     @staticmethod
     def _normalize_checksum(checksum):
         """Normalize the given checksum."""
         return lower_ascii(checksum)
 
-    @staticmethod
-    def _calculate_checksum(file_path):
-        """Calculate the file checksum."""
+    def _calculate_checksum(self, file_path):
+        """Calculate the file checksum.
+
+        Read the file into one large reused buffer.
+        """
         sha256 = hashlib.sha256()
+        buffer = bytearray(IMAGE_CHECKSUM_BUFFER_SIZE)
+        view = memoryview(buffer)
+        last_pct = 0
+
+        with open(file_path, "rb", buffering=0) as f:
+            total_size = os.fstat(f.fileno()).st_size
+            hashed_size = 0
 
-        with open(file_path, "rb") as f:
             while True:
-                data = f.read(1024 * 1024)
-                if not data:
+                size = f.readinto(buffer)
+                if not size:
                     break
-                sha256.update(data)
+
+                sha256.update(view[:size])
+                hashed_size += size
+
+                pct = int(100 * hashed_size / total_size)
+
+                if pct != last_pct:
+                    last_pct = pct
+                    self.report_progress(_("Checking image checksum ({}%)").format(pct))
 
         checksum = sha256.hexdigest()
         log.debug("sha256 of %s: %s", file_path, checksum)
@@ -305,6 +660,20 @@ class MountImageTask(Task):
 class InstallFromTarTask(Task):
     """Task to install the payload from tarball."""
 
+    # Magic numbers of compressed tarballs and the tar options to decompress them.
+    # They are the same as the magic numbers detected by GNU tar for files.
+    COMPRESSION_OPTIONS = [
+        (b"\x1f\x9d", "--compress"),
+        (b"\x1f\x8b", "--gzip"),
+        (b"BZh", "--bzip2"),
+        (b"LZIP", "--lzip"),
+        (b"\xffLZMA", "--lzma"),
+        (b"\x5d\x00\x00", "--lzma"),
+        (b"\x89LZO", "--lzop"),
+        (b"\xfd7zXZ\x00", "--xz"),
+        (b"\x28\xb5\x2f\xfd", "--zstd"),
+    ]
+
     def __init__(self, sysroot, tarfile):
         """Create a new task.
 
@@ -320,36 +689,102 @@ class InstallFromTarTask(Task):
         """The name of the task."""
         return "Install the payload from a tarball"
 
-    @property
-    def _installation_size(self):
-        """The installation size of the archive.
-
-        Use 2x the archive's size to estimate the size of the install.
+    def run(self):
+        """Run the task.
 
-        :return: a size in bytes
+        The tarball is passed to the tar command by this task,
+        so the progress is reported from the consumed bytes.
         """
-        return os.stat(self._tarfile)[stat.ST_SIZE] * 2
-
-    def run(self):
-        """Run the task."""
-        with self._monitor_progress():
-            self._install_tar()
+        try:
+            with open(self._tarfile, "rb") as f:
+                total_size = os.fstat(f.fileno()).st_size
+                chunks = iter(partial(f.read, IMAGE_DOWNLOAD_CHUNK_SIZE), b"")
+                rc = self._install_tar(chunks, total_size)
+        except OSError as e:
+            msg = "Failed to install tar: {}".format(e)
+            raise PayloadInstallationError(msg) from None
 
-    def _monitor_progress(self):
-        """Get a progress monitor."""
-        return InstallationProgress(
-            sysroot=self._sysroot,
-            callback=self.report_progress,
-            installation_size=self._installation_size,
-        )
+        if rc != 0:
+            log.warning("tar exited with code %s", rc)
 
-    def _install_tar(self):
+    def _install_tar(self, chunks, total_size, sha256=None):
         """Run installation of the payload from a tarball.
 
         Preserve ACL's, xattrs, and SELinux context.
+
+        :param chunks: an iterator of chunks of the tarball
+        :param int total_size: a size of the tarball or 0
+        :param sha256: a hash object to update or None
+        :return: a return code of the tar command
         """
+        first_chunk = next((chunk for chunk in chunks if chunk), b"")
+
         cmd = "tar"
-        args = [
+        args = self._get_tar_options()
+        args += self._get_compression_options(first_chunk)
+        args += ["-xf", "-", "-C", self._sysroot]
+
+        progress = InstallationProgress(
+            callback=self.report_progress,
+            installation_size=total_size,
+        )
+        consumed_size = 0
+
+        with tempfile.TemporaryFile() as output:
+            process = startProgram(
+                [cmd] + args,
+                stdin=subprocess.PIPE,
+                stdout=output,
+                stderr=subprocess.STDOUT,
+            )
+
+            try:
+                progress.start()
+
+                for chunk in itertools.chain([first_chunk], chunks):
+                    if not chunk:
+                        continue
+
+                    process.stdin.write(chunk)
+
+                    if sha256:
+                        sha256.update(chunk)
+
+                    consumed_size += len(chunk)
+                    progress.update(consumed_size)
+
+                process.stdin.close()
+            except BrokenPipeError:
+                log.error("The tar command has stopped to read the tarball.")
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+
+            rc = process.wait()
+            self._log_output(output, rc)
+
+        if rc == 0:
+            progress.end()
+
+        return rc
+
+    @staticmethod
+    def _log_output(output, rc):
+        """Log the output of the tar command."""
+        output.seek(0)
+        lines = output.read().decode("utf-8", "replace").splitlines()
+
+        with program_log_lock:
+            for line in lines:
+                program_log.info(line.strip())
+
+            program_log.debug("Return code: %d", rc)
+
+    @staticmethod
+    def _get_tar_options():
+        """Get options of the tar command for the extraction."""
+        return [
             "--numeric-owner",
             "--selinux",
             "--acls",
@@ -365,57 +800,191 @@ class InstallFromTarTask(Task):
             "--exclude", "./boot/efi/loader",
             "--exclude", "./etc/machine-id",
             "--exclude", "./etc/machine-info",
-            "-xaf", self._tarfile,
-            "-C", self._sysroot
         ]
 
-        try:
-            execWithRedirect(cmd, args)
-        except (OSError, RuntimeError) as e:
-            msg = "Failed to install tar: {}".format(e)
-            raise PayloadInstallationError(msg) from None
+    def _get_compression_options(self, data):
+        """Get tar options to decompress the tarball.
+
+        The tar command cannot detect the compression of the standard
+        input, so it is detected from the beginning of the tarball.
+
+        :param bytes data: the beginning of the tarball
+        :return: a list of tar options
+        """
+        for magic, option in self.COMPRESSION_OPTIONS:
+            if data.startswith(magic):
+                return [option]
+
+        return []
+
+
+class InstallFromTarStreamTask(InstallFromTarTask):
+    """Task to install the payload from a tarball streamed from the network."""
+
+    def __init__(self, sysroot, configuration: LiveImageConfigurationData):
+        """Create a new task.
+
+        :param sysroot: a path to the system root
+        :param configuration: a configuration of a remote tarball
+        :type configuration: an instance of LiveImageConfigurationData
+        """
+        super().__init__(sysroot, tarfile="-")
+        self._url = configuration.url
+        self._proxy = configuration.proxy
+        self._ssl_verify = configuration.ssl_verification_enabled
+        self._checksum = configuration.checksum
+
+    @property
+    def name(self):
+        """The name of the task."""
+        return "Install the payload from a streamed tarball"
+
+    def run(self):
+        """Run the task.
+
+        Download the tarball and pass it to the tar command without
+        storing it on the disk. The checksum of the tarball is
+        calculated during the download and verified at the end.
+        """
+        log.info("Streaming the tarball...")
+        sha256 = hashlib.sha256() if self._checksum else None
+
+        with requests_session() as session:
+            try:
+                response = session.get(
+                    url=self._url,
+                    proxies=get_proxies_from_option(self._proxy),
+                    verify=self._ssl_verify,
+                    stream=True,
+                    timeout=NETWORK_CONNECTION_TIMEOUT,
+                )
+                response.raise_for_status()
+
+                rc = self._install_tar(
+                    response.iter_content(IMAGE_DOWNLOAD_CHUNK_SIZE),
+                    int(response.headers.get('content-length') or 0),
+                    sha256
+                )
+
+            except requests.exceptions.RequestException as e:
+                raise PayloadInstallationError(
+                    "Error while downloading the image: {}".format(e)
+                ) from e
+
+            except OSError as e:
+                msg = "Failed to install tar: {}".format(e)
+                raise PayloadInstallationError(msg) from None
+
+        if rc != 0:
+            raise PayloadInstallationError("Failed to install tar: {}".format(rc))
+
+        if sha256:
+            self._verify_checksum(sha256.hexdigest())
+
+    def _verify_checksum(self, calculated_checksum):
+        """Verify the checksum of the streamed tarball."""
+        expected_checksum = lower_ascii(self._checksum)
+
+        if expected_checksum != calculated_checksum:
+            log.error("'%s' does not match '%s'", calculated_checksum, expected_checksum)
+            raise PayloadInstallationError("Checksum of the image does not match.")
+
+        log.debug("Checksum of the image does match.")
 
 
 class InstallFromImageTask(Task):
     """Task to install the payload from image."""
 
-    def __init__(self, sysroot, mount_point):
+    def __init__(self, sysroot, mount_point, image_path=None):
         """Create a new task.
 
+        The image is deployed at the block level if it is possible
+        and enabled in the configuration. Otherwise, the content of
+        the mounted image is copied file by file.
+
         :param sysroot: a path to the system root
         :param mount_point: a path to the mounted image
+        :param image_path: a path to the file system image or None
         """
         super().__init__()
         self._sysroot = sysroot
         self._mount_point = mount_point
+        self._image_path = image_path
 
     @property
     def name(self):
         """The name of the task."""
         return "Install the payload from image"
 
-    @property
-    def _installation_size(self):
-        """The installation size of the image.
+    def run(self):
+        """Run the task."""
+        deployment = self._get_block_deployment()
 
-        :return: a size in bytes
+        if deployment:
+            self._deploy_image(deployment)
+            return
+
+        if conf.payload.live_image_copier == IMAGE_COPIER_NATIVE:
+            try:
+                self._copy_image()
+                return
+            except OSError as e:
+                log.error("Failed to copy the image: %s", e)
+                log.info("Falling back to rsync.")
+
+        self._install_image()
+
+    def _get_block_deployment(self):
+        """Get the block deployment of the image if it is possible.
+
+        :return: an instance of BlockDeployment or None
         """
-        source = os.statvfs(self._mount_point)
-        return source.f_frsize * (source.f_blocks - source.f_bfree)
+        if not conf.payload.block_copy_live_image or not self._image_path:
+            return None
 
-    def run(self):
-        """Run the task."""
-        with self._monitor_progress():
-            self._install_image()
+        deployment = BlockDeployment(self._image_path, self._sysroot, IMAGE_EXCLUSIONS)
+
+        if not deployment.check():
+            log.info("The image can't be deployed at the block level. Copying files.")
+            return None
+
+        return deployment
+
+    def _deploy_image(self, deployment):
+        """Deploy the image at the block level.
+
+        The progress is calculated from the size of the written data.
+        """
+        progress = InstallationProgress(
+            callback=self.report_progress,
+            installation_size=deployment.image_size
+        )
+
+        progress.start()
+
+        try:
+            deployment.deploy(callback=progress.update)
+        except OSError as e:
+            msg = "Failed to deploy the image: {}".format(e)
+            raise PayloadInstallationError(msg) from None
 
-    def _monitor_progress(self):
-        """Get a progress monitor."""
-        return InstallationProgress(
-            sysroot=self._sysroot,
+        progress.end()
+
+    def _copy_image(self):
+        """Copy the content of the image with the native copier.
+
+        The progress is calculated from the size of the copied files.
+        """
+        copier = TreeCopier(self._mount_point, self._sysroot, IMAGE_EXCLUSIONS)
+        progress = InstallationProgress(
             callback=self.report_progress,
-            installation_size=self._installation_size,
+            installation_size=copier.scan()
         )
 
+        progress.start()
+        copier.copy(callback=progress.update)
+        progress.end()
+
     def _install_image(self):
         """Run installation of the payload from image.
 
@@ -425,27 +994,28 @@ class InstallFromImageTask(Task):
 
         Use a trailing slash on the source directory to copy the content
         instead of the directory itself. See `man rsync`.
+
+        The progress is reported by rsync. Build the whole file list
+        before the transfer, so the reported percentage is accurate.
         """
         cmd = "rsync"
         args = [
             "-pogAXtlHrDx",
             "--stats",
-            "--exclude", "/dev/",
-            "--exclude", "/proc/",
-            "--exclude", "/tmp/*",
-            "--exclude", "/sys/",
-            "--exclude", "/run/",
-            "--exclude", "/boot/*rescue*",
-            "--exclude", "/boot/loader/",
-            "--exclude", "/boot/efi/loader/",
-            "--exclude", "/etc/machine-id",
-            "--exclude", "/etc/machine-info",
+            "--info=progress2",
+            "--no-inc-recursive",
+        ]
+
+        for pattern in IMAGE_EXCLUSIONS:
+            args.extend(["--exclude", pattern])
+
+        args.extend([
             os.path.normpath(self._mount_point) + "/",
             self._sysroot
-        ]
+        ])
 
         try:
-            rc = execWithRedirect(cmd, args)
+            rc = self._run_rsync(cmd, args)
         except (OSError, RuntimeError) as e:
             msg = "Failed to install image: {}".format(e)
             raise PayloadInstallationError(msg) from None
@@ -456,6 +1026,35 @@ class InstallFromImageTask(Task):
                 "{} exited with code {}".format(cmd, rc)
             )
 
+    def _run_rsync(self, cmd, args):
+        """Run rsync and report its progress.
+
+        :return: a return code of rsync
+        """
+        progress = InstallationProgress(callback=self.report_progress)
+        process = startProgram([cmd] + args, stderr=subprocess.STDOUT)
+        progress.start()
+
+        for line in read_output_lines(process.stdout):
+            result = parse_rsync_progress(line)
+
+            if result:
+                progress.update_percentage(result[1])
+                continue
+
+            with program_log_lock:
+                program_log.info(line.strip())
+
+        rc = process.wait()
+
+        with program_log_lock:
+            program_log.debug("Return code: %d", rc)
+
+        if rc == 0:
+            progress.end()
+
+        return rc
+
 
 class RemoveImageTask(Task):
     """Task to remove the downloaded image."""
@@ -15,109 +15,122 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
-import os
-import time
+import re
 
 from blivet.size import Size
 
 from pyanaconda.anaconda_loggers import get_module_logger
-from pyanaconda.core.constants import THREAD_LIVE_PROGRESS
 from pyanaconda.core.i18n import _
-from pyanaconda.core.path import join_paths
-from pyanaconda.modules.common.constants.objects import DEVICE_TREE
-from pyanaconda.modules.common.constants.services import STORAGE
-from pyanaconda.modules.common.task.cancellable import Cancellable
-from pyanaconda.core.threads import thread_manager
 
 log = get_module_logger(__name__)
 
-__all__ = ["InstallationProgress"]
+__all__ = ["InstallationProgress", "read_output_lines", "parse_rsync_progress"]
 
+# The progress line of rsync --info=progress2, for example:
+#   1,238,099  12%  117.98MB/s    0:00:01 (xfr#51, to-chk=169/396)
+RSYNC_PROGRESS_PATTERN = re.compile(r"^\s*([\d,]+)\s+(\d+)%\s")
 
-class InstallationProgress(Cancellable):
-    """Progress monitor of the image installation."""
 
-    def __init__(self, sysroot, installation_size, callback):
+class InstallationProgress(object):
+    """Progress reporter of the image installation.
+
+    The progress is reported from the amount of data processed
+    by the installation tool. It doesn't touch the target file
+    systems. The callback is called only if the percentage
+    changes, so there are at most 101 progress reports.
+    """
+
+    def __init__(self, callback, installation_size=0):
         """Create a new installation progress.
 
-        :param sysroot: a path to the system root
-        :param installation_size: a size of the installed payload
         :param callback: a function for the progress reporting
+        :param installation_size: a size of the installed payload in bytes
         """
-        super().__init__()
-        self._sysroot = sysroot
-        self._installation_size = installation_size
         self._callback = callback
-        self._thread_name = THREAD_LIVE_PROGRESS
+        self._installation_size = installation_size
+        self._last_pct = -1
 
-    def __enter__(self):
-        """Start to monitor the progress."""
-        # Start the thread.
-        thread_manager.add_thread(
-            name=self._thread_name,
-            target=self._monitor_progress
-        )
+    def _report_progress(self, pct, installed_size=None):
+        """Report the progress."""
+        pct = max(min(pct, 100), 0)
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Stop to monitor the progress."""
-        # Cancel the progress reporting.
-        self.cancel()
+        if pct == self._last_pct:
+            return
 
-        # Wait for the thread to finish.
-        thread_manager.wait(self._thread_name)
+        self._last_pct = pct
 
-    def _monitor_progress(self):
-        """Monitor the amount of disk space used on the target and source."""
-        log.debug("Installing %s.", Size(self._installation_size))
+        if installed_size is not None:
+            log.debug("Installed %s (%s%%)", Size(installed_size), pct)
+        else:
+            log.debug("Installed %s%%", pct)
 
-        # Force write everything to disk.
-        self._callback(_("Synchronizing writes to disk"))
-        os.sync()
+        self._callback(_("Installing software {}%").format(pct))
 
-        # Calculate the starting size used by the system.
-        mount_points = self._get_mount_points()
-        starting_size = self._calculate_used_size(mount_points)
-        log.debug("Used %s by %s.", Size(starting_size), ", ".join(mount_points))
+    def start(self):
+        """Start the installation progress."""
+        self._report_progress(0)
 
-        pct = 0
-        last_pct = -1
+    def update(self, installed_size):
+        """Update the progress with the installed size.
 
-        while pct < 100 and not self.check_cancel():
-            # Calculate the installed size used by the system.
-            current_size = self._calculate_used_size(mount_points)
-            installed_size = current_size - starting_size
+        :param int installed_size: a size in bytes
+        """
+        if not self._installation_size:
+            return
 
-            # Report the progress message.
-            pct = min(int(100 * installed_size / self._installation_size), 100)
+        pct = int(100 * installed_size / self._installation_size)
+        self._report_progress(pct, installed_size)
 
-            if pct != last_pct:
-                log.debug("Installed %s (%s%%)", Size(installed_size), pct)
-                self._callback(_("Installing software {}%").format(pct))
+    def update_percentage(self, pct):
+        """Update the progress with the percentage reported by a tool.
 
-            last_pct = pct
-            time.sleep(0.777)
+        :param int pct: a percentage of the installation
+        """
+        self._report_progress(pct)
 
-    def _get_mount_points(self):
-        """Get mount points in the device tree.
+    def end(self):
+        """Finish the installation progress."""
+        self._report_progress(100)
 
-        :return: a list of mount points
-        """
-        device_tree = STORAGE.get_proxy(DEVICE_TREE)
-        mount_points = device_tree.GetMountPoints()
-        return [join_paths(self._sysroot, m) for m in mount_points]
 
-    def _calculate_used_size(self, mount_points):
-        """Calculate the total used size of the mount points.
+def read_output_lines(stream, size=64 * 1024):
+    """Read lines from the output of a running program.
 
-        :return: a size in bytes
-        """
-        total = 0
+    Lines are terminated by a new line or by a carriage
+    return, which is used by progress meters.
+
+    :param stream: a binary stream
+    :param size: a maximal size of one read
+    :return: a generator of decoded lines
+    """
+    buffer = b""
+
+    while True:
+        data = stream.read1(size)
+
+        if not data:
+            break
+
+        lines = re.split(rb"[\r\n]", buffer + data)
+        buffer = lines.pop()
+
+        for line in lines:
+            if line:
+                yield line.decode("utf-8", "replace")
+
+    if buffer:
+        yield buffer.decode("utf-8", "replace")
+
+
+def parse_rsync_progress(line):
+    """Parse a progress line of rsync --info=progress2.
 
-        for path in mount_points:
-            if not os.path.exists(path):
-                continue
+    :param str line: a line of the rsync output
+    :return: a tuple of the transferred bytes and the percentage or None
+    """
+    match = RSYNC_PROGRESS_PATTERN.match(line)
 
-            stat = os.statvfs(path)
-            total += stat.f_frsize * (stat.f_blocks - stat.f_bfree)
+    if not match:
+        return None
 
-        return total
+    return int(match.group(1).replace(",", "")), int(match.group(2))
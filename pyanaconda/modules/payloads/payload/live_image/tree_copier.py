@@ -0,0 +1,380 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import errno
+import fcntl
+import os
+import re
+import stat
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pyanaconda.anaconda_loggers import get_module_logger
+
+log = get_module_logger(__name__)
+
+__all__ = ["TreeCopier", "compile_exclusion_pattern"]
+
+# The number of workers that copy files.
+TREE_COPY_MAX_WORKERS = 16
+
+# The size of a buffer for copying without kernel support.
+TREE_COPY_BUFFER_SIZE = 1024 * 1024
+
+# The FICLONE ioctl from linux/fs.h.
+FICLONE = 0x40049409
+
+# Errors of extended attributes that are not supported by the target.
+XATTR_IGNORED_ERRORS = (errno.ENOTSUP, errno.EPERM)
+
+
+def compile_exclusion_pattern(pattern):
+    """Compile an rsync-like exclusion pattern.
+
+    A leading slash anchors the pattern to the root of the tree, a
+    trailing slash matches only directories, and the wildcards don't
+    match slashes.
+
+    :param str pattern: an rsync-like pattern
+    :return: a tuple of a regular expression and a directory flag
+    """
+    anchored = pattern.startswith("/")
+    directory_only = pattern.endswith("/")
+    regex = ""
+
+    for c in pattern.strip("/"):
+        if c == "*":
+            regex += "[^/]*"
+        elif c == "?":
+            regex += "[^/]"
+        else:
+            regex += re.escape(c)
+
+    if not anchored:
+        regex = "(.*/)?" + regex
+
+    return re.compile(regex + "$"), directory_only
+
+
+class TreeCopier(object):
+    """Parallel copier of a file tree.
+
+    The tree is scanned first, then the content of regular files is
+    copied by several workers. The content is cloned if the target
+    supports reflinks, otherwise it is copied in the kernel with
+    copy_file_range if possible.
+
+    Permissions, owners, groups, extended attributes (including ACLs
+    and SELinux labels), times, symlinks, hard links, devices and
+    special files are preserved. File system boundaries are not
+    crossed. It is an equivalent of `rsync -pogAXtlHrDx`.
+    """
+
+    def __init__(self, source, target, exclusions=(), max_workers=TREE_COPY_MAX_WORKERS):
+        """Create a new copier.
+
+        The exclusions are rsync-like patterns.
+        See the compile_exclusion_pattern function.
+
+        :param str source: a path to the source directory
+        :param str target: a path to the target directory
+        :param exclusions: a list of patterns to exclude
+        :param int max_workers: a number of workers
+        """
+        self._source = os.path.normpath(source)
+        self._target = os.path.normpath(target)
+        self._exclusions = [compile_exclusion_pattern(p) for p in exclusions]
+        self._max_workers = max_workers
+        self._directories = []
+        self._files = []
+        self._hard_links = []
+        self._special_files = []
+        self._total_size = 0
+
+    @property
+    def total_size(self):
+        """The size of the copied content in bytes.
+
+        It is available after the scan.
+        """
+        return self._total_size
+
+    def _is_excluded(self, path, is_directory):
+        """Is the given relative path excluded?"""
+        for regex, directory_only in self._exclusions:
+            if directory_only and not is_directory:
+                continue
+
+            if regex.match(path):
+                return True
+
+        return False
+
+    def scan(self):
+        """Scan the source tree.
+
+        :return: a size of the copied content in bytes
+        """
+        root_stat = os.lstat(self._source)
+        inodes = {}
+
+        self._directories = [("", root_stat)]
+        self._files = []
+        self._hard_links = []
+        self._special_files = []
+        self._total_size = 0
+
+        stack = [""]
+
+        while stack:
+            directory = stack.pop()
+
+            with os.scandir(os.path.join(self._source, directory)) as entries:
+                for entry in entries:
+                    path = os.path.join(directory, entry.name)
+                    st = entry.stat(follow_symlinks=False)
+                    is_directory = stat.S_ISDIR(st.st_mode)
+
+                    if self._is_excluded(path, is_directory):
+                        continue
+
+                    if is_directory:
+                        self._directories.append((path, st))
+
+                        # Don't cross file system boundaries.
+                        if st.st_dev == root_stat.st_dev:
+                            stack.append(path)
+
+                        continue
+
+                    # Copy the first hard link and link the others.
+                    if st.st_nlink > 1:
+                        key = (st.st_dev, st.st_ino)
+
+                        if key in inodes:
+                            self._hard_links.append((path, inodes[key]))
+                            continue
+
+                        inodes[key] = path
+
+                    if stat.S_ISREG(st.st_mode):
+                        self._files.append((path, st))
+                        self._total_size += st.st_size
+                    else:
+                        self._special_files.append((path, st))
+
+        log.debug(
+            "Found %s directories, %s files, %s hard links and %s special files.",
+            len(self._directories), len(self._files),
+            len(self._hard_links), len(self._special_files)
+        )
+        return self._total_size
+
+    def copy(self, callback=None):
+        """Copy the scanned tree.
+
+        :param callback: a function called with the copied size in bytes
+        """
+        for path, st in self._directories:
+            self._create_directory(path)
+
+        with ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="AnaTreeCopyThread"
+        ) as executor:
+            futures = [
+                executor.submit(self._copy_file, path, st)
+                for path, st in self._files
+            ]
+            futures.extend(
+                executor.submit(self._copy_special_file, path, st)
+                for path, st in self._special_files
+            )
+
+            copied_size = 0
+
+            try:
+                for future in as_completed(futures):
+                    copied_size += future.result()
+
+                    if callback:
+                        callback(copied_size)
+
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        for path, linked_path in self._hard_links:
+            self._create_hard_link(path, linked_path)
+
+        # Set up directories from the bottom, so their times are kept.
+        for path, st in reversed(self._directories):
+            self._copy_metadata(
+                os.path.join(self._source, path),
+                os.path.join(self._target, path),
+                st
+            )
+
+    def _create_directory(self, path):
+        """Create a directory in the target tree."""
+        try:
+            os.mkdir(os.path.join(self._target, path), 0o700)
+        except FileExistsError:
+            pass
+
+    def _copy_file(self, path, st):
+        """Copy a regular file.
+
+        :return: a size of the copied content
+        """
+        source_path = os.path.join(self._source, path)
+        target_path = os.path.join(self._target, path)
+        source_fd = os.open(source_path, os.O_RDONLY | os.O_NOFOLLOW)
+
+        try:
+            target_fd = self._create(
+                lambda: os.open(
+                    target_path,
+                    os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW,
+                    0o600
+                ),
+                target_path
+            )
+
+            try:
+                self._copy_data(source_fd, target_fd, st.st_size)
+                self._copy_metadata(source_path, target_fd, st)
+            finally:
+                os.close(target_fd)
+        finally:
+            os.close(source_fd)
+
+        return st.st_size
+
+    @staticmethod
+    def _copy_data(source_fd, target_fd, size):
+        """Copy the content of a file.
+
+        Clone the content, copy it in the kernel or
+        copy it in the user space, in this order.
+        """
+        if not size:
+            return
+
+        try:
+            fcntl.ioctl(target_fd, FICLONE, source_fd)
+            return
+        except OSError:
+            pass
+
+        copied_size = 0
+
+        try:
+            while copied_size < size:
+                n = os.copy_file_range(source_fd, target_fd, size - copied_size)
+
+                if not n:
+                    break
+
+                copied_size += n
+
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+
+        # Continue from the current offsets.
+        while True:
+            data = os.read(source_fd, TREE_COPY_BUFFER_SIZE)
+
+            if not data:
+                break
+
+            view = memoryview(data)
+
+            while view:
+                view = view[os.write(target_fd, view):]
+
+    def _copy_special_file(self, path, st):
+        """Copy a symlink, a device or another special file.
+
+        :return: zero
+        """
+        source_path = os.path.join(self._source, path)
+        target_path = os.path.join(self._target, path)
+
+        if stat.S_ISLNK(st.st_mode):
+            link = os.readlink(source_path)
+            self._create(lambda: os.symlink(link, target_path), target_path)
+        else:
+            self._create(lambda: os.mknod(target_path, st.st_mode, st.st_rdev), target_path)
+
+        self._copy_metadata(source_path, target_path, st)
+        return 0
+
+    def _create_hard_link(self, path, linked_path):
+        """Create a hard link in the target tree."""
+        target_path = os.path.join(self._target, path)
+        linked_path = os.path.join(self._target, linked_path)
+        self._create(lambda: os.link(linked_path, target_path), target_path)
+
+    @staticmethod
+    def _create(create, path):
+        """Create a file and replace an existing one."""
+        try:
+            return create()
+        except FileExistsError:
+            os.unlink(path)
+            return create()
+
+    def _copy_metadata(self, source, target, st):
+        """Copy the metadata of a file.
+
+        The owner has to be set before the mode,
+        otherwise the setuid bits would be lost.
+
+        :param str source: a path to the source file
+        :param target: a path or a file descriptor of the target file
+        :param st: a stat result of the source file
+        """
+        # File descriptors can't be used together with follow_symlinks.
+        follow_symlinks = isinstance(target, int)
+
+        os.chown(target, st.st_uid, st.st_gid, follow_symlinks=follow_symlinks)
+
+        if not stat.S_ISLNK(st.st_mode):
+            os.chmod(target, stat.S_IMODE(st.st_mode))
+
+        self._copy_xattrs(source, target, follow_symlinks)
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns), follow_symlinks=follow_symlinks)
+
+    @staticmethod
+    def _copy_xattrs(source, target, follow_symlinks):
+        """Copy extended attributes.
+
+        ACLs and SELinux labels are stored in extended attributes.
+        """
+        for name in os.listxattr(source, follow_symlinks=False):
+            value = os.getxattr(source, name, follow_symlinks=False)
+
+            try:
+                os.setxattr(target, name, value, follow_symlinks=follow_symlinks)
+            except OSError as e:
+                if e.errno not in XATTR_IGNORED_ERRORS:
+                    raise
+
+                log.debug("Failed to set %s of %s: %s", name, target, e)
@@ -68,7 +68,8 @@ class LiveOSModule(PayloadBase):
 
         task = InstallFromImageTask(
             sysroot=conf.target.system_root,
-            mount_point=image_source.mount_point
+            mount_point=image_source.mount_point,
+            image_path=image_source.image_path
         )
 
         task.succeeded_signal.connect(
@@ -43,6 +43,7 @@ class InstallLiveImageTask(Task):
         self._download_path = self._sysroot + "/source.img"
         self._image_mount_point = MountPointGenerator.generate_mount_point("image")
         self._iso_mount_point = MountPointGenerator.generate_mount_point("iso")
+        self._image_path = None
         self._content_path = None
 
     @property
@@ -71,16 +72,17 @@ class InstallLiveImageTask(Task):
             configuration=self._configuration,
             download_path=self._download_path
         )
-        image_path = self._run_task(task)
+        self._image_path = self._run_task(task)
 
         task = VerifyImageChecksumTask(
             configuration=self._configuration,
-            image_path=image_path
+            image_path=self._image_path,
+            calculated_checksum=task.calculated_checksum
         )
         self._run_task(task)
 
         task = MountImageTask(
-            image_path=image_path,
+            image_path=self._image_path,
             image_mount_point=self._image_mount_point,
             iso_mount_point=self._iso_mount_point,
         )
@@ -90,7 +92,8 @@ class InstallLiveImageTask(Task):
         """Install the content of the image."""
         task = InstallFromImageTask(
             sysroot=self._sysroot,
-            mount_point=self._content_path
+            mount_point=self._content_path,
+            image_path=self._image_path
         )
         self._run_task(task)
 
@@ -15,11 +15,16 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+from pyanaconda.anaconda_loggers import get_module_logger
+from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.modules.common.task import Task
 from pyanaconda.modules.common.structures.live_image import LiveImageConfigurationData
 from pyanaconda.modules.payloads.payload.live_image.installation import DownloadImageTask, \
-    VerifyImageChecksumTask, RemoveImageTask, InstallFromTarTask
+    VerifyImageChecksumTask, RemoveImageTask, InstallFromTarTask, InstallFromTarStreamTask
 from pyanaconda.modules.payloads.payload.live_image.utils import get_kernel_version_list_from_tar
+from pyanaconda.modules.payloads.payload.live_os.utils import get_kernel_version_list
+
+log = get_module_logger(__name__)
 
 __all__ = ["InstallLiveTarTask"]
 
@@ -51,6 +56,10 @@ class InstallLiveTarTask(Task):
 
         :return: a list of kernel versions
         """
+        if self._can_stream_tarball():
+            self._stream_tarball()
+            return self._kernel_version_list
+
         self._set_up_tarball()
         self._collect_kernels()
         self._install_tarball()
@@ -58,6 +67,30 @@ class InstallLiveTarTask(Task):
 
         return self._kernel_version_list
 
+    def _can_stream_tarball(self):
+        """Should we extract the tarball during the download?"""
+        if not conf.payload.stream_live_tarball:
+            return False
+
+        if self._configuration.url.startswith("file://"):
+            return False
+
+        return True
+
+    def _stream_tarball(self):
+        """Install the content of the tarball during the download."""
+        log.debug("Extracting the tarball during the download.")
+
+        task = InstallFromTarStreamTask(
+            sysroot=self._sysroot,
+            configuration=self._configuration
+        )
+        self._run_task(task)
+
+        self._kernel_version_list = get_kernel_version_list(
+            self._sysroot
+        )
+
     def _set_up_tarball(self):
         """Set up the tarball for the installation.
 
@@ -71,7 +104,8 @@ class InstallLiveTarTask(Task):
 
         task = VerifyImageChecksumTask(
             configuration=self._configuration,
-            image_path=self._tarball_path
+            image_path=self._tarball_path,
+            calculated_checksum=task.calculated_checksum
         )
         self._run_task(task)
 
@@ -64,7 +64,8 @@ class CreateRescueImagesTask(Task):
 
         create_rescue_images(
             sysroot=self._sysroot,
-            kernel_versions=self._versions
+            kernel_versions=self._versions,
+            callback=self.report_progress
         )
 
 
@@ -199,7 +200,8 @@ class RecreateInitrdsTask(Task):
 
         recreate_initrds(
             sysroot=self._sysroot,
-            kernel_versions=self._versions
+            kernel_versions=self._versions,
+            callback=self.report_progress
         )
 
 
@@ -16,8 +16,12 @@
 # Red Hat, Inc.
 #
 import os
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
 
+from blivet import util as blivet_util
+from blivet.size import Size
+
 from pyanaconda.modules.common.errors.installation import BootloaderInstallationError
 from pyanaconda.modules.storage.bootloader.image import LinuxBootLoaderImage
 from pyanaconda.core.configuration.anaconda import conf
@@ -30,9 +34,106 @@ log = get_module_logger(__name__)
 __all__ = ["configure_boot_loader", "install_boot_loader", "recreate_initrds",
            "create_rescue_images"]
 
+# The estimated memory used by one run of dracut.
+INITRAMFS_JOB_MEMORY = Size("1 GiB")
+
+
+def _get_initramfs_max_workers(jobs):
+    """Get a number of kernels that can be processed at the same time.
+
+    If the number is not configured, it is limited by the number
+    of CPUs and by the available memory.
+
+    :param int jobs: a number of kernels
+    :return: a number of workers
+    """
+    max_workers = conf.bootloader.initramfs_max_workers
+
+    if not max_workers:
+        try:
+            available_memory = blivet_util.available_memory()
+        except (OSError, ValueError, KeyError) as e:
+            log.debug("Failed to get the available memory: %s", e)
+            available_memory = Size(0)
+
+        max_workers = min(os.cpu_count() or 1, int(available_memory / INITRAMFS_JOB_MEMORY))
+
+    return max(1, min(max_workers, jobs))
+
+
+def _run_for_kernels(function, kernel_versions, error_message, parallel=False):
+    """Run the given function for each kernel.
+
+    The function returns a list of commands that failed and raises
+    an exception if the kernel can't be processed. The failures of
+    all kernels are collected and reported at the end.
+
+    :param function: a function that takes a kernel version
+    :param kernel_versions: a list of kernel versions
+    :param str error_message: a message of the raised error
+    :param bool parallel: should the kernels be processed in parallel?
+    :raise: BootloaderInstallationError if a kernel can't be processed
+    """
+    if not kernel_versions:
+        return
+
+    max_workers = _get_initramfs_max_workers(len(kernel_versions)) if parallel else 1
+    log.debug("Processing %s kernels with %s workers.", len(kernel_versions), max_workers)
+    errors = []
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="AnaInitrdThread"
+    ) as executor:
+        futures = [executor.submit(function, kernel) for kernel in kernel_versions]
+
+        for kernel, future in zip(kernel_versions, futures):
+            try:
+                failed_commands = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                log.error("Failed to process the kernel %s: %s", kernel, e)
+                errors.append("{}: {}".format(kernel, e))
+                continue
+
+            if failed_commands:
+                log.error(
+                    "Failed commands for the kernel %s: %s",
+                    kernel, ", ".join(failed_commands)
+                )
+
+    if errors:
+        raise BootloaderInstallationError(
+            "{}\n{}".format(error_message, "\n".join(errors))
+        )
+
+
+def _exec_for_kernel(command, argv, sysroot, failed_commands, callback=None):
+    """Run a command and record its failure.
+
+    :param command: a command to run
+    :param argv: a list of arguments
+    :param sysroot: a path to the root of the installed system
+    :param failed_commands: a list of failed commands to update
+    :param callback: a function called with every line of the output or None
+    """
+    rc = execWithRedirect(command, argv, root=sysroot, output_callback=callback)
+
+    if rc != 0:
+        failed_commands.append("{} ({})".format(command, rc))
 
-def create_rescue_images(sysroot, kernel_versions):
-    """Create the rescue initrd images for each installed kernel."""
+
+def create_rescue_images(sysroot, kernel_versions, callback=None):
+    """Create the rescue initrd images for each installed kernel.
+
+    The kernels are processed one after another, because the scripts
+    of kernel-install and new-kernel-pkg are not safe to run concurrently.
+
+    :param sysroot: a path to the root of the installed system
+    :param kernel_versions: a list of kernel versions
+    :param callback: a function called with a progress message
+                     and with every line of the output of the commands
+    :raise: BootloaderInstallationError if a kernel can't be processed
+    """
     # Always make sure the new system has a new machine-id, it
     # won't boot without it and some of the subsequent commands
     # like grub2-mkconfig and kernel-install will not work as well.
@@ -53,30 +154,49 @@ def create_rescue_images(sysroot, kernel_versions):
         log.debug("new-kernel-pkg does not exist, calling scripts directly.")
         use_nkp = False
 
-    for kernel in kernel_versions:
+    if use_nkp:
+        files = []
+    else:
+        files = glob(sysroot + "/etc/kernel/postinst.d/*")
+        srlen = len(sysroot)
+        files = sorted([
+            f[srlen:] for f in files
+            if os.access(f, os.X_OK)]
+        )
+
+    def create_rescue_image(kernel):
         log.info("Generating rescue image for %s.", kernel)
+        failed_commands = []
+
+        if callback:
+            callback("Generating rescue image for {}".format(kernel))
 
         if use_nkp:
-            execWithRedirect(
+            _exec_for_kernel(
                 "new-kernel-pkg",
                 ["--rpmposttrans", kernel],
-                root=sysroot
+                sysroot,
+                failed_commands,
+                callback
             )
         else:
-            files = glob(sysroot + "/etc/kernel/postinst.d/*")
-            srlen = len(sysroot)
-            files = sorted([
-                f[srlen:] for f in files
-                if os.access(f, os.X_OK)]
-            )
-
             for file in files:
-                execWithRedirect(
+                _exec_for_kernel(
                     file,
                     [kernel, "/boot/vmlinuz-%s" % kernel],
-                    root=sysroot
+                    sysroot,
+                    failed_commands,
+                    callback
                 )
 
+        return failed_commands
+
+    _run_for_kernels(
+        create_rescue_image,
+        kernel_versions,
+        "Failed to generate rescue images."
+    )
+
 
 def configure_boot_loader(sysroot, storage, kernel_versions):
     """Configure the boot loader.
@@ -256,14 +376,20 @@ def create_bls_entries(sysroot, storage, kernel_versions):
         )
 
 
-def recreate_initrds(sysroot, kernel_versions):
+def recreate_initrds(sysroot, kernel_versions, callback=None):
     """Recreate the initrds by calling new-kernel-pkg or dracut.
 
     This needs to be done after all configuration files have been
-    written, since dracut depends on some of them.
+    written, since dracut depends on some of them. If dracut is called
+    directly, the initrds of different kernels are recreated in parallel.
+    Calls of new-kernel-pkg update the shared boot loader configuration,
+    so they run one after another.
 
     :param sysroot: a path to the root of the installed system
     :param kernel_versions: a list of kernel versions
+    :param callback: a function called with a progress message
+                     and with every line of the output of the commands
+    :raise: BootloaderInstallationError if a kernel can't be processed
     """
     if os.path.exists(sysroot + "/usr/sbin/new-kernel-pkg"):
         use_dracut = False
@@ -271,34 +397,52 @@ def recreate_initrds(sysroot, kernel_versions):
         log.debug("new-kernel-pkg does not exist, using dracut instead")
         use_dracut = True
 
-    for kernel in kernel_versions:
+    def recreate_initrd(kernel):
         log.info("Recreating initrd for %s", kernel)
+        failed_commands = []
+
+        if callback:
+            callback("Recreating initrd for {}".format(kernel))
 
         if conf.target.is_image:
             # Dracut runs in the host-only mode by default, so we need to
             # turn it off by passing the -N option, because the mode is not
             # sensible for disk image installations. Using /dev/disk/by-uuid/
             # is necessary due to disk image naming.
-            execWithRedirect(
+            _exec_for_kernel(
                 "dracut", [
                     "-N", "--persistent-policy", "by-uuid",
                     "-f", "/boot/initramfs-%s.img" % kernel, kernel
                 ],
-                root=sysroot
+                sysroot,
+                failed_commands,
+                callback
+            )
+        elif use_dracut:
+            _exec_for_kernel(
+                "depmod", ["-a", kernel], sysroot, failed_commands, callback
+            )
+            _exec_for_kernel(
+                "dracut",
+                ["-f", "/boot/initramfs-%s.img" % kernel, kernel],
+                sysroot,
+                failed_commands,
+                callback
             )
         else:
-            if use_dracut:
-                execWithRedirect(
-                    "depmod", ["-a", kernel], root=sysroot
-                )
-                execWithRedirect(
-                    "dracut",
-                    ["-f", "/boot/initramfs-%s.img" % kernel, kernel],
-                    root=sysroot
-                )
-            else:
-                execWithRedirect(
-                    "new-kernel-pkg",
-                    ["--mkinitrd", "--dracut", "--depmod", "--update", kernel],
-                    root=sysroot
-                )
+            _exec_for_kernel(
+                "new-kernel-pkg",
+                ["--mkinitrd", "--dracut", "--depmod", "--update", kernel],
+                sysroot,
+                failed_commands,
+                callback
+            )
+
+        return failed_commands
+
+    _run_for_kernels(
+        recreate_initrd,
+        kernel_versions,
+        "Failed to recreate the initrds.",
+        parallel=conf.target.is_image or use_dracut
+    )
@@ -180,7 +180,7 @@ class DeviceTreeHandler(ABC):
 
         :return: a task
         """
-        return FindDevicesTask(self.storage.devicetree)
+        return FindDevicesTask(self.storage)
 
     def find_optical_media(self):
         """Find all devices with mountable optical media.
@@ -205,7 +205,10 @@ class DeviceTreeHandler(ABC):
 
         :return: a task
         """
-        task = FindExistingSystemsTask(self.storage.devicetree)
+        task = FindExistingSystemsTask(
+            self.storage.devicetree,
+            self.storage.probe_cache
+        )
         task.succeeded_signal.connect(
             lambda: self._update_existing_systems(task.get_result())
         )
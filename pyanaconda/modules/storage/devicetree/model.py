@@ -18,8 +18,11 @@
 # Red Hat Author(s): David Lehman <dlehman@redhat.com>
 #
 import os
+import weakref
 
+from blivet import udev
 from blivet.blivet import Blivet
+from blivet.callbacks import callbacks
 from blivet.devices import BTRFSSubVolumeDevice
 from blivet.formats import get_format
 from blivet.formats.disklabel import DiskLabel
@@ -41,6 +44,41 @@ log = logging.getLogger("anaconda.storage")
 
 __all__ = ["create_storage"]
 
+# Changes of devices, formats or actions. See the InstallerStorage class.
+_DEVICE_TREE_CALLBACKS = (
+    callbacks.device_added, callbacks.device_removed,
+    callbacks.format_added, callbacks.format_removed,
+    callbacks.action_added, callbacks.action_removed,
+    callbacks.action_executed, callbacks.parent_added,
+    callbacks.parent_removed, callbacks.attribute_changed
+)
+
+
+def _unregister_callback(callback):
+    """Unregister a callback of the device tree changes.
+
+    :param callback: a callback to unregister
+    """
+    for callback_list in _DEVICE_TREE_CALLBACKS:
+        callback_list.remove(callback)
+
+
+def _remove_disk_from_device_tree(devicetree, disk):
+    """Remove a disk from the device tree.
+
+    The method recursive_remove of the device tree never removes
+    disks and the method hide keeps them in the list of hidden
+    devices, so a disk that appears in the system again would be
+    skipped by the populator. Blivet doesn't provide a public
+    method for this, so the private one is used here. The test
+    test_remove_disk_api checks that it is still available.
+
+    :param devicetree: a device tree
+    :param disk: a disk without dependent devices
+    """
+    # pylint: disable=protected-access
+    devicetree._remove_device(disk, modparent=False)
+
 
 def create_storage():
     """Create the storage object.
@@ -62,6 +100,13 @@ class InstallerStorage(Blivet):
         self.fsset = FSSet(self.devicetree)
         self._short_product_name = shortProductName
         self._default_luks_version = DEFAULT_LUKS_VERSION
+        self._generation = 0
+        self._free_space_cache = {}
+        self._free_space_generation = None
+        self._register_callbacks()
+
+        # The cache of probed devices. See the ProbeCache class.
+        self.probe_cache = None
 
         # Set the default filesystem type.
         self.set_default_fstype(conf.storage.file_system_type or self.default_fstype)
@@ -189,11 +234,32 @@ class InstallerStorage(Blivet):
         disks = self._skip_unsupported_disk_labels(disks)
 
         # Get the dictionary of free spaces for each disk.
-        snapshot = self.get_free_space(disks)
+        snapshot = self._get_cached_free_space(disks)
 
         # Calculate the total free space.
         return sum((disk_free for disk_free, fs_free in snapshot.values()), Size(0))
 
+    def get_disks_free_space(self, disks=None):
+        """Get free space on each of the given disks.
+
+        Calculates free space available for use. Disks with
+        unsupported disk labels have no free space.
+
+        :param disks: a list of disks or None
+        :return: a dictionary of disk names and sizes
+        """
+        # Use all disks in the device tree by default.
+        if disks is None:
+            disks = self.disks
+
+        # Get the dictionary of free spaces for supported disks.
+        snapshot = self._get_cached_free_space(self._skip_unsupported_disk_labels(disks))
+
+        return {
+            disk.name: snapshot[disk.name][0] if disk.name in snapshot else Size(0)
+            for disk in disks
+        }
+
     def get_disk_reclaimable_space(self, disks=None):
         """Get total reclaimable space on the given disks.
 
@@ -211,11 +277,77 @@ class InstallerStorage(Blivet):
         disks = self._skip_unsupported_disk_labels(disks)
 
         # Get the dictionary of free spaces for each disk.
-        snapshot = self.get_free_space(disks)
+        snapshot = self._get_cached_free_space(disks)
 
         # Calculate the total reclaimable free space.
         return sum((fs_free for disk_free, fs_free in snapshot.values()), Size(0))
 
+    def _register_callbacks(self):
+        """Register callbacks for changes of the device tree.
+
+        The callbacks don't keep the storage alive and they are
+        unregistered when the storage is garbage collected.
+        """
+        method = weakref.WeakMethod(self._on_device_tree_changed)
+
+        def callback(*args, **kwargs):
+            on_changed = method()
+
+            if on_changed:
+                on_changed(*args, **kwargs)
+
+        for callback_list in _DEVICE_TREE_CALLBACKS:
+            callback_list.add(callback)
+
+        weakref.finalize(self, _unregister_callback, callback)
+
+    def _on_device_tree_changed(self, device=None, action=None, **kwargs):
+        """Start a new generation if a cached disk has changed.
+
+        Only changes of the disks with cached data and of devices on
+        these disks are considered. The disks are compared by identity,
+        so changes of other device trees like copies of this storage
+        model don't drop the cached data.
+
+        :param device: a changed device or None
+        :param action: a changed action or None
+        """
+        if action is not None:
+            device = action.device
+
+        if device is None or any(
+            self._free_space_cache.get(d.id, (None, None))[0] is d
+            for d in [device, *device.disks]
+        ):
+            self._generation += 1
+
+    def _get_cached_free_space(self, disks):
+        """Get free space info for each of the given disks.
+
+        The results are cached for every disk until the next change
+        of the disk or its devices, formats or actions, so repeated
+        requests don't recompute the free space. Only disks that are
+        not cached are computed, all of them in one pass.
+
+        :param disks: a list of disks
+        :return: a dictionary of disk names and tuples (disk free, fs free)
+        """
+        # Drop the cache if anything has changed since it was created.
+        generation = self._generation
+
+        if self._free_space_generation != generation:
+            self._free_space_cache = {}
+            self._free_space_generation = generation
+
+        cache = self._free_space_cache
+        missing = [disk for disk in disks if disk.id not in cache]
+
+        if missing:
+            snapshot = self.get_free_space(missing)
+            cache.update((disk.id, (disk, snapshot[disk.name])) for disk in missing)
+
+        return {disk.name: cache[disk.id][1] for disk in disks}
+
     def _skip_unsupported_disk_labels(self, disks):
         """Get a list of disks with supported disk labels.
 
@@ -259,6 +391,9 @@ class InstallerStorage(Blivet):
 
         super().reset(cleanup_only=cleanup_only)
 
+        # The old devices are dropped without any notifications.
+        self._free_space_generation = None
+
         # Protect devices from teardown.
         self._mark_protected_devices()
         self.devicetree.teardown_all()
@@ -269,9 +404,60 @@ class InstallerStorage(Blivet):
         self.bootloader.reset()
 
         self.roots = []
-        self.roots = find_existing_installations(self.devicetree)
+        self.roots = find_existing_installations(self.devicetree, self.probe_cache)
         self.dump_state("initial")
 
+    def populate_incrementally(self):
+        """Update the device tree with added and removed disks.
+
+        Unlike the reset, this method keeps the existing devices and
+        the scheduled actions. The device tree is populated again, but
+        Blivet only looks up the devices that are already in the tree
+        and doesn't probe their formats again, so attaching a new disk
+        doesn't rescan all other disks.
+
+        Disks that disappeared are removed from the device tree with
+        their dependent devices and scheduled actions. Other devices
+        are kept even if they are not reported by udev, because
+        inactive devices like logical volumes are not reported either.
+
+        The ignored, exclusive and protected devices are handled
+        the same way as in the reset.
+
+        :return: a list of names of the added devices
+        """
+        self._remove_missing_disks({
+            udev.device_get_sysfs_path(info) for info in udev.get_devices()
+        })
+
+        old_devices = set(self.devicetree.devices)
+        self.devicetree.populate()
+
+        # Protect the new devices if necessary.
+        self._mark_protected_devices()
+
+        return [d.name for d in self.devicetree.devices if d not in old_devices]
+
+    def _remove_missing_disks(self, sysfs_paths):
+        """Remove disks that are not in the system anymore.
+
+        Hidden disks are kept, so ignored disks stay
+        ignored if they appear in the system again.
+
+        :param sysfs_paths: a set of sysfs paths of the block devices in the system
+        """
+        devicetree = self.devicetree
+
+        for disk in devicetree.devices:
+            if not disk.is_disk or not disk.exists or not disk.sysfs_path \
+                    or disk.sysfs_path in sysfs_paths:
+                continue
+
+            log.info("The disk %s disappeared. Removing it from the device tree.", disk.name)
+            devicetree.cancel_disk_actions([disk])
+            devicetree.recursive_remove(disk, actions=False, modparent=False)
+            _remove_disk_from_device_tree(devicetree, disk)
+
     def _mark_protected_devices(self):
         """Mark protected devices.
 
@@ -518,6 +704,10 @@ class InstallerStorage(Blivet):
         # Create a copy of the Blivet object.
         new = super().copy()
 
+        # The copy is not created by the constructor.
+        new._free_space_generation = None
+        new._register_callbacks()
+
         # Create proper copies of the collected installation roots.
         new.roots = [root.copy(storage=new) for root in new.roots]
 
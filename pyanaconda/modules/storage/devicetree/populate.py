@@ -32,13 +32,13 @@ __all__ = ["FindDevicesTask"]
 class FindDevicesTask(Task):
     """A task to find new devices."""
 
-    def __init__(self, devicetree):
+    def __init__(self, storage):
         """Create a new task.
 
-        :param devicetree: a device tree to populate
+        :param storage: an instance of the storage model to populate
         """
         super().__init__()
-        self._devicetree = devicetree
+        self._storage = storage
 
     @property
     def name(self):
@@ -47,12 +47,20 @@ class FindDevicesTask(Task):
     def run(self):
         """Run the task.
 
+        Only the devices that are not in the device
+        tree yet are scanned. See the method
+        InstallerStorage.populate_incrementally.
+
+        :return: a list of names of the added devices
         :raise: UnusableStorageError if the model is not usable
         """
         try:
-            self._devicetree.populate()
-            self._devicetree.teardown_all()
+            devices = self._storage.populate_incrementally()
+            self._storage.devicetree.teardown_all()
         except UnusableConfigurationError as e:
             log.error("Failed to find devices: %s", e)
             message = "\n\n".join([str(e), _(e.suggestion)])
             raise UnusableStorageError(message) from None
+
+        log.debug("Found new devices: %s", devices)
+        return devices
@@ -32,13 +32,15 @@ __all__ = ["FindExistingSystemsTask", "MountExistingSystemTask"]
 class FindExistingSystemsTask(Task):
     """A task to find existing GNU/Linux installations."""
 
-    def __init__(self, devicetree):
+    def __init__(self, devicetree, probe_cache=None):
         """Create a new task.
 
         :param devicetree: a device tree to search
+        :param probe_cache: an instance of ProbeCache or None
         """
         super().__init__()
         self._devicetree = devicetree
+        self._probe_cache = probe_cache
 
     @property
     def name(self):
@@ -49,7 +51,10 @@ class FindExistingSystemsTask(Task):
 
         :return: a list of data about found systems
         """
-        return find_existing_installations(devicetree=self._devicetree)
+        return find_existing_installations(
+            devicetree=self._devicetree,
+            probe_cache=self._probe_cache
+        )
 
 
 class MountExistingSystemTask(Task):
@@ -18,6 +18,14 @@
 import copy
 import os
 import shlex
+import shutil
+import struct
+import tempfile
+import threading
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from blivet import util as blivet_util
 from blivet.errors import StorageError
@@ -31,7 +39,97 @@ from pyanaconda.modules.storage.devicetree.fsset import BlkidTab, CryptTab
 from pyanaconda.anaconda_loggers import get_module_logger
 log = get_module_logger(__name__)
 
-__all__ = ["mount_existing_system", "find_existing_installations", "Root"]
+__all__ = ["mount_existing_system", "find_existing_installations", "ProbeCache", "Root"]
+
+# The maximal number of devices that are probed at the same time.
+PROBE_MAX_WORKERS = 4
+
+# The directory with the copied files of probed installations.
+PROBE_CACHE_DIR = "/tmp/anaconda-probes"
+
+# The files that are needed to find the devices of an installation.
+PROBED_FILES = ("etc/fstab", "etc/crypttab", "etc/blkid/blkid.tab")
+
+# The superblocks of file systems with a change marker.
+EXT_SUPERBLOCK_OFFSET = 1024
+EXT_MAGIC = 0xEF53
+BTRFS_SUPERBLOCK_OFFSET = 0x10000
+BTRFS_MAGIC = b"_BHRfS_M"
+
+ProbeResult = namedtuple("ProbeResult", ["key", "arch", "product", "version", "path"])
+
+
+class ProbeCache(object):
+    """A cache of probed devices.
+
+    The cache keeps the latest result of every probed device, so
+    devices that have not changed since the last probe are not
+    mounted again. The copied files of results that are replaced
+    or removed from the cache are deleted.
+
+    The cache is kept only in the memory, so it lives as long as
+    the process. It is shared by all copies of the storage model.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+
+    def __deepcopy__(self, memo):
+        """Don't copy the cache with the storage model."""
+        return self
+
+    def contains(self, name, key):
+        """Is there a cached result of the device with the given key?
+
+        :param name: a name of the device
+        :param key: a key of the probe
+        :return: True or False
+        """
+        with self._lock:
+            return name in self._results and self._results[name][0] == key
+
+    def get(self, name):
+        """Get the cached result of a probed device.
+
+        :param name: a name of the device
+        :return: an instance of ProbeResult or None
+        """
+        with self._lock:
+            return self._results.get(name, (None, None))[1]
+
+    def set(self, name, key, result):
+        """Cache the result of a probed device.
+
+        The previous result of the device is replaced.
+        Results without a key are not cached.
+
+        :param name: a name of the device
+        :param key: a key of the probe or None
+        :param result: an instance of ProbeResult or None
+        """
+        with self._lock:
+            _key, old_result = self._results.pop(name, (None, None))
+
+            if key is not None:
+                self._results[name] = (key, result)
+
+        if old_result and old_result is not result:
+            _remove_probed_files(old_result)
+
+    def prune(self, names):
+        """Remove the results of devices that are not probed anymore.
+
+        :param names: names of the probed devices
+        """
+        names = set(names)
+
+        with self._lock:
+            removed = [n for n in self._results if n not in names]
+            results = [self._results.pop(n)[1] for n in removed]
+
+        for result in filter(None, results):
+            _remove_probed_files(result)
 
 
 def mount_existing_system(storage, root_device, read_only=None):
@@ -70,14 +168,15 @@ def mount_existing_system(storage, root_device, read_only=None):
         storage.make_mtab(chroot=root_path)
 
 
-def find_existing_installations(devicetree):
+def find_existing_installations(devicetree, probe_cache=None):
     """Find existing GNU/Linux installations on devices from the device tree.
 
     :param devicetree: a device tree to find existing installations in
+    :param probe_cache: an instance of ProbeCache or None
     :return: roots of all found installations
     """
     try:
-        roots = _find_existing_installations(devicetree)
+        roots = _find_existing_installations(devicetree, probe_cache)
         return roots
     except Exception:  # pylint: disable=broad-except
         log_exception_info(log.info, "failure detecting existing installations")
@@ -87,54 +186,54 @@ def find_existing_installations(devicetree):
     return []
 
 
-def _find_existing_installations(devicetree):
+def _find_existing_installations(devicetree, probe_cache):
     """Find existing GNU/Linux installations on devices from the device tree.
 
+    The devices are probed in parallel. Every probe mounts
+    its device on a private mount point.
+
     :param devicetree: a device tree to find existing installations in
+    :param probe_cache: an instance of ProbeCache or None
     :return: roots of all found installations
     """
-    if not os.path.exists(conf.target.physical_root):
-        blivet_util.makedirs(conf.target.physical_root)
+    probed_devices = [
+        dev for dev in devicetree.devices
+        if dev.direct and dev.format.linux_native and dev.format.mountable
+        and dev.controllable and dev.format.exists
+    ]
+
+    with ThreadPoolExecutor(
+        max_workers=PROBE_MAX_WORKERS,
+        thread_name_prefix="AnaProbeThread"
+    ) as executor:
+        results = list(executor.map(
+            partial(_probe_device, probe_cache=probe_cache),
+            probed_devices
+        ))
 
-    sysroot = conf.target.physical_root
-    roots = []
-    direct_devices = (dev for dev in devicetree.devices if dev.direct)
-    for device in direct_devices:
-        if not device.format.linux_native or not device.format.mountable or \
-           not device.controllable or not device.format.exists:
-            continue
+    if probe_cache is not None:
+        probe_cache.prune(dev.name for dev in probed_devices)
 
-        try:
-            device.setup()
-        except Exception:  # pylint: disable=broad-except
-            log_exception_info(log.warning, "setup of %s failed", [device.name])
+    roots = []
+    for result in results:
+        if not result:
             continue
 
-        options = device.format.options + ",ro"
         try:
-            device.format.mount(options=options, mountpoint=sysroot)
-        except Exception:  # pylint: disable=broad-except
-            log_exception_info(log.warning, "mount of %s as %s failed", [device.name, device.format.type])
-            blivet_util.umount(mountpoint=sysroot)
-            continue
-
-        if not os.access(sysroot + "/etc/fstab", os.R_OK):
-            blivet_util.umount(mountpoint=sysroot)
-            device.teardown()
-            continue
-
-        architecture, product, version = get_release_string(chroot=sysroot)
-        (mounts, devices) = _parse_fstab(devicetree, chroot=sysroot)
-        blivet_util.umount(mountpoint=sysroot)
+            (mounts, devices) = _parse_fstab(devicetree, chroot=result.path)
+        finally:
+            # Keep only the files of cached results.
+            if result.key is None:
+                _remove_probed_files(result)
 
         if not mounts and not devices:
             # empty /etc/fstab. weird, but I've seen it happen.
             continue
 
         roots.append(Root(
-            product=product,
-            version=version,
-            arch=architecture,
+            product=result.product,
+            version=result.version,
+            arch=result.arch,
             devices=devices,
             mounts=mounts,
         ))
@@ -142,6 +241,185 @@ def _find_existing_installations(devicetree):
     return roots
 
 
+def _probe_device(device, probe_cache=None):
+    """Probe a device for an existing installation.
+
+    The results are cached for file systems with a change marker,
+    so devices that have not changed since the last probe are not
+    mounted again. See the _get_probe_key function.
+
+    :param device: a device with a mountable file system
+    :param probe_cache: an instance of ProbeCache or None
+    :return: an instance of ProbeResult or None
+    """
+    try:
+        device.setup()
+    except Exception:  # pylint: disable=broad-except
+        log_exception_info(log.warning, "setup of %s failed", [device.name])
+        return None
+
+    key = _get_probe_key(device) if probe_cache is not None else None
+
+    if key is not None and probe_cache.contains(device.name, key):
+        log.debug("Using the cached probe of %s.", device.name)
+        result = probe_cache.get(device.name)
+    else:
+        result = _mount_and_probe_device(device, key)
+
+        if probe_cache is not None:
+            probe_cache.set(device.name, key, result)
+
+    if not result:
+        device.teardown()
+
+    return result
+
+
+def _mount_and_probe_device(device, key):
+    """Mount a device and probe it for an existing installation.
+
+    :param device: a device with a mountable file system
+    :param key: a key of the probe cache or None
+    :return: an instance of ProbeResult or None
+    """
+    mount_point = tempfile.mkdtemp(prefix="anaconda-probe-")
+    options = device.format.options + ",ro"
+
+    try:
+        device.format.mount(options=options, mountpoint=mount_point)
+    except Exception:  # pylint: disable=broad-except
+        log_exception_info(log.warning, "mount of %s as %s failed", [device.name, device.format.type])
+        blivet_util.umount(mountpoint=mount_point)
+        _remove_mount_point(mount_point)
+        return None
+
+    try:
+        result = _read_installation(mount_point, key)
+    finally:
+        blivet_util.umount(mountpoint=mount_point)
+        _remove_mount_point(mount_point)
+
+    return result
+
+
+def _remove_mount_point(mount_point):
+    """Remove an unmounted mount point."""
+    try:
+        os.rmdir(mount_point)
+    except OSError as e:
+        log.warning("Failed to remove %s: %s", mount_point, e)
+
+
+def _remove_probed_files(result):
+    """Remove the copied files of a probed installation."""
+    shutil.rmtree(result.path, ignore_errors=True)
+
+
+def _read_installation(chroot, key):
+    """Read the files of an existing installation.
+
+    The files that are needed to find the devices of the
+    installation are copied, so they can be parsed later
+    without the mounted file system.
+
+    :param chroot: a path to the mounted file system
+    :param key: a key of the probe cache or None
+    :return: an instance of ProbeResult or None
+    """
+    if not os.access(chroot + "/etc/fstab", os.R_OK):
+        return None
+
+    architecture, product, version = get_release_string(chroot=chroot)
+
+    os.makedirs(PROBE_CACHE_DIR, exist_ok=True)
+    path = tempfile.mkdtemp(prefix="probe-", dir=PROBE_CACHE_DIR)
+
+    for name in PROBED_FILES:
+        source = os.path.join(chroot, name)
+        target = os.path.join(path, name)
+
+        if not os.access(source, os.R_OK):
+            continue
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(source, target)
+
+    return ProbeResult(
+        key=key,
+        arch=architecture,
+        product=product,
+        version=version,
+        path=path,
+    )
+
+
+def _get_probe_key(device):
+    """Get a key of the probe cache for the given device.
+
+    The file system is identified by its UUID, label and size
+    and by a marker that changes with every write of the file
+    system. It is read from the superblock, so the device doesn't
+    have to be mounted.
+
+    :param device: a device that is set up
+    :return: a tuple or None if the device can't be cached
+    """
+    if not device.format.uuid:
+        return None
+
+    marker = _read_change_marker(device.path, device.format.type)
+
+    if marker is None:
+        return None
+
+    return (
+        device.name,
+        device.format.type,
+        device.format.uuid,
+        getattr(device.format, "label", None),
+        device.size,
+        marker
+    )
+
+
+def _read_change_marker(path, fstype):
+    """Read a change marker of a file system.
+
+    Ext file systems have the last mount and write time in their
+    superblocks. Btrfs file systems have the generation of the
+    last committed transaction.
+
+    :param path: a path to the device
+    :param fstype: a type of the file system
+    :return: a tuple or None if there is no marker
+    """
+    try:
+        if fstype in ("ext2", "ext3", "ext4"):
+            data = _read_block(path, EXT_SUPERBLOCK_OFFSET, 0x40)
+            magic, = struct.unpack_from("<H", data, 0x38)
+
+            if magic == EXT_MAGIC:
+                return struct.unpack_from("<II", data, 0x2C)
+
+        elif fstype == "btrfs":
+            data = _read_block(path, BTRFS_SUPERBLOCK_OFFSET, 0x50)
+
+            if data[0x40:0x48] == BTRFS_MAGIC:
+                return struct.unpack_from("<Q", data, 0x48)
+
+    except (OSError, struct.error) as e:
+        log.debug("Failed to read the superblock of %s: %s", path, e)
+
+    return None
+
+
+def _read_block(path, offset, size):
+    """Read a block of data from a device."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
 def get_release_string(chroot):
     """Identify the installation of a Linux distribution.
 
@@ -375,10 +653,13 @@ class Root(object):
     def copy(self, storage):
         """Create a copy with devices of the given storage model.
 
+        The devices are not copied. They are replaced with
+        the devices of the given storage model.
+
         :param InstallerStorage storage: a storage model
         :return Root: a copy of this root object
         """
-        new_root = copy.deepcopy(self)
+        new_root = copy.copy(self)
 
         def _get_device(d):
             return storage.devicetree.get_device_by_id(d.id, hidden=True)
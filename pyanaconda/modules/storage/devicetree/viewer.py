@@ -111,6 +111,15 @@ class DeviceTreeViewer(ABC):
         data.attrs = self._prune_attributes(data.attrs)
         return data
 
+    def get_devices_data(self, names):
+        """Get data of the given devices.
+
+        :param names: a list of device names
+        :return: a list of DeviceData in the same order
+        :raise: UnknownDeviceError if a device is not found
+        """
+        return list(map(self.get_device_data, names))
+
     def _set_device_data(self, device, data):
         """Set data for a device of any type."""
         data.type = device.type
@@ -174,6 +183,15 @@ class DeviceTreeViewer(ABC):
         device = self._get_device(device_name)
         return self._get_format_data(device.format)
 
+    def get_formats_data(self, device_names):
+        """Get the format data of the given devices.
+
+        :param device_names: a list of device names
+        :return: a list of DeviceFormatData in the same order
+        :raise: UnknownDeviceError if a device is not found
+        """
+        return list(map(self.get_format_data, device_names))
+
     def _get_format_data(self, fmt):
         """Get the format data.
 
@@ -413,6 +431,20 @@ class DeviceTreeViewer(ABC):
         disks = self._get_devices(disk_names)
         return self.storage.get_disk_free_space(disks).get_bytes()
 
+    def get_disks_free_space(self, disk_names):
+        """Get free space on each of the given disks.
+
+        Calculates free space available for use.
+
+        :param disk_names: a list of disk names
+        :return: a dictionary of disk names and sizes in bytes
+        """
+        disks = self._get_devices(disk_names)
+        return {
+            name: size.get_bytes() for name, size
+            in self.storage.get_disks_free_space(disks).items()
+        }
+
     def get_disk_reclaimable_space(self, disk_names):
         """Get total reclaimable space on the given disks.
 
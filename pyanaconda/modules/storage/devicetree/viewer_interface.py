@@ -70,6 +70,18 @@ class DeviceTreeViewerInterface(InterfaceTemplate):
         """
         return DeviceData.to_structure(self.implementation.get_device_data(name))
 
+    def GetDevicesData(self, names: List[Str]) -> List[Structure]:
+        """Get data of the given devices.
+
+        Use this method instead of calling GetDeviceData
+        for each device.
+
+        :param names: a list of device names
+        :return: a list of structures with device data
+        :raise: UnknownDeviceError if a device is not found
+        """
+        return DeviceData.to_structure_list(self.implementation.get_devices_data(names))
+
     def GetFormatData(self, name: Str) -> Structure:
         """Get the device format data.
 
@@ -82,6 +94,18 @@ class DeviceTreeViewerInterface(InterfaceTemplate):
         """
         return DeviceFormatData.to_structure(self.implementation.get_format_data(name))
 
+    def GetFormatsData(self, names: List[Str]) -> List[Structure]:
+        """Get the format data of the given devices.
+
+        Use this method instead of calling GetFormatData
+        for each device.
+
+        :param names: a list of device names
+        :return: a list of structures with format data
+        :raise: UnknownDeviceError if a device is not found
+        """
+        return DeviceFormatData.to_structure_list(self.implementation.get_formats_data(names))
+
     def GetFormatTypeData(self, name: Str) -> Structure:
         """Get the format type data.
 
@@ -159,6 +183,16 @@ class DeviceTreeViewerInterface(InterfaceTemplate):
         """
         return self.implementation.get_disk_free_space(disk_names)
 
+    def GetDisksFreeSpace(self, disk_names: List[Str]) -> Dict[Str, UInt64]:
+        """Get free space on each of the given disks.
+
+        Calculates free space available for use.
+
+        :param disk_names: a list of disk names
+        :return: a dictionary of disk names and sizes in bytes
+        """
+        return self.implementation.get_disks_free_space(disk_names)
+
     def GetDiskReclaimableSpace(self, disk_names: List[Str]) -> UInt64:
         """Get total reclaimable space on the given disks.
 
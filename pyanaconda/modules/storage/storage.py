@@ -29,6 +29,7 @@ from pyanaconda.modules.storage.bootloader import BootloaderModule
 from pyanaconda.modules.storage.checker import StorageCheckerModule
 from pyanaconda.modules.storage.dasd import DASDModule
 from pyanaconda.modules.storage.devicetree import DeviceTreeModule, create_storage
+from pyanaconda.modules.storage.devicetree.root import ProbeCache
 from pyanaconda.modules.storage.disk_initialization import DiskInitializationModule
 from pyanaconda.modules.storage.disk_selection import DiskSelectionModule
 from pyanaconda.modules.storage.fcoe import FCOEModule
@@ -61,6 +62,9 @@ class StorageService(KickstartService):
         self._storage_playground = None
         self.storage_changed = Signal()
 
+        # The cache of probed devices shared by all storage models.
+        self._probe_cache = ProbeCache()
+
         # The created partitioning modules.
         self._created_partitioning = []
         self.created_partitioning_changed = Signal()
@@ -219,6 +223,7 @@ class StorageService(KickstartService):
 
         :param storage: a storage
         """
+        storage.probe_cache = self._probe_cache
         self._current_storage = storage
 
         if self._storage_playground:
@@ -28,7 +28,7 @@ from pyanaconda.modules.payloads.payload.dnf.initialization import configure_dnf
 from pyanaconda.modules.payloads.payload.dnf.installation import ImportRPMKeysTask, \
     SetRPMMacrosTask, DownloadPackagesTask, InstallPackagesTask, PrepareDownloadLocationTask, \
     CleanUpDownloadLocationTask, ResolvePackagesTask, UpdateDNFConfigurationTask, \
-    WriteRepositoriesTask
+    WriteRepositoriesTask, PrefetchPackagesTask
 from pyanaconda.modules.payloads.payload.dnf.repositories import \
     generate_driver_disk_repositories, update_treeinfo_repositories
 from pyanaconda.modules.payloads.payload.dnf.tear_down import ResetDNFManagerTask
@@ -47,8 +47,10 @@ from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.constants import PAYLOAD_TYPE_DNF, SOURCE_TYPE_URL, \
     SOURCE_REPO_FILE_TYPES, SOURCE_TYPE_REPO_PATH, SOURCE_TYPE_CDN, MULTILIB_POLICY_ALL, \
     REPO_ORIGIN_SYSTEM, SOURCE_TYPE_CLOSEST_MIRROR, REPO_ORIGIN_TREEINFO, DRACUT_REPO_DIR, \
-    SOURCE_TYPE_CDROM, SOURCE_TYPE_NFS, SOURCE_TYPE_HDD, SOURCE_TYPE_HMC
+    SOURCE_TYPE_CDROM, SOURCE_TYPE_NFS, SOURCE_TYPE_HDD, SOURCE_TYPE_HMC, \
+    THREAD_PAYLOAD_PREFETCH
 from pyanaconda.core.i18n import _
+from pyanaconda.core.threads import thread_manager
 from pyanaconda.errors import errorHandler as error_handler, ERROR_RAISE
 from pyanaconda.modules.common.constants.services import SUBSCRIPTION
 from pyanaconda.modules.common.util import is_module_available
@@ -78,6 +80,9 @@ class DNFPayload(Payload):
 
         self._dnf_manager = DNFManager()
 
+        # The location of prefetched packages.
+        self._prefetch_location = None
+
         # List of internal sources.
         self._internal_sources = []
 
@@ -460,9 +465,47 @@ class DNFPayload(Payload):
     def space_required(self):
         return calculate_required_space(self._dnf_manager)
 
+    def start_package_prefetch(self):
+        """Start to download packages in the background."""
+        thread_manager.add_thread(
+            name=THREAD_PAYLOAD_PREFETCH,
+            target=self._prefetch_packages
+        )
+
+    def _prefetch_packages(self):
+        """Download the resolved packages in advance.
+
+        The prefetch is speculative. Errors are only logged and
+        the installation will download the packages as usual.
+        """
+        try:
+            task = ResolvePackagesTask(self._dnf_manager, self.get_packages_selection())
+            task.run()
+
+            task = PrefetchPackagesTask(self._dnf_manager)
+            task.progress_changed_signal.connect(lambda step, msg: log.debug(msg))
+            self._prefetch_location = task.run()
+        except Exception as e:  # pylint: disable=broad-except
+            log.warning("Failed to prefetch packages: %s", str(e))
+            self._prefetch_location = None
+
+    def _wait_for_package_prefetch(self):
+        """Wait for the package prefetch to finish.
+
+        :return: a path to the prefetched packages or None
+        """
+        if thread_manager.exists(THREAD_PAYLOAD_PREFETCH):
+            self._progress_cb(0, _('Waiting for the package prefetch to finish'))
+            thread_manager.wait(THREAD_PAYLOAD_PREFETCH)
+
+        return self._prefetch_location
+
     def install(self):
         self._progress_cb(0, _('Starting package installation process'))
 
+        # Don't use the DNF base during the package prefetch.
+        prefetch_location = self._wait_for_package_prefetch()
+
         # Get the packages configuration and selection data.
         configuration = self.get_packages_configuration()
         selection = self.get_packages_selection()
@@ -484,11 +527,11 @@ class DNFPayload(Payload):
             if error_handler.cb(e) == ERROR_RAISE:
                 raise InstallationError(str(e)) from e
 
-        # Set up the download location.
-        task = PrepareDownloadLocationTask(self._dnf_manager)
+        # Set up the download location. Reuse the prefetched packages if possible.
+        task = PrepareDownloadLocationTask(self._dnf_manager, prefetch_location)
         task.run()
 
-        # Download the packages.
+        # Download the packages. The prefetched packages are skipped.
         task = DownloadPackagesTask(self._dnf_manager)
         task.progress_changed_signal.connect(self._progress_cb)
         task.run()
@@ -692,22 +735,25 @@ class DNFPayload(Payload):
 
     def _include_additional_repositories(self):
         """Add additional repositories to DNF."""
+        repo_ids = []
+
         for data in self.get_repo_configurations():
             log.debug("Add the '%s' repository (%s).", data.name, data)
 
             # A system repository can be only enabled or disabled.
             if data.origin == REPO_ORIGIN_SYSTEM:
                 self._handle_system_repository(data)
-                return
+                break
 
             # Set up additional sources.
             repository = self._set_up_additional_repository(data)
 
             # Add a new repository.
             self._dnf_manager.add_repository(repository)
+            repo_ids.append(repository.name)
 
-            # Load an enabled repository to check its validity.
-            self._dnf_manager.load_repository(repository.name)
+        # Load enabled repositories to check their validity.
+        self._dnf_manager.load_repositories(repo_ids)
 
     def _validate_enabled_repositories(self):
         """Validate all enabled repositories.
@@ -718,11 +764,10 @@ class DNFPayload(Payload):
         The user repositories are validated when we add them
         to DNF, so this covers invalid system repositories.
         """
-        for repo_id in self.dnf_manager.enabled_repositories:
-            try:
-                self.dnf_manager.load_repository(repo_id)
-            except MetadataError as e:
-                self._report.warning_messages.append(str(e))
+        try:
+            self.dnf_manager.load_repositories(self.dnf_manager.enabled_repositories)
+        except MetadataError as e:
+            self._report.warning_messages.extend(str(e).splitlines())
 
     def _remove_treeinfo_repositories(self):
         """Remove all old treeinfo repositories before loading new ones.
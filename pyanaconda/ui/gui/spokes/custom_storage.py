@@ -432,17 +432,38 @@ class CustomPartitioningSpoke(NormalSpoke, StorageCheckHandler):
         self._partitionsNotebook.set_current_page(NOTEBOOK_LABEL_PAGE)
         self._set_page_label_text()
 
+    def _get_selectors_data(self, device_names):
+        """Get the device and format data of the given devices at once.
+
+        :return: a dictionary of device names and tuples of the data
+        """
+        device_names = list(dict.fromkeys(device_names))
+
+        devices_data = DeviceData.from_structure_list(
+            self._device_tree.GetDevicesData(device_names)
+        )
+        formats_data = DeviceFormatData.from_structure_list(
+            self._device_tree.GetFormatsData(device_names)
+        )
+
+        return dict(zip(device_names, zip(devices_data, formats_data)))
+
     def _add_root_page(self, root: OSData):
         page = Page(root.os_name)
         self._accordion.add_page(page, cb=self.on_page_clicked)
 
+        selectors_data = self._get_selectors_data(
+            list(root.mount_points.values()) + root.devices
+        )
+
         for mount_point, device_name in root.mount_points.items():
             selector = MountPointSelector()
             self._update_selector(
                 selector,
                 device_name=device_name,
                 root_name=root.os_name,
-                mount_point=mount_point
+                mount_point=mount_point,
+                selector_data=selectors_data[device_name]
             )
             page.add_selector(selector, self.on_selector_clicked)
 
@@ -456,7 +477,8 @@ class CustomPartitioningSpoke(NormalSpoke, StorageCheckHandler):
             self._update_selector(
                 selector,
                 device_name=device_name,
-                root_name=root.os_name
+                root_name=root.os_name,
+                selector_data=selectors_data[device_name]
             )
             page.add_selector(selector, self.on_selector_clicked)
 
@@ -466,14 +488,21 @@ class CustomPartitioningSpoke(NormalSpoke, StorageCheckHandler):
         page = UnknownPage(_("Unknown"))
         self._accordion.add_page(page, cb=self.on_page_clicked)
 
+        selectors_data = self._get_selectors_data(devices)
+
         for device_name in sorted(devices):
             selector = MountPointSelector()
-            self._update_selector(selector, device_name)
+            self._update_selector(
+                selector,
+                device_name,
+                selector_data=selectors_data[device_name]
+            )
             page.add_selector(selector, self.on_selector_clicked)
 
         page.show_all()
 
-    def _update_selector(self, selector, device_name="", root_name="", mount_point=""):
+    def _update_selector(self, selector, device_name="", root_name="", mount_point="",
+                         selector_data=None):
         if not selector:
             return
 
@@ -483,13 +512,16 @@ class CustomPartitioningSpoke(NormalSpoke, StorageCheckHandler):
         if not root_name:
             root_name = selector.root_name
 
-        device_data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(device_name)
-        )
+        if selector_data:
+            device_data, format_data = selector_data
+        else:
+            device_data = DeviceData.from_structure(
+                self._device_tree.GetDeviceData(device_name)
+            )
 
-        format_data = DeviceFormatData.from_structure(
-            self._device_tree.GetFormatData(device_name)
-        )
+            format_data = DeviceFormatData.from_structure(
+                self._device_tree.GetFormatData(device_name)
+            )
 
         mount_point = self._get_mount_point_description(
             mount_point, format_data
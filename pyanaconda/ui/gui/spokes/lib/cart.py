@@ -89,14 +89,13 @@ class SelectedDisksDialog(GUIObject):
         return rc
 
     def _update_disks(self):
-        for device_name in self._disks:
-            device_data = DeviceData.from_structure(
-                self._device_tree.GetDeviceData(device_name)
-            )
-
-            device_free_space = self._device_tree.GetDiskFreeSpace(
-                [device_name]
-            )
+        devices_data = DeviceData.from_structure_list(
+            self._device_tree.GetDevicesData(self._disks)
+        )
+        free_spaces = self._device_tree.GetDisksFreeSpace(self._disks)
+
+        for device_name, device_data in zip(self._disks, devices_data):
+            device_free_space = free_spaces[device_name]
 
             self._store.append([
                 False,
@@ -138,8 +138,19 @@ class ResizeDialog(GUIObject):
         total_disks = 0
         total_reclaimable_space = Size(0)
 
-        for disk_name in disks:
-            disk_reclaimable_space = self._add_disk(disk_name)
+        # Get the data of all disks at once.
+        devices_data = DeviceData.from_structure_list(
+            self._device_tree.GetDevicesData(disks)
+        )
+        formats_data = DeviceFormatData.from_structure_list(
+            self._device_tree.GetFormatsData(disks)
+        )
+        free_spaces = self._device_tree.GetDisksFreeSpace(disks)
+
+        for device_data, format_data in zip(devices_data, formats_data):
+            disk_reclaimable_space = self._add_disk(
+                device_data, format_data, Size(free_spaces[device_data.name])
+            )
             total_reclaimable_space += disk_reclaimable_space
             total_disks += 1
 
@@ -161,14 +172,8 @@ class ResizeDialog(GUIObject):
         self._reclaim_desc_label.set_text(description)
         self._update_reclaim_button(Size(0))
 
-    def _add_disk(self, device_name):
-        # Get the device data.
-        device_data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(device_name)
-        )
-        format_data = DeviceFormatData.from_structure(
-            self._device_tree.GetFormatData(device_name)
-        )
+    def _add_disk(self, device_data, format_data, disk_free):
+        device_name = device_data.name
 
         # First add the disk itself.
         is_partitioned = self._device_tree.IsDevicePartitioned(device_name)
@@ -199,14 +204,20 @@ class ResizeDialog(GUIObject):
 
         # Then add all its partitions.
         partitions = self._device_tree.GetDevicePartitions(device_name)
+        partitions_data = DeviceData.from_structure_list(
+            self._device_tree.GetDevicesData(partitions)
+        )
+        partitions_formats_data = DeviceFormatData.from_structure_list(
+            self._device_tree.GetFormatsData(partitions)
+        )
 
-        for child_name in partitions:
-            free_size = self._add_partition(itr, child_name)
+        for child_data, child_format_data in zip(partitions_data, partitions_formats_data):
+            free_size = self._add_partition(itr, child_data, child_format_data)
             disk_reclaimable_space += free_size
 
         # And then add another uneditable line that lists how much space is
         # already free in the disk.
-        self._add_free_space(itr, device_name)
+        self._add_free_space(itr, disk_free)
 
         # And then go back and fill in the total reclaimable space for the
         # disk, now that we know what each partition has reclaimable.
@@ -215,14 +226,8 @@ class ResizeDialog(GUIObject):
 
         return disk_reclaimable_space
 
-    def _add_partition(self, itr, device_name):
-        # Get the device data.
-        device_data = DeviceData.from_structure(
-            self._device_tree.GetDeviceData(device_name)
-        )
-        format_data = DeviceFormatData.from_structure(
-            self._device_tree.GetFormatData(device_name)
-        )
+    def _add_partition(self, itr, device_data, format_data):
+        device_name = device_data.name
 
         # Calculate the free size.
         # Devices that are not resizable are still deletable.
@@ -270,10 +275,7 @@ class ResizeDialog(GUIObject):
 
         return free_size
 
-    def _add_free_space(self, itr, device_name):
-        # Calculate the free space.
-        disk_free = Size(self._device_tree.GetDiskFreeSpace([device_name]))
-
+    def _add_free_space(self, itr, disk_free):
         if disk_free < Size("1MiB"):
             return
 
@@ -391,20 +391,29 @@ class StorageSpoke(NormalSpoke, StorageCheckHandler):
         # of them, we do not display them in the box by default.  Instead, only
         # those selected in the filter UI are displayed.  This means refresh
         # needs to know to create and destroy overviews as appropriate.
-        for device_name in self._available_disks:
+        # The data of all disks are requested at once, since there can
+        # be hundreds of them.
+        devices_data = DeviceData.from_structure_list(
+            self._device_tree.GetDevicesData(self._available_disks)
+        )
+        overviews = []
 
-            # Get the device data.
-            device_data = DeviceData.from_structure(
-                self._device_tree.GetDeviceData(device_name)
-            )
+        for device_data in devices_data:
 
             if is_local_disk(device_data.type):
                 # Add all available local disks.
-                self._add_disk_overview(device_data, self._local_disks_box)
+                overviews.append((device_data, self._local_disks_box))
 
-            elif device_name in self._selected_disks:
+            elif device_data.name in self._selected_disks:
                 # Add only selected advanced disks.
-                self._add_disk_overview(device_data, self._specialized_disks_box)
+                overviews.append((device_data, self._specialized_disks_box))
+
+        free_spaces = self._device_tree.GetDisksFreeSpace(
+            [device_data.name for device_data, box in overviews]
+        )
+
+        for device_data, box in overviews:
+            self._add_disk_overview(device_data, free_spaces[device_data.name], box)
 
         # update the selections in the ui
         for overview in self.local_overviews + self.advanced_overviews:
@@ -449,7 +458,7 @@ class StorageSpoke(NormalSpoke, StorageCheckHandler):
             target=self._initialize
         )
 
-    def _add_disk_overview(self, device_data, box):
+    def _add_disk_overview(self, device_data, free_space, box):
         if device_data.type == "dm-multipath":
             # We don't want to display the whole huge WWID for a multipath device.
             wwn = device_data.attrs.get("wwn", "")
@@ -470,7 +479,6 @@ class StorageSpoke(NormalSpoke, StorageCheckHandler):
             description = device_data.description
 
         kind = "drive-removable-media" if device_data.removable else "drive-harddisk"
-        free_space = self._device_tree.GetDiskFreeSpace([device_data.name])
         serial_number = device_data.attrs.get("serial") or None
 
         overview = AnacondaWidgets.DiskOverview(
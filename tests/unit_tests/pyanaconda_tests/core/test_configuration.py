@@ -561,6 +561,50 @@ class AnacondaConfigurationTestCase(unittest.TestCase):
         conf = AnacondaConfiguration.from_defaults()
         assert conf.payload.default_source == SOURCE_TYPE_CLOSEST_MIRROR
 
+    def test_live_image_copier(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.live_image_copier == "RSYNC"
+
+        parser = conf.get_parser()
+        parser.set("Payload", "live_image_copier", "NATIVE")
+        assert conf.payload.live_image_copier == "NATIVE"
+
+        parser.set("Payload", "live_image_copier", "CP")
+
+        with pytest.raises(ValueError):
+            _ = conf.payload.live_image_copier
+
+    def test_resource_sampling_interval(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.anaconda.resource_sampling_interval == 0
+
+        parser = conf.get_parser()
+        parser.set("Anaconda", "resource_sampling_interval", "0.5")
+        assert conf.anaconda.resource_sampling_interval == 0.5
+
+        parser.set("Anaconda", "resource_sampling_interval", "-1")
+
+        with pytest.raises(ValueError):
+            _ = conf.anaconda.resource_sampling_interval
+
+    def test_initramfs_max_workers(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.bootloader.initramfs_max_workers == 0
+
+        parser = conf.get_parser()
+        parser.set("Bootloader", "initramfs_max_workers", "4")
+        assert conf.bootloader.initramfs_max_workers == 4
+
+        parser.set("Bootloader", "initramfs_max_workers", "-1")
+
+        with pytest.raises(ValueError):
+            _ = conf.bootloader.initramfs_max_workers
+
+    def test_default_metadata_cache(self):
+        conf = AnacondaConfiguration.from_defaults()
+        assert conf.payload.metadata_cache_dir == ""
+        assert conf.payload.metadata_cache_size == Size("1 GiB")
+
     def test_default_password_policies(self):
         conf = AnacondaConfiguration.from_defaults()
         assert conf.ui.password_policies == [
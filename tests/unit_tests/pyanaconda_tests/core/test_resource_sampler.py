@@ -0,0 +1,185 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest.mock import patch
+
+from pyanaconda.core.resource_sampler import ResourceSampler, get_process_group
+
+MEMINFO = """
+MemTotal:        4000000 kB
+MemFree:         1000000 kB
+MemAvailable:    2048000 kB
+SwapTotal:       1000000 kB
+SwapFree:         900000 kB
+""".lstrip()
+
+PRESSURE = """
+some avg10={} avg60=0.00 avg300=0.00 total=0
+full avg10=0.00 avg60=0.00 avg300=0.00 total=0
+""".lstrip()
+
+
+class ProcessGroupTestCase(unittest.TestCase):
+    """Test the groups of processes."""
+
+    def test_get_process_group(self):
+        """Test the get_process_group function."""
+        assert get_process_group(["/usr/bin/python3", "/sbin/anaconda", "--text"]) == \
+            "anaconda"
+        assert get_process_group(["python3", "-m", "pyanaconda.modules.boss"]) == \
+            "boss"
+        assert get_process_group(["python3", "-m", "pyanaconda.modules.storage"]) == \
+            "storage"
+        assert get_process_group(["python3", "-m", "org_fedora_hello_world.service"]) == \
+            "org_fedora_hello_world.service"
+        assert get_process_group(["python3", "-m", "http.server"]) is None
+        assert get_process_group(["/usr/bin/rpm", "-i", "anaconda"]) is None
+        assert get_process_group([""]) is None
+
+
+class ResourceSamplerTestCase(unittest.TestCase):
+    """Test the sampler of the resource usage."""
+
+    def setUp(self):
+        self._proc = tempfile.mkdtemp()
+        self._write("meminfo", content=MEMINFO)
+        self._set_pressure(cpu=1.5, memory=0.0)
+
+        # Use fixed values of the system.
+        with patch("pyanaconda.core.resource_sampler.os.sysconf") as sysconf:
+            sysconf.side_effect = lambda name: {"SC_PAGE_SIZE": 4096, "SC_CLK_TCK": 100}[name]
+            self._sampler = ResourceSampler(proc_root=self._proc)
+
+    def tearDown(self):
+        self._sampler.stop()
+        shutil.rmtree(self._proc)
+
+    def _write(self, *path, content):
+        """Write a file in the fake /proc."""
+        path = os.path.join(self._proc, *path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _set_pressure(self, **values):
+        """Set the pressure stall information."""
+        for resource, value in values.items():
+            self._write("pressure", resource, content=PRESSURE.format(value))
+
+    def _add_process(self, pid, ppid, cmdline, rss_pages, cpu_ticks=0, read_bytes=0):
+        """Add a process to the fake /proc."""
+        fields = ["S", ppid] + [0] * 9 + [cpu_ticks, 0] + [0] * 6 + [1000 + pid, 0, rss_pages]
+        self._write(str(pid), "stat", content="{} (a (b) c) {}\n".format(
+            pid, " ".join(map(str, fields))
+        ))
+        self._write(str(pid), "cmdline", content="\0".join(cmdline) + "\0")
+        self._write(str(pid), "io", content="read_bytes: {}\nwrite_bytes: 0\n".format(read_bytes))
+
+    def test_sample(self):
+        """Test a sample of the resource usage."""
+        self._add_process(1, 0, ["/usr/lib/systemd/systemd"], 1000)
+        self._add_process(10, 1, ["/usr/bin/python3", "/usr/sbin/anaconda"], 256)
+        self._add_process(20, 1, ["python3", "-m", "pyanaconda.modules.payloads"], 512)
+        self._add_process(21, 20, ["/usr/bin/rpm", "-i"], 256)
+        self._add_process(22, 21, ["/bin/sh", "scriptlet"], 256)
+
+        self._sampler.set_phase("Installing the software")
+        self._sampler.start_task("Install the payload")
+        sample = self._sampler.sample()
+
+        assert sample["phase"] == "Installing the software"
+        assert sample["tasks"] == ["Install the payload"]
+        assert sample["available_memory"] == 2048000
+        assert sample["used_swap"] == 100000
+        assert sample["pressure"] == {"cpu": 1.5, "memory": 0.0, "io": None}
+        assert sample["groups"] == {
+            "anaconda": {"rss": 1024, "cpu": 0, "read": 0, "write": 0},
+            "payloads": {"rss": 4096, "cpu": 0, "read": 0, "write": 0},
+        }
+
+    def test_usage_since_last_sample(self):
+        """Test the CPU and I/O usage between samples."""
+        self._add_process(20, 1, ["python3", "-m", "pyanaconda.modules.storage"], 256)
+        self._sampler.sample()
+
+        self._add_process(20, 1, ["python3", "-m", "pyanaconda.modules.storage"], 256,
+                          cpu_ticks=50, read_bytes=2048 * 1024)
+
+        with patch("pyanaconda.core.resource_sampler.time.monotonic") as monotonic:
+            monotonic.return_value = self._sampler._last_time + 1
+            sample = self._sampler.sample()
+
+        assert sample["groups"]["storage"] == {"rss": 1024, "cpu": 50.0, "read": 2048, "write": 0}
+
+    def test_report(self):
+        """Test the report of the peak usage."""
+        assert self._sampler.get_report() == "No resource usage was sampled."
+
+        self._add_process(10, 1, ["/usr/sbin/anaconda"], 256)
+        self._add_process(20, 1, ["python3", "-m", "pyanaconda.modules.storage"], 1024)
+        self._sampler.sample()
+
+        self._sampler.set_phase("Installing the software")
+        self._set_pressure(memory=12.5)
+        self._add_process(20, 1, ["python3", "-m", "pyanaconda.modules.storage"], 512)
+        self._add_process(30, 1, ["python3", "-m", "pyanaconda.modules.payloads"], 2048)
+        self._sampler.sample()
+
+        self._add_process(30, 1, ["python3", "-m", "pyanaconda.modules.payloads"], 4096)
+        self._sampler.sample()
+
+        assert self._sampler.get_report() == "\n".join([
+            "Peak RSS per module (MiB):",
+            "  anaconda: 1 (in Setup)",
+            "  payloads: 16 (in Installing the software)",
+            "  storage: 4 (in Setup)",
+            "Peak RSS per phase (MiB):",
+            "  Setup: 5 total, anaconda 1, storage 4",
+            "  Installing the software: 19 total, anaconda 1, payloads 16, storage 2",
+            "Minimal available memory: 2000 MiB",
+            "Maximal pressure in 10 seconds: cpu 1.5%, memory 12.5%",
+        ])
+
+    def test_run(self):
+        """Test the sampling thread."""
+        self._add_process(20, 1, ["python3", "-m", "pyanaconda.modules.boss"], 256)
+        samples_path = os.path.join(self._proc, "samples.log")
+        report_path = os.path.join(self._proc, "report.log")
+
+        self._sampler.start(60, samples_path=samples_path)
+        assert self._sampler.is_running
+
+        self._sampler.stop()
+        assert not self._sampler.is_running
+
+        with open(samples_path) as f:
+            samples = [json.loads(line) for line in f]
+
+        assert len(samples) == 1
+        assert samples[0]["groups"]["boss"]["rss"] == 1024
+
+        self._sampler.write_report(report_path)
+
+        with open(report_path) as f:
+            assert f.read() == self._sampler.get_report() + "\n"
@@ -0,0 +1,123 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import json
+import os
+import tempfile
+import threading
+import unittest
+import pytest
+
+from pyanaconda.core.tracing import Tracer
+
+
+class TracerTestCase(unittest.TestCase):
+    """Test the tracer of installation tasks."""
+
+    def setUp(self):
+        self._tracer = Tracer()
+        self._path = tempfile.mktemp(prefix="anaconda-trace-")
+
+    def tearDown(self):
+        self._tracer.disable()
+
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+
+    def _load_events(self):
+        """Load the events like the trace viewers do."""
+        with open(self._path) as f:
+            content = f.read()
+
+        assert content.startswith("[\n")
+        return json.loads(content.rstrip().rstrip(",") + "]")
+
+    def _get_spans(self):
+        """Get the traced spans."""
+        return [e for e in self._load_events() if e["ph"] == "X"]
+
+    def test_disabled(self):
+        """Test the disabled tracer."""
+        with self._tracer.span("task", "task"):
+            pass
+
+        assert not self._tracer.enabled
+        assert not os.path.exists(self._path)
+
+    def test_span(self):
+        """Test the traced spans."""
+        self._tracer.enable(self._path, process_name="test")
+
+        with self._tracer.span("task", "task", parent="queue"):
+            pass
+
+        with pytest.raises(RuntimeError):
+            with self._tracer.span("failing task", "task"):
+                raise RuntimeError("Fake!")
+
+        spans = self._get_spans()
+        assert len(spans) == 2
+
+        assert spans[0]["name"] == "task"
+        assert spans[0]["cat"] == "task"
+        assert spans[0]["pid"] == os.getpid()
+        assert spans[0]["tid"] == threading.get_native_id()
+        assert spans[0]["dur"] >= 0
+        assert spans[0]["args"] == {"parent": "queue", "outcome": "succeeded"}
+
+        assert spans[1]["name"] == "failing task"
+        assert spans[1]["ts"] >= spans[0]["ts"] + spans[0]["dur"]
+        assert spans[1]["args"] == {"outcome": "failed", "error": "RuntimeError"}
+
+    def test_metadata(self):
+        """Test the names of processes and threads."""
+        self._tracer.enable(self._path, process_name="test")
+
+        def run():
+            with self._tracer.span("thread task", "task"):
+                pass
+
+        thread = threading.Thread(target=run, name="AnaTestThread")
+        thread.start()
+        thread.join()
+
+        names = {
+            (e["name"], e["args"]["name"])
+            for e in self._load_events() if e["ph"] == "M"
+        }
+
+        assert ("process_name", "test") in names
+        assert ("thread_name", "AnaTestThread") in names
+
+    def test_shared_file(self):
+        """Test more tracers writing to the same file."""
+        other_tracer = Tracer()
+        self._tracer.enable(self._path, truncate=True)
+        other_tracer.enable(self._path)
+
+        try:
+            with self._tracer.span("first", "task"):
+                with other_tracer.span("second", "task"):
+                    pass
+        finally:
+            other_tracer.disable()
+
+        assert [e["name"] for e in self._get_spans()] == ["second", "first"]
+
+        # Start a new trace.
+        self._tracer.enable(self._path, truncate=True)
+        assert self._get_spans() == []
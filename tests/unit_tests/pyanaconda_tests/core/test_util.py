@@ -66,6 +66,59 @@ class RunProgramTests(unittest.TestCase):
         assert retcode == 0
         assert output == b'\xa0\xa1\xa2'
 
+    def test_run_program_large_output(self):
+        """Test _run_program with a large output."""
+        script = "for i in $(seq 20000); do echo line $i; echo error $i >&2; done"
+
+        retcode, output = util._run_program(["/bin/sh", "-c", script], log_output=False)
+        assert retcode == 0
+        assert len(output.splitlines()) == 40000
+
+        retcode, output = util._run_program(["/bin/sh", "-c", script], log_output=False,
+                                            filter_stderr=True)
+        assert retcode == 0
+        assert output.splitlines() == ["line {}".format(i) for i in range(1, 20001)]
+
+    def test_run_program_no_capture(self):
+        """Test _run_program without capturing the output."""
+        with tempfile.TemporaryFile("w+") as f:
+            retcode, output = util._run_program(["echo", "-n", "output"], stdout=f,
+                                                capture_output=False)
+            f.seek(0)
+
+            assert retcode == 0
+            assert output is None
+            assert f.read() == "output\n"
+
+    def test_run_program_invalid_text(self):
+        """Test _run_program with an output that is not UTF-8."""
+        with pytest.raises(UnicodeDecodeError):
+            util._run_program(['echo', '-en', r'\xa0\xa1\xa2'])
+
+    def test_exec_with_redirect_invalid_text(self):
+        """Test execWithRedirect with an output that is not UTF-8."""
+        lines = []
+
+        with tempfile.TemporaryFile("w+") as f:
+            retcode = util.execWithRedirect("echo", ["-en", r"a\xa0b\n"], stdout=f,
+                                            output_callback=lines.append)
+            f.seek(0)
+
+            assert retcode == 0
+            assert f.read() == "a\ufffdb\n"
+            assert lines == ["a\ufffdb"]
+
+    def test_run_program_output_callback(self):
+        """Test _run_program with an output callback."""
+        lines = []
+        script = "echo first; echo -n second; sleep 0.1; echo ' line'; echo -n third"
+
+        retcode, output = util._run_program(["/bin/sh", "-c", script],
+                                            output_callback=lines.append)
+        assert retcode == 0
+        assert output == "first\nsecond line\nthird\n"
+        assert lines == ["first", "second line", "third"]
+
     def test_exec_with_redirect(self):
         """Test execWithRedirect."""
         # correct calling should return rc==0
@@ -74,6 +127,13 @@ class RunProgramTests(unittest.TestCase):
         # incorrect calling should return rc!=0
         assert util.execWithRedirect('ls', ['--asdasd']) != 0
 
+        # the output should be redirected
+        with tempfile.TemporaryFile("w+") as f:
+            assert util.execWithRedirect('/bin/sh', ['-c', 'echo out; echo err >&2'],
+                                         stdout=f) == 0
+            f.seek(0)
+            assert f.read() == "out\nerr\n"
+
     def test_exec_with_capture(self):
         """Test execWithCapture."""
 
@@ -255,6 +255,18 @@ class BossInterfaceTestCase(unittest.TestCase):
         task = task_proxy.implementation
         assert task.name == "Copy installation logs"
 
+    @patch("pyanaconda.modules.boss.boss.resource_sampler")
+    def test_installation_phase_and_tasks(self, sampler):
+        """Test SetInstallationPhase, StartInstallationTask and FinishInstallationTask."""
+        self.interface.SetInstallationPhase("Payload installation")
+        sampler.set_phase.assert_called_once_with("Payload installation")
+
+        self.interface.StartInstallationTask("Install the payload")
+        sampler.start_task.assert_called_once_with("Install the payload")
+
+        self.interface.FinishInstallationTask("Install the payload")
+        sampler.finish_task.assert_called_once_with("Install the payload")
+
     def test_quit(self):
         """Test Quit."""
         assert self.interface.Quit() is None
@@ -47,7 +47,7 @@ class CopyLogsTaskTest(unittest.TestCase):
 
         for logfile in ["anaconda.log", "syslog", "X.log", "program.log", "packaging.log",
                         "storage.log", "ifcfg.log", "lvm.log", "dnf.librepo.log", "hawkey.log",
-                        "dbus.log"]:
+                        "dbus.log", "anaconda-trace.json"]:
             copy_file_mock.assert_any_call(
                 "/tmp/"+logfile,
                 "/var/log/anaconda/" + logfile
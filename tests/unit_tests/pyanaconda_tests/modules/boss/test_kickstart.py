@@ -18,6 +18,7 @@
 
 import unittest
 import os
+import threading
 from contextlib import contextmanager
 from unittest.mock import Mock
 
@@ -264,6 +265,33 @@ class KickstartManagerTestCase(unittest.TestCase):
 
         assert manager.generate_kickstart() == self._m123_kickstart
 
+    def test_distribute_in_parallel(self):
+        barrier = threading.Barrier(3, timeout=10)
+
+        module1 = ParallelTestModule(barrier, commands=["network", "firewall"])
+        module2 = ParallelTestModule(barrier, addons=["pony"])
+        module3 = ParallelTestModule(barrier, sections=["packages"])
+
+        manager = KickstartManager()
+        manager.on_module_observers_changed([
+            self._get_module_observer("1", module1),
+            self._get_module_observer("2", module2),
+            self._get_module_observer("3", module3),
+        ])
+
+        # The modules wait for each other, so the calls have to overlap.
+        with self._create_ks_files(self._kickstart_include) as filename:
+            report = manager.read_kickstart_file(filename)
+
+        assert module1.kickstart == self._m1_kickstart
+        assert module2.kickstart == self._m2_kickstart
+        assert module3.kickstart == self._m3_kickstart
+
+        assert [m.module_name for m in report.get_messages()] == ["1", "3"]
+        assert [m.line_number for m in report.get_messages()] == [5, 41]
+
+        assert manager.generate_kickstart() == self._m123_kickstart
+
     def test_nothing_to_parse(self):
         ks_content = ""
         manager = KickstartManager()
@@ -375,3 +403,18 @@ class TestModule(object):
     def GenerateKickstart(self):
         """Mock generating a kickstart."""
         return self.kickstart
+
+
+class ParallelTestModule(TestModule):
+
+    def __init__(self, barrier, **kwargs):
+        super().__init__(**kwargs)
+        self._barrier = barrier
+
+    def ReadKickstart(self, kickstart):
+        self._barrier.wait()
+        return super().ReadKickstart(kickstart)
+
+    def GenerateKickstart(self):
+        self._barrier.wait()
+        return super().GenerateKickstart()
@@ -18,11 +18,13 @@
 import unittest
 import pytest
 
-from time import sleep
-from unittest.mock import Mock
+from threading import Timer
+from time import sleep, perf_counter
+from unittest.mock import Mock, patch
 
 from dasbus.server.interface import dbus_class
 from dasbus.typing import *  # pylint: disable=wildcard-import
+from pyanaconda.core.signal import Signal
 from pyanaconda.modules.common.errors.task import NoResultError
 from pyanaconda.modules.common.task import Task, TaskInterface, sync_run_task, \
     async_run_task, wait_for_task
@@ -567,3 +569,84 @@ class TaskInterfaceTestCase(unittest.TestCase):
 
         def run(self):
             sleep(0.75)
+
+
+class TaskWaiterTestCase(unittest.TestCase):
+    """Test the waiting for remote tasks."""
+
+    class FakeTaskProxy(object):
+        """Fake proxy of a remote task."""
+
+        def __init__(self, duration, emit_stopped=True):
+            self.IsRunning = False
+            self.Stopped = Mock(wraps=Signal())
+            self.ProgressChanged = Mock(wraps=Signal())
+            self.Progress = (0, "")
+            self.Finish = Mock()
+            self._duration = duration
+            self._emit_stopped = emit_stopped
+
+        def Start(self):
+            self.IsRunning = True
+            Timer(self._duration / 2, self._report_progress).start()
+            Timer(self._duration, self._stop).start()
+
+        def _report_progress(self):
+            self.Progress = (1, "Halfway")
+            self.ProgressChanged.emit(*self.Progress)
+
+        def _stop(self):
+            self.IsRunning = False
+
+            if self._emit_stopped:
+                self.Stopped.emit()
+
+    def setUp(self):
+        patcher = patch("pyanaconda.modules.common.task.thread_manager")
+        self.thread_manager = patcher.start()
+        self.thread_manager.in_main_thread.return_value = False
+        self.addCleanup(patcher.stop)
+
+    def test_sync_run_with_signals(self):
+        """Run a remote task and wait for its signals."""
+        task_proxy = self.FakeTaskProxy(duration=0.2)
+        callback = Mock()
+
+        start = perf_counter()
+        sync_run_task(task_proxy, callback)
+        assert perf_counter() - start < 0.9
+
+        task_proxy.Finish.assert_called_once_with()
+        assert task_proxy.Stopped.disconnect.call_count == 1
+        assert task_proxy.ProgressChanged.disconnect.call_count == 1
+
+        # The callback is called also after the progress change.
+        messages = [call.args[0].Progress for call in callback.mock_calls]
+        assert (1, "Halfway") in messages
+
+    @patch("pyanaconda.modules.common.task.TASK_CHECK_INTERVAL", 0.1)
+    def test_sync_run_without_signals(self):
+        """Run a remote task with a lost signal."""
+        task_proxy = self.FakeTaskProxy(duration=0.2, emit_stopped=False)
+        sync_run_task(task_proxy)
+        task_proxy.Finish.assert_called_once_with()
+
+    def test_sync_run_in_main_thread(self):
+        """Run a remote task in the main thread."""
+        self.thread_manager.in_main_thread.return_value = True
+        task_proxy = self.FakeTaskProxy(duration=0.2, emit_stopped=False)
+        sync_run_task(task_proxy)
+        task_proxy.Finish.assert_called_once_with()
+
+    def test_wait_for_task_timeout(self):
+        """Wait for a remote task and time out."""
+        task_proxy = self.FakeTaskProxy(duration=0.5)
+        task_proxy.Start()
+
+        with pytest.raises(TimeoutError):
+            wait_for_task(task_proxy, timeout=0.1)
+
+        task_proxy.Finish.assert_not_called()
+
+        wait_for_task(task_proxy, timeout=1)
+        task_proxy.Finish.assert_called_once_with()
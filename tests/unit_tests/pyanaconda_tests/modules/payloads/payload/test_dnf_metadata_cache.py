@@ -0,0 +1,125 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import unittest
+
+from tempfile import TemporaryDirectory
+
+from pyanaconda.modules.payloads.payload.dnf.metadata_cache import MetadataCache
+
+
+class MetadataCacheTestCase(unittest.TestCase):
+    """Test the persistent cache of repository metadata."""
+
+    def _write_file(self, path, content):
+        """Write a file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _read_file(self, path):
+        """Read a file."""
+        with open(path) as f:
+            return f.read()
+
+    def _create_metadata(self, tmp, repo_id, content):
+        """Create fake metadata of a repository."""
+        repo_dir = os.path.join(tmp, "dnf.cache", repo_id + "-1234")
+        solv_dir = os.path.join(tmp, "dnf.cache")
+
+        self._write_file(os.path.join(repo_dir, "repodata", "repomd.xml"), content)
+        self._write_file(os.path.join(repo_dir, "repodata", "primary.xml.gz"), content * 10)
+        self._write_file(os.path.join(solv_dir, repo_id + ".solv"), "solv")
+        self._write_file(os.path.join(solv_dir, repo_id + "-filenames.solvx"), "solvx")
+        self._write_file(os.path.join(solv_dir, "other.solv"), "other")
+
+        return repo_dir, solv_dir
+
+    def test_restore_missing(self):
+        """Test the restore of missing metadata."""
+        with TemporaryDirectory() as tmp:
+            cache = MetadataCache(os.path.join(tmp, "cache"), 1024 * 1024)
+            repo_dir, solv_dir = self._create_metadata(tmp, "r1", "Metadata")
+
+            assert cache.restore(b"\x01", "r1", repo_dir, solv_dir) is False
+            assert cache.statistics.hits == 0
+            assert cache.statistics.misses == 1
+            assert cache.statistics.bytes_saved == 0
+
+    def test_store_missing(self):
+        """Test the store of missing metadata."""
+        with TemporaryDirectory() as tmp:
+            cache = MetadataCache(os.path.join(tmp, "cache"), 1024 * 1024)
+            cache.store(b"\x01", "r1", os.path.join(tmp, "none"), tmp)
+            assert not os.path.exists(os.path.join(tmp, "cache", "01"))
+
+    def test_store_and_restore(self):
+        """Test the store and restore of metadata."""
+        with TemporaryDirectory() as tmp:
+            cache = MetadataCache(os.path.join(tmp, "cache"), 1024 * 1024)
+            repo_dir, solv_dir = self._create_metadata(tmp, "r1", "Metadata")
+
+            cache.store(b"\x01", "r1", repo_dir, solv_dir)
+
+            entry_path = os.path.join(tmp, "cache", "01")
+            assert sorted(os.listdir(entry_path)) == ["repodata", "solv"]
+            assert sorted(os.listdir(os.path.join(entry_path, "solv"))) == [
+                "repo-filenames.solvx", "repo.solv"
+            ]
+
+            # Restore the metadata for a different repository.
+            new_repo_dir = os.path.join(tmp, "new.cache", "r2-5678")
+            new_solv_dir = os.path.join(tmp, "new.cache")
+
+            assert cache.restore(b"\x01", "r2", new_repo_dir, new_solv_dir) is True
+            assert cache.statistics.hits == 1
+            assert cache.statistics.misses == 0
+            assert cache.statistics.bytes_saved == 97
+
+            path = os.path.join(new_repo_dir, "repodata", "repomd.xml")
+            assert self._read_file(path) == "Metadata"
+
+            path = os.path.join(new_solv_dir, "r2.solv")
+            assert self._read_file(path) == "solv"
+
+            path = os.path.join(new_solv_dir, "r2-filenames.solvx")
+            assert self._read_file(path) == "solvx"
+
+            assert sorted(os.listdir(new_solv_dir)) == [
+                "r2-5678", "r2-filenames.solvx", "r2.solv"
+            ]
+
+    def test_eviction(self):
+        """Test the eviction of the least recently used metadata."""
+        with TemporaryDirectory() as tmp:
+            cache = MetadataCache(os.path.join(tmp, "cache"), 250)
+            repo_dir, solv_dir = self._create_metadata(tmp, "r1", "Metadata")
+
+            cache.store(b"\x01", "r1", repo_dir, solv_dir)
+            os.utime(os.path.join(tmp, "cache", "01"), (1, 1))
+
+            cache.store(b"\x02", "r1", repo_dir, solv_dir)
+            os.utime(os.path.join(tmp, "cache", "02"), (2, 2))
+
+            # Use the first entry.
+            assert cache.restore(b"\x01", "r1", repo_dir, solv_dir) is True
+
+            # The second entry is the least recently used.
+            cache.store(b"\x03", "r1", repo_dir, solv_dir)
+            assert sorted(os.listdir(os.path.join(tmp, "cache"))) == ["01", "03"]
@@ -0,0 +1,286 @@
+#
+# Copyright (C) 2021  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import struct
+import tempfile
+import unittest
+import uuid
+import pytest
+
+from unittest.mock import patch, call, mock_open
+
+from pyanaconda.modules.common.errors.installation import PayloadInstallationError
+from pyanaconda.modules.payloads.payload.live_image.block_deployment import BlockDeployment, \
+    Mount, read_ext_superblock, get_mounts
+
+MODULE = "pyanaconda.modules.payloads.payload.live_image.block_deployment"
+
+IMAGE_UUID = "11111111-2222-3333-4444-555555555555"
+TARGET_UUID = "66666666-7777-8888-9999-000000000000"
+
+
+# The compat, incompat and ro_compat features of ext file systems.
+EXT2_FEATURES = (0x0, 0x2, 0x1)
+EXT3_FEATURES = (0x4, 0x2, 0x1)
+EXT4_FEATURES = (0x4, 0x42, 0x1)
+
+
+def write_ext_image(path, blocks_count, image_uuid=IMAGE_UUID, label="", size=None,
+                    features=EXT4_FEATURES):
+    """Write a fake ext file system with 1 KiB blocks."""
+    superblock = bytearray(1024)
+    struct.pack_into("<I", superblock, 0x04, blocks_count)
+    struct.pack_into("<I", superblock, 0x18, 0)
+    struct.pack_into("<H", superblock, 0x38, 0xEF53)
+    struct.pack_into("<III", superblock, 0x5C, *features)
+    superblock[0x68:0x78] = uuid.UUID(image_uuid).bytes
+    superblock[0x78:0x78 + len(label)] = label.encode()
+
+    data = bytearray(size or blocks_count * 1024)
+    data[1024:2048] = superblock
+    data[-1] = 0xFF
+
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class BlockDeploymentUtilsTestCase(unittest.TestCase):
+    """Test the utilities of the block deployment."""
+
+    def test_read_ext_superblock(self):
+        """Test the read_ext_superblock function."""
+        with tempfile.NamedTemporaryFile() as f:
+            assert read_ext_superblock(f.name) is None
+
+            write_ext_image(f.name, 64, label="root")
+            superblock = read_ext_superblock(f.name)
+
+            assert superblock.fstype == "ext4"
+            assert superblock.size == 64 * 1024
+            assert superblock.uuid == IMAGE_UUID
+            assert superblock.label == "root"
+
+            write_ext_image(f.name, 64, features=EXT3_FEATURES)
+            assert read_ext_superblock(f.name).fstype == "ext3"
+
+            write_ext_image(f.name, 64, features=EXT2_FEATURES)
+            assert read_ext_superblock(f.name).fstype == "ext2"
+
+            f.seek(1024 + 0x38)
+            f.write(b"\0\0")
+            f.flush()
+
+            assert read_ext_superblock(f.name) is None
+
+        assert read_ext_superblock("/nonexistent/image") is None
+
+    def test_get_mounts(self):
+        """Test the get_mounts function."""
+        data = \
+            "/dev/vda2 /mnt/sys\\040root ext4 rw,relatime 0 0\n" \
+            "devtmpfs /mnt/sys\\040root/dev devtmpfs rw 0 0\n"
+
+        with patch("builtins.open", mock_open(read_data=data)):
+            assert get_mounts() == [
+                Mount("/dev/vda2", "/mnt/sys root", "ext4"),
+                Mount("devtmpfs", "/mnt/sys root/dev", "devtmpfs"),
+            ]
+
+
+class BlockDeploymentTestCase(unittest.TestCase):
+    """Test the block deployment of images."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.image = os.path.join(self._tmp.name, "image")
+        self.device = os.path.join(self._tmp.name, "device")
+        self.sysroot = os.path.join(self._tmp.name, "sysroot")
+        os.makedirs(os.path.join(self.sysroot, "dev"))
+        os.makedirs(os.path.join(self.sysroot, "lost+found"))
+
+        write_ext_image(self.image, 64)
+        write_ext_image(self.device, 32, TARGET_UUID, "root", size=128 * 1024)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _get_mounts(self, fstype="ext4", device=None):
+        """Get fake mounts."""
+        return [
+            Mount("/dev/vda1", "/", "ext4"),
+            Mount(device or self.device, self.sysroot, fstype),
+            Mount("devtmpfs", self.sysroot + "/dev", "devtmpfs"),
+            Mount("devpts", self.sysroot + "/dev/pts", "devpts"),
+        ]
+
+    def _check(self, mounts):
+        """Check the deployment."""
+        deployment = BlockDeployment(self.image, self.sysroot)
+
+        with patch(MODULE + ".get_mounts", return_value=mounts):
+            return deployment.check()
+
+    def test_check(self):
+        """Test a successful check."""
+        deployment = BlockDeployment(self.image, self.sysroot)
+
+        with patch(MODULE + ".get_mounts", return_value=self._get_mounts()):
+            assert deployment.check() is True
+
+        assert deployment.image_size == 64 * 1024
+
+    def test_check_failed(self):
+        """Test failed checks."""
+        # The system root is not mounted.
+        assert self._check([]) is False
+
+        # The system root has an unsupported file system.
+        assert self._check(self._get_mounts(fstype="xfs")) is False
+
+        # The system root has a different ext file system.
+        assert self._check(self._get_mounts(fstype="ext3")) is False
+
+        # The system root has a separate file system.
+        mounts = self._get_mounts() + [Mount("/dev/vda3", self.sysroot + "/boot", "ext4")]
+        assert self._check(mounts) is False
+
+        # The device is missing.
+        assert self._check(self._get_mounts(device="/nonexistent/device")) is False
+
+        # The system root is not empty.
+        os.makedirs(os.path.join(self.sysroot, "etc"))
+        assert self._check(self._get_mounts()) is False
+
+        # The image is not an ext file system.
+        with open(self.image, "wb") as f:
+            f.write(b"\0" * 4096)
+
+        assert self._check(self._get_mounts()) is False
+
+    def test_check_small_device(self):
+        """Test a check with a small device."""
+        write_ext_image(self.image, 256)
+        assert self._check(self._get_mounts()) is False
+
+    @patch(MODULE + ".BLOCK_COPY_BUFFER_SIZE", 16 * 1024)
+    @patch(MODULE + ".tempfile.mkdtemp")
+    @patch(MODULE + ".blivet.util")
+    @patch(MODULE + ".execWithRedirect")
+    def test_deploy(self, exec_mock, blivet_util, mkdtemp):
+        """Test the deployment."""
+        exec_mock.return_value = 0
+        blivet_util.umount.return_value = 0
+        blivet_util.mount.return_value = 0
+        mkdtemp.return_value = os.path.join(self._tmp.name, "moved")
+        os.makedirs(mkdtemp.return_value)
+
+        deployment = BlockDeployment(self.image, self.sysroot, ["/dev/", "/tmp/*"])
+        sizes = []
+
+        with patch(MODULE + ".get_mounts", return_value=self._get_mounts()):
+            assert deployment.check() is True
+
+        os.makedirs(os.path.join(self.sysroot, "tmp/a"))
+
+        with patch(MODULE + ".os.O_DIRECT", 0):
+            deployment.deploy(callback=sizes.append)
+
+        assert sizes == [16 * 1024, 32 * 1024, 48 * 1024, 64 * 1024]
+
+        with open(self.image, "rb") as image, open(self.device, "rb") as device:
+            assert device.read(64 * 1024) == image.read()
+
+        assert exec_mock.mock_calls == [
+            call("mount", ["--make-rprivate", "/"]),
+            call("mount", ["--move", self.sysroot + "/dev", mkdtemp.return_value]),
+            call("e2fsck", ["-f", "-p", self.device]),
+            call("tune2fs", ["-U", TARGET_UUID, "-L", "root", self.device]),
+            call("resize2fs", [self.device]),
+            call("mount", ["--move", mkdtemp.return_value, self.sysroot + "/dev"]),
+        ]
+
+        blivet_util.umount.assert_called_once_with(mountpoint=self.sysroot)
+        blivet_util.mount.assert_called_once_with(self.device, self.sysroot, fstype="ext4")
+
+        assert sorted(os.listdir(self.sysroot)) == ["dev", "lost+found", "tmp"]
+        assert os.listdir(os.path.join(self.sysroot, "tmp")) == []
+
+    @patch(MODULE + ".blivet.util")
+    @patch(MODULE + ".execWithRedirect")
+    def test_deploy_failed(self, exec_mock, blivet_util):
+        """Test a failed deployment."""
+        exec_mock.return_value = 0
+        blivet_util.umount.return_value = 1
+
+        os.rmdir(os.path.join(self.sysroot, "dev"))
+        deployment = BlockDeployment(self.image, self.sysroot)
+
+        with patch(MODULE + ".get_mounts", return_value=self._get_mounts()[:2]):
+            assert deployment.check() is True
+
+        with pytest.raises(PayloadInstallationError) as cm:
+            deployment.deploy()
+
+        assert str(cm.value) == "Failed to unmount {}.".format(self.sysroot)
+
+        blivet_util.umount.return_value = 0
+        exec_mock.side_effect = lambda cmd, args: 8 if cmd == "e2fsck" else 0
+
+        with patch(MODULE + ".os.O_DIRECT", 0):
+            with pytest.raises(PayloadInstallationError) as cm:
+                deployment.deploy()
+
+        assert str(cm.value) == "Failed to deploy the image: e2fsck exited with code 8"
+
+    @patch(MODULE + ".tempfile.mkdtemp")
+    @patch(MODULE + ".blivet.util")
+    @patch(MODULE + ".execWithRedirect")
+    def test_deploy_rollback(self, exec_mock, blivet_util, mkdtemp):
+        """Test the rollback of a failed deployment."""
+        exec_mock.side_effect = lambda cmd, args: 8 if cmd == "e2fsck" else 0
+        blivet_util.umount.return_value = 0
+        blivet_util.mount.return_value = 0
+        mkdtemp.return_value = os.path.join(self._tmp.name, "moved")
+        os.makedirs(mkdtemp.return_value)
+
+        deployment = BlockDeployment(self.image, self.sysroot)
+
+        with patch(MODULE + ".get_mounts", return_value=self._get_mounts()):
+            assert deployment.check() is True
+
+        with patch(MODULE + ".os.O_DIRECT", 0):
+            with pytest.raises(PayloadInstallationError):
+                deployment.deploy()
+
+        # The system root is mounted again and the submounts are restored.
+        blivet_util.mount.assert_called_once_with(self.device, self.sysroot, fstype="ext4")
+        assert exec_mock.call_args_list[-1] == \
+            call("mount", ["--move", mkdtemp.return_value, self.sysroot + "/dev"])
+
+        # The submounts are restored also if the system root is not unmounted.
+        exec_mock.reset_mock()
+        blivet_util.mount.reset_mock()
+        blivet_util.umount.return_value = 1
+        os.makedirs(mkdtemp.return_value)
+
+        with pytest.raises(PayloadInstallationError):
+            deployment.deploy()
+
+        blivet_util.mount.assert_not_called()
+        assert exec_mock.call_args_list[-1] == \
+            call("mount", ["--move", mkdtemp.return_value, self.sysroot + "/dev"])
@@ -15,96 +15,75 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
-import os
-import tempfile
+import io
 import unittest
-import time
 
-from unittest.mock import Mock, call, patch
+from unittest.mock import Mock, call
 
-from pyanaconda.core.path import join_paths
-from pyanaconda.modules.common.constants.objects import DEVICE_TREE
-from pyanaconda.modules.common.constants.services import STORAGE
 from pyanaconda.modules.payloads.payload.live_image.installation_progress import \
-    InstallationProgress
-from tests.unit_tests.pyanaconda_tests import patch_dbus_get_proxy_with_cache
+    InstallationProgress, read_output_lines, parse_rsync_progress
 
 
 class InstallationProgressTestCase(unittest.TestCase):
     """Test the installation progress of the image installation."""
 
-    @patch("os.statvfs")
-    @patch_dbus_get_proxy_with_cache
-    def test_canceled_progress(self, proxy_getter, statvfs_mock):
-        """Test the canceled installation progress."""
+    def test_size_progress(self):
+        """Test the installation progress with the installed size."""
         callback = Mock()
 
-        with tempfile.TemporaryDirectory() as sysroot:
-            os.mkdir(join_paths(sysroot, "/boot"))
-            os.mkdir(join_paths(sysroot, "/home"))
+        progress = InstallationProgress(
+            callback=callback,
+            installation_size=1024 * 100
+        )
 
-            device_tree = STORAGE.get_proxy(DEVICE_TREE)
-            device_tree.GetMountPoints.return_value = {
-                "/": "dev1",
-                "/boot": "dev2",
-                "/home": "dev3",
-            }
+        progress.start()
+        progress.update(1024 * 25)
+        progress.update(1024 * 25)
+        progress.update(1024 * 50)
+        progress.update(1024 * 150)
+        progress.end()
 
-            statvfs_mock.return_value = \
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=100)
-
-            progress = InstallationProgress(
-                sysroot=sysroot,
-                callback=callback,
-                installation_size=1024 * 100
-            )
-
-            with progress:
-                time.sleep(2)
-
-        expected = [
-            call("Synchronizing writes to disk"),
-            call("Installing software 0%")
+        assert callback.call_args_list == [
+            call("Installing software 0%"),
+            call("Installing software 25%"),
+            call("Installing software 50%"),
+            call("Installing software 100%"),
         ]
-        assert callback.call_args_list == expected
 
-    @patch("time.sleep")
-    @patch("os.statvfs")
-    @patch_dbus_get_proxy_with_cache
-    def test_finished_progress(self, proxy_getter, statvfs_mock, sleep_mock):
-        """Test the finished installation progress."""
+    def test_percentage_progress(self):
+        """Test the installation progress with the reported percentage."""
         callback = Mock()
-
-        with tempfile.TemporaryDirectory() as sysroot:
-            device_tree = STORAGE.get_proxy(DEVICE_TREE)
-            device_tree.GetMountPoints.return_value = {
-                "/": "dev1",
-                "/boot": "dev2",
-                "/home": "dev3",
-            }
-
-            statvfs_mock.side_effect = [
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=125),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=100),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=75),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=45),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=25),
-                Mock(f_frsize=1024, f_blocks=150, f_bfree=0),
-            ]
-
-            progress = InstallationProgress(
-                sysroot=sysroot,
-                callback=callback,
-                installation_size=1024 * 100
-            )
-
-            progress._monitor_progress()
-
-        expected = [
-            call("Synchronizing writes to disk"),
-            call("Installing software 25%"),
-            call("Installing software 50%"),
+        progress = InstallationProgress(callback=callback)
+
+        progress.start()
+        progress.update(1024)
+        progress.update_percentage(10)
+        progress.update_percentage(10)
+        progress.update_percentage(80)
+        progress.end()
+
+        assert callback.call_args_list == [
+            call("Installing software 0%"),
+            call("Installing software 10%"),
             call("Installing software 80%"),
             call("Installing software 100%"),
         ]
-        assert callback.call_args_list == expected
+
+    def test_read_output_lines(self):
+        """Test the read_output_lines function."""
+        stream = io.BytesIO(b"a\rb\n\nc\r\nd")
+        assert list(read_output_lines(stream, size=1)) == ["a", "b", "c", "d"]
+
+        stream = io.BytesIO(b"")
+        assert list(read_output_lines(stream)) == []
+
+    def test_parse_rsync_progress(self):
+        """Test the parse_rsync_progress function."""
+        line = "  1,238,099  12%  117.98MB/s    0:00:01 (xfr#51, to-chk=169/396)"
+        assert parse_rsync_progress(line) == (1238099, 12)
+
+        line = "         0   0%    0.00kB/s    0:00:00"
+        assert parse_rsync_progress(line) == (0, 0)
+
+        assert parse_rsync_progress("Number of files: 10 (reg: 10)") is None
+        assert parse_rsync_progress("sent 1,234 bytes  received 56 bytes") is None
@@ -0,0 +1,212 @@
+#
+# Copyright (C) 2021  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import stat
+import tempfile
+import unittest
+import pytest
+
+from unittest.mock import patch
+
+from pyanaconda.modules.payloads.payload.live_image.tree_copier import TreeCopier
+
+
+class TreeCopierTestCase(unittest.TestCase):
+    """Test the native copier of file trees."""
+
+    def setUp(self):
+        self._source = tempfile.TemporaryDirectory()
+        self._target = tempfile.TemporaryDirectory()
+        self.source = self._source.name
+        self.target = self._target.name
+
+    def tearDown(self):
+        self._source.cleanup()
+        self._target.cleanup()
+
+    def _write_file(self, path, content=""):
+        """Write a file in the source tree."""
+        path = os.path.join(self.source, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+        return path
+
+    def _read_file(self, path):
+        """Read a file from the target tree."""
+        with open(os.path.join(self.target, path)) as f:
+            return f.read()
+
+    def _copy(self, exclusions=(), max_workers=4):
+        """Copy the source tree to the target tree."""
+        copier = TreeCopier(self.source, self.target, exclusions, max_workers)
+        total_size = copier.scan()
+        copied_sizes = []
+        copier.copy(callback=copied_sizes.append)
+        return total_size, copied_sizes
+
+    def test_copy_files(self):
+        """Test the copying of files and directories."""
+        self._write_file("a", "File A")
+        self._write_file("b/c", "File C")
+        self._write_file("b/d/e", "")
+        os.makedirs(os.path.join(self.source, "f"))
+
+        total_size, copied_sizes = self._copy()
+
+        assert total_size == 12
+        assert sorted(copied_sizes)[-1] == 12
+        assert len(copied_sizes) == 3
+
+        assert self._read_file("a") == "File A"
+        assert self._read_file("b/c") == "File C"
+        assert self._read_file("b/d/e") == ""
+        assert os.path.isdir(os.path.join(self.target, "f"))
+
+    def test_copy_metadata(self):
+        """Test the copying of the metadata."""
+        path = self._write_file("a/b", "File B")
+        os.chmod(path, 0o4751)
+        os.utime(path, ns=(1000000000, 2000000000))
+
+        os.chmod(os.path.join(self.source, "a"), 0o700)
+        os.utime(os.path.join(self.source, "a"), ns=(3000000000, 4000000000))
+
+        self._copy()
+
+        st = os.stat(os.path.join(self.target, "a/b"))
+        assert stat.S_IMODE(st.st_mode) == 0o4751
+        assert st.st_mtime_ns == 2000000000
+
+        st = os.stat(os.path.join(self.target, "a"))
+        assert stat.S_IMODE(st.st_mode) == 0o700
+        assert st.st_mtime_ns == 4000000000
+
+    def test_copy_xattrs(self):
+        """Test the copying of extended attributes."""
+        path = self._write_file("a", "File A")
+
+        try:
+            os.setxattr(path, "user.test", b"value")
+        except OSError:
+            pytest.skip("Extended attributes are not supported.")
+
+        self._copy()
+
+        path = os.path.join(self.target, "a")
+        assert os.getxattr(path, "user.test") == b"value"
+
+    def test_copy_links(self):
+        """Test the copying of symlinks and hard links."""
+        path = self._write_file("a", "File A")
+        os.link(path, os.path.join(self.source, "b"))
+        os.symlink("a", os.path.join(self.source, "c"))
+        os.symlink("/missing", os.path.join(self.source, "d"))
+        os.mkfifo(os.path.join(self.source, "e"))
+
+        total_size, _copied_sizes = self._copy()
+        assert total_size == 6
+
+        st_a = os.stat(os.path.join(self.target, "a"))
+        st_b = os.stat(os.path.join(self.target, "b"))
+        assert st_a.st_ino == st_b.st_ino
+        assert st_a.st_nlink == 2
+
+        assert os.readlink(os.path.join(self.target, "c")) == "a"
+        assert os.readlink(os.path.join(self.target, "d")) == "/missing"
+        assert stat.S_ISFIFO(os.lstat(os.path.join(self.target, "e")).st_mode)
+
+    def test_copy_existing(self):
+        """Test the copying to an existing tree."""
+        self._write_file("a", "File A")
+        os.symlink("a", os.path.join(self.source, "b"))
+
+        with open(os.path.join(self.target, "a"), "w") as f:
+            f.write("Old file A")
+
+        os.symlink("/etc/passwd", os.path.join(self.target, "b"))
+
+        self._copy()
+
+        assert self._read_file("a") == "File A"
+        assert os.readlink(os.path.join(self.target, "b")) == "a"
+
+    def test_copy_exclusions(self):
+        """Test the copying with excluded paths."""
+        self._write_file("dev/null")
+        self._write_file("tmp/a")
+        self._write_file("boot/vmlinuz-rescue-123")
+        self._write_file("boot/vmlinuz-123")
+        self._write_file("boot/loader")
+        self._write_file("etc/machine-id")
+        self._write_file("etc/tmp/a")
+        self._write_file("a/b.log")
+
+        self._copy(exclusions=[
+            "/dev/",
+            "/tmp/*",
+            "/boot/*rescue*",
+            "/boot/loader/",
+            "/etc/machine-id",
+            "*.log",
+        ])
+
+        result = []
+
+        for root, dirs, files in os.walk(self.target):
+            for name in dirs + files:
+                result.append(os.path.relpath(os.path.join(root, name), self.target))
+
+        assert sorted(result) == [
+            "a",
+            "boot",
+            "boot/loader",
+            "boot/vmlinuz-123",
+            "etc",
+            "etc/tmp",
+            "etc/tmp/a",
+            "tmp",
+        ]
+
+    def test_copy_data(self):
+        """Test the copying of the file content."""
+        content = "x" * 1024 * 1024 * 3
+
+        self._write_file("a", content)
+        self._copy()
+        assert self._read_file("a") == content
+
+        # Copy the data without the kernel support.
+        with patch("os.copy_file_range", side_effect=OSError(18, "Fake!")):
+            with patch("fcntl.ioctl", side_effect=OSError(95, "Fake!")):
+                self._copy()
+
+        assert self._read_file("a") == content
+
+    def test_copy_failed(self):
+        """Test the failed copying."""
+        path = self._write_file("a", "File A")
+        copier = TreeCopier(self.source, self.target)
+        copier.scan()
+
+        os.unlink(path)
+
+        with pytest.raises(FileNotFoundError):
+            copier.copy()
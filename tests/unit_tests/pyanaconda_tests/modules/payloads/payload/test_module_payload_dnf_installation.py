@@ -35,7 +35,7 @@ from pyanaconda.modules.payloads.payload.dnf.dnf_manager import DNFManager, Miss
 from pyanaconda.modules.payloads.payload.dnf.installation import ImportRPMKeysTask, \
     SetRPMMacrosTask, DownloadPackagesTask, InstallPackagesTask, PrepareDownloadLocationTask, \
     CleanUpDownloadLocationTask, ResolvePackagesTask, UpdateDNFConfigurationTask, \
-    WriteRepositoriesTask
+    WriteRepositoriesTask, PrefetchPackagesTask
 
 
 class SetRPMMacrosTaskTestCase(unittest.TestCase):
@@ -306,6 +306,92 @@ class PrepareDownloadLocationTaskTestCase(unittest.TestCase):
             assert not os.path.exists(os.path.join(path, "f3"))
 
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.pick_download_location")
+    def test_run_prefetched(self, pick_location):
+        """Run the PrepareDownloadLocationTask class with prefetched packages."""
+        dnf_manager = Mock()
+
+        with tempfile.TemporaryDirectory() as path:
+            # Reuse the prefetched packages.
+            pick_location.return_value = path
+            os.mknod(os.path.join(path, "f1"))
+
+            task = PrepareDownloadLocationTask(dnf_manager, prefetch_location=path)
+            assert task.run() == path
+
+            pick_location.assert_called_once_with(dnf_manager, path)
+            dnf_manager.set_download_location.assert_called_once_with(path)
+            assert os.path.exists(os.path.join(path, "f1"))
+
+            # Remove the prefetched packages if the location has changed.
+            prefetch_location = os.path.join(path, "prefetch")
+            os.mkdir(prefetch_location)
+            os.mknod(os.path.join(prefetch_location, "f2"))
+
+            task = PrepareDownloadLocationTask(dnf_manager, prefetch_location=prefetch_location)
+            assert task.run() == path
+
+            assert not os.path.exists(prefetch_location)
+            assert not os.path.exists(os.path.join(path, "f1"))
+
+
+class PrefetchPackagesTaskTestCase(unittest.TestCase):
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.pick_download_location")
+    def test_run(self, pick_location):
+        """Run the PrefetchPackagesTask class."""
+        dnf_manager = Mock()
+
+        with tempfile.TemporaryDirectory() as path:
+            pick_location.return_value = path
+            os.mknod(os.path.join(path, "f1"))
+
+            task = PrefetchPackagesTask(dnf_manager)
+            assert task.run() == path
+
+            # The files should be deleted.
+            assert not os.path.exists(os.path.join(path, "f1"))
+
+        dnf_manager.set_download_location.assert_called_once_with(path)
+        dnf_manager.download_packages.assert_called_once_with(task.report_progress)
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.pick_download_location")
+    def test_run_failed(self, pick_location):
+        """Run the PrefetchPackagesTask class with a failed download."""
+        dnf_manager = Mock()
+
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "dnf.package.cache")
+            pick_location.return_value = path
+
+            def download_packages(callback):
+                os.mkdir(path)
+                os.mknod(os.path.join(path, "f1"))
+                raise PayloadInstallationError("Fake error!")
+
+            dnf_manager.download_packages.side_effect = download_packages
+
+            task = PrefetchPackagesTask(dnf_manager)
+
+            with pytest.raises(PayloadInstallationError):
+                task.run()
+
+            # The partial download should be deleted.
+            assert not os.path.exists(path)
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.installation.pick_download_location")
+    def test_run_system_root(self, pick_location):
+        """Run the PrefetchPackagesTask class with the system root."""
+        dnf_manager = Mock()
+        pick_location.return_value = "/mnt/sysroot/var/tmp/dnf.package.cache"
+
+        task = PrefetchPackagesTask(dnf_manager)
+        assert task.run() is None
+
+        dnf_manager.set_download_location.assert_not_called()
+        dnf_manager.download_packages.assert_not_called()
+
+
 class CleanUpDownloadLocationTaskTestCase(unittest.TestCase):
 
     @patch("pyanaconda.modules.payloads.payload.dnf.installation.shutil")
@@ -16,6 +16,7 @@
 # Red Hat, Inc.
 #
 import os.path
+import time
 import unittest
 from textwrap import dedent
 
@@ -44,6 +45,7 @@ from pyanaconda.modules.common.structures.packages import PackagesConfigurationD
 from pyanaconda.modules.common.structures.payload import RepoConfigurationData
 from pyanaconda.modules.payloads.payload.dnf.dnf_manager import DNFManager, \
     InvalidSelectionError, BrokenSpecsError, MissingSpecsError, MetadataError
+from pyanaconda.modules.payloads.payload.dnf.utils import calculate_hash
 
 
 class DNFManagerTestCase(unittest.TestCase):
@@ -90,7 +92,8 @@ class DNFManagerTestCase(unittest.TestCase):
         """Test the default configuration of the DNF base."""
         self._check_configuration(
             "gpgcheck = 0",
-            "skip_if_unavailable = 0"
+            "skip_if_unavailable = 0",
+            "max_parallel_downloads = 10",
         )
         self._check_configuration(
             "cachedir = /tmp/dnf.cache",
@@ -446,6 +449,45 @@ class DNFManagerTestCase(unittest.TestCase):
             "p3": 25
         }
 
+    @patch("dnf.base.Base.download_packages")
+    @patch("dnf.base.Base.transaction")
+    def test_download_cached_packages(self, transaction, download_packages):
+        """Test the download_packages method with the download cache."""
+        packages = []
+
+        for name in ["p1", "p2", "p3"]:
+            package = Mock()
+            package.returnIdSum.return_value = ("sha256", name * 10)
+            package.localPkg.return_value = "/var/tmp/packages/{}.rpm".format(name)
+            packages.append(package)
+
+        # The third package is not downloaded.
+        packages[2].localPkg.return_value = "/run/install/repo/p3.rpm"
+
+        transaction.install_set = packages
+        cache = Mock()
+        cache.restore.side_effect = [True, False]
+
+        self.dnf_manager._download_cache = cache
+        self.dnf_manager._download_location = "/var/tmp/packages"
+        self.dnf_manager.download_packages(Mock())
+
+        download_packages.assert_called_once()
+        assert sorted(cache.restore.mock_calls) == [
+            call("sha256", "p1" * 10, "/var/tmp/packages/p1.rpm"),
+            call("sha256", "p2" * 10, "/var/tmp/packages/p2.rpm"),
+        ]
+
+        # The packages are stored in the background.
+        assert self.dnf_manager._download_cache_thread is not None
+        self.dnf_manager.wait_for_download_cache()
+        assert self.dnf_manager._download_cache_thread is None
+
+        assert cache.store.mock_calls == [
+            call("sha256", "p1" * 10, "/var/tmp/packages/p1.rpm"),
+            call("sha256", "p2" * 10, "/var/tmp/packages/p2.rpm"),
+        ]
+
     @patch("dnf.base.Base.do_transaction")
     def test_install_packages(self, do_transaction):
         """Test the install_packages method."""
@@ -1376,6 +1418,102 @@ class DNFManagerReposTestCase(unittest.TestCase):
         repo.load.assert_called_once()
         assert repo.enabled is True
 
+    def test_load_no_repositories(self):
+        """Test the load_repositories method with no repositories."""
+        self.dnf_manager.load_repositories([])
+
+    def test_load_repositories_unknown(self):
+        """Test the load_repositories method with an unknown repo."""
+        repo = self._add_repo("r1")
+        repo.load = Mock()
+
+        with pytest.raises(UnknownRepositoryError):
+            self.dnf_manager.load_repositories(["r1", "r2"])
+
+        repo.load.assert_not_called()
+
+    def test_load_repositories(self):
+        """Test the load_repositories method."""
+        repos = [self._add_repo("r{}".format(i)) for i in range(5)]
+
+        for repo in repos:
+            repo.load = Mock()
+            repo.enable()
+
+        self.dnf_manager.load_repositories(["r0", "r1", "r2", "r3", "r4"], max_workers=2)
+
+        for repo in repos:
+            repo.load.assert_called_once()
+            assert repo.enabled is True
+
+    def test_load_repositories_failed(self):
+        """Test the load_repositories method with failures."""
+        r1 = self._add_repo("r1")
+        r1.load = Mock(side_effect=RepoError("Fake error 1!"))
+        r1.enable()
+
+        r2 = self._add_repo("r2")
+        r2.load = Mock()
+        r2.enable()
+
+        r3 = self._add_repo("r3")
+        r3.load = Mock(side_effect=RepoError("Fake error 3!"))
+        r3.enable()
+
+        with pytest.raises(MetadataError) as cm:
+            self.dnf_manager.load_repositories(["r1", "r2", "r3"])
+
+        assert sorted(str(cm.value).splitlines()) == ["Fake error 1!", "Fake error 3!"]
+        assert r1.enabled is False
+        assert r2.enabled is True
+        assert r3.enabled is False
+
+    def test_restore_cached_metadata(self):
+        """Test the _restore_cached_metadata method."""
+        cache = Mock()
+        self.dnf_manager._metadata_cache = cache
+
+        r1 = self._add_repo("r1")
+        r1.baseurl.append("http://server/r1")
+        md_hash = calculate_hash("Metadata for r1.")
+
+        # Use the hash of the last check of the repositories.
+        self.dnf_manager._fetched_md_hashes = {"r1": md_hash}
+
+        with patch.object(self.dnf_manager, "_get_repomd_content") as get_content, \
+                patch.object(self.dnf_manager, "_get_local_repomd_hash", return_value=None):
+            self.dnf_manager._restore_cached_metadata(r1)
+
+        get_content.assert_not_called()
+        cache.restore.assert_called_once_with(
+            md_hash=md_hash,
+            repo_id="r1",
+            repo_dir=r1._repo.getCachedir(),
+            solv_dir=self.dnf_manager._base.conf.cachedir,
+        )
+        assert self.dnf_manager._fetched_md_hashes == {}
+        cache.restore.reset_mock()
+
+        # Don't fetch or restore metadata that are already in place.
+        with patch.object(self.dnf_manager, "_get_repomd_content") as get_content, \
+                patch.object(self.dnf_manager, "_get_local_repomd_hash", return_value=md_hash):
+            self.dnf_manager._restore_cached_metadata(r1)
+
+        get_content.assert_not_called()
+        cache.restore.assert_not_called()
+
+        # Don't restore metadata that are already in place.
+        self.dnf_manager._metadata_cache_hashes = {}
+
+        with patch.object(self.dnf_manager, "_get_repomd_content") as get_content, \
+                patch.object(self.dnf_manager, "_get_local_repomd_hash", return_value=md_hash):
+            get_content.return_value = "Metadata for r1."
+            self.dnf_manager._restore_cached_metadata(r1)
+
+        get_content.assert_called_once_with(r1)
+        cache.restore.assert_not_called()
+        assert self.dnf_manager._metadata_cache_hashes == {"r1": md_hash}
+
     def test_load_packages_metadata(self):
         """Test the load_packages_metadata method."""
         sack = self.dnf_manager._base.sack
@@ -1485,3 +1623,105 @@ class DNFManagerReposTestCase(unittest.TestCase):
             # Test the base reset.
             self.dnf_manager.reset_base()
             assert self.dnf_manager.verify_repomd_hashes() is False
+
+    def _create_response(self, status_code, text="", headers=None):
+        """Create a mocked response."""
+        response = Mock()
+        response.status_code = status_code
+        response.text = text
+        response.headers = headers or {}
+        return response
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.requests_session")
+    def test_verify_http_repomd_hashes(self, session_getter):
+        """Test the verify_repomd_hashes method with HTTP repositories."""
+        session = session_getter.return_value
+        session.get.return_value = self._create_response(
+            status_code=200,
+            text="Metadata for r1.",
+            headers={"ETag": "1234", "Last-Modified": "Thu, 01 Jan 2026 00:00:00 GMT"},
+        )
+
+        r1 = self._add_repo("r1")
+        r1.baseurl = ["http://my/r1"]
+
+        self.dnf_manager.load_repomd_hashes()
+        assert self.dnf_manager._md_hashes == {
+            'r1': b"\x90\xa0\xb7\xce\xc2H\x85#\xa3\xfci"
+                  b"\x9e+\xf4\xe2\x19D\xbc\x9b'\xeb\xb7"
+                  b"\x90\x1d\xcey\xb3\xd4p\xc3\x1d\xfb",
+        }
+
+        args, kwargs = session.get.call_args
+        assert args == ("http://my/r1/repodata/repomd.xml",)
+        assert "If-None-Match" not in kwargs["headers"]
+        session.close.assert_called_once()
+
+        # Test the conditional request.
+        session.get.return_value = self._create_response(status_code=304)
+        assert self.dnf_manager.verify_repomd_hashes() is True
+
+        args, kwargs = session.get.call_args
+        assert kwargs["headers"]["If-None-Match"] == "1234"
+        assert kwargs["headers"]["If-Modified-Since"] == "Thu, 01 Jan 2026 00:00:00 GMT"
+
+        # Test a different content of metadata.
+        session.get.return_value = self._create_response(
+            status_code=200,
+            text="Different metadata for r1.",
+            headers={"ETag": "5678"},
+        )
+        assert self.dnf_manager.verify_repomd_hashes() is False
+
+        # The validators of the initial download are kept.
+        session.get.return_value = self._create_response(status_code=304)
+        assert self.dnf_manager.verify_repomd_hashes() is True
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.requests_session")
+    def test_verify_repomd_hashes_running_downloads(self, session_getter):
+        """Test that running downloads finish before the session is closed."""
+        session = session_getter.return_value
+        session.get.return_value = self._create_response(status_code=200, text="Metadata")
+
+        r1 = self._add_repo("r1")
+        r1.baseurl = ["http://my/r1"]
+
+        r2 = self._add_repo("r2")
+        r2.baseurl = ["http://my/r2"]
+
+        self.dnf_manager.load_repomd_hashes()
+        events = []
+
+        def get(url, **kwargs):
+            if "r2" in url:
+                time.sleep(0.3)
+                events.append("r2 downloaded")
+                return self._create_response(status_code=304)
+
+            return self._create_response(status_code=200, text="Different metadata")
+
+        session.get.side_effect = get
+        session.close.side_effect = lambda: events.append("closed")
+
+        # The first mismatch stops the check, but the running download is joined.
+        assert self.dnf_manager.verify_repomd_hashes() is False
+        assert events == ["r2 downloaded", "closed"]
+
+    @patch("pyanaconda.modules.payloads.payload.dnf.dnf_manager.requests_session")
+    def test_verify_changed_repositories(self, session_getter):
+        """Test the verify_repomd_hashes method with changed repositories."""
+        session = session_getter.return_value
+        session.get.return_value = self._create_response(status_code=200, text="Metadata")
+
+        r1 = self._add_repo("r1")
+        r1.baseurl = ["http://my/r1"]
+
+        self.dnf_manager.load_repomd_hashes()
+        assert session.get.call_count == 1
+
+        # Add a new repository.
+        r2 = self._add_repo("r2")
+        r2.baseurl = ["http://my/r2"]
+
+        assert self.dnf_manager.verify_repomd_hashes() is False
+        assert session.get.call_count == 1
@@ -15,6 +15,8 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import os
+import tempfile
 import unittest
 import pytest
 
@@ -331,6 +333,38 @@ class DNFUtilsPackagesTestCase(unittest.TestCase):
         msg = "Not enough disk space to download the packages; size 100 B."
         assert str(cm.value) == msg
 
+    @patch("pyanaconda.modules.payloads.payload.dnf.utils.get_free_space_map")
+    def test_pick_download_location_prefetched(self, free_space_getter):
+        """Test the pick_download_location function with prefetched packages."""
+        dnf_manager = Mock()
+        dnf_manager.get_download_size.return_value = Size(100)
+        dnf_manager.get_installation_size.return_value = Size(200)
+
+        with tempfile.TemporaryDirectory() as d:
+            # The prefetched packages use 60 B of the mount point.
+            prefetch_location = os.path.join(d, "dnf.package.cache")
+            os.mkdir(prefetch_location)
+
+            with open(os.path.join(prefetch_location, "p1.rpm"), "wb") as f:
+                f.write(bytes(60))
+
+            free_space_getter.return_value = {
+                d: Size(50),
+                "/mnt/sysroot": Size(400),
+            }
+
+            with patch("pyanaconda.modules.payloads.payload.dnf.utils._pick_mount_points") \
+                    as pick_mount_points:
+                pick_mount_points.return_value = {d}
+                path = pick_download_location(dnf_manager, prefetch_location)
+
+            assert path == prefetch_location
+            pick_mount_points.assert_called_once_with(
+                {d: Size(110), "/mnt/sysroot": Size(400)},
+                Size(100),
+                Size(200)
+            )
+
     @patch("pyanaconda.modules.payloads.payload.dnf.utils.execWithCapture")
     @patch_dbus_get_proxy_with_cache
     def test_get_combined_free_space(self, proxy_getter, exec_mock):
@@ -17,7 +17,10 @@
 #
 # Red Hat Author(s): Jiri Konecny <jkonecny@redhat.com>
 #
+import hashlib
+import io
 import os
+import subprocess
 import tempfile
 import unittest
 import pytest
@@ -25,7 +28,7 @@ import requests
 
 from contextlib import contextmanager
 from requests_file import FileAdapter
-from unittest.mock import patch, Mock, call
+from unittest.mock import patch, Mock, MagicMock, call, ANY
 
 from pyanaconda.core.configuration.anaconda import conf
 from pyanaconda.core.path import join_paths, touch
@@ -84,22 +87,43 @@ class LiveUtilsTestCase(unittest.TestCase):
 class InstallFromImageTaskTestCase(unittest.TestCase):
     """Test the InstallFromImageTask class."""
 
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.execWithRedirect")
-    def test_install_image_task(self, exec_with_redirect, os_sync):
+    RSYNC_OUTPUT = \
+        b"      1,024   0%    0.00kB/s    0:00:00 (xfr#1, to-chk=9/10)\r" \
+        b"     52,224  51%   48.83MB/s    0:00:00 (xfr#5, to-chk=5/10)\r" \
+        b"    102,400 100%   97.66MB/s    0:00:00 (xfr#10, to-chk=0/10)\n" \
+        b"\n" \
+        b"Number of files: 10 (reg: 10)\n"
+
+    def _run_task(self, mount_point, callback=None, sysroot="/mnt/root", image_path=None):
+        """Run the task."""
+        task = InstallFromImageTask(
+            sysroot=sysroot,
+            mount_point=mount_point,
+            image_path=image_path
+        )
+
+        if callback:
+            task.progress_changed_signal.connect(callback)
+
+        task.run()
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    def test_install_image_task(self, start_program):
         """Test installation from an image task."""
-        exec_with_redirect.return_value = 0
+        process = start_program.return_value
+        process.stdout = io.BytesIO(self.RSYNC_OUTPUT)
+        process.wait.return_value = 0
+        callback = Mock()
 
         with tempfile.TemporaryDirectory() as mount_point:
-            task = InstallFromImageTask(
-                sysroot="/mnt/root",
-                mount_point=mount_point
-            )
-            task.run()
+            self._run_task(mount_point, callback)
 
-        exec_with_redirect.assert_called_once_with("rsync", [
+        start_program.assert_called_once_with([
+            "rsync",
             "-pogAXtlHrDx",
             "--stats",
+            "--info=progress2",
+            "--no-inc-recursive",
             "--exclude", "/dev/",
             "--exclude", "/proc/",
             "--exclude", "/tmp/*",
@@ -112,62 +136,174 @@ class InstallFromImageTaskTestCase(unittest.TestCase):
             "--exclude", "/etc/machine-info",
             mount_point + "/",
             "/mnt/root"
-        ])
+        ], stderr=subprocess.STDOUT)
 
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.execWithRedirect")
-    def test_install_image_task_failed_exception(self, exec_with_redirect, os_sync):
+        assert callback.mock_calls == [
+            call(0, "Installing software 0%"),
+            call(0, "Installing software 51%"),
+            call(0, "Installing software 100%"),
+        ]
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    def test_install_image_task_failed_exception(self, start_program):
         """Test installation from an image task with exception."""
-        exec_with_redirect.side_effect = OSError("Fake!")
+        start_program.side_effect = OSError("Fake!")
 
         with tempfile.TemporaryDirectory() as mount_point:
-            task = InstallFromImageTask(
-                sysroot="/mnt/root",
-                mount_point=mount_point
-            )
-
             with pytest.raises(PayloadInstallationError) as cm:
-                task.run()
+                self._run_task(mount_point)
 
         msg = "Failed to install image: Fake!"
         assert str(cm.value) == msg
 
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.execWithRedirect")
-    def test_install_image_task_failed_return_code(self, exec_with_redirect, os_sync):
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    def test_install_image_task_failed_return_code(self, start_program):
         """Test installation from an image task with bad return code."""
-        exec_with_redirect.return_value = 11
+        process = start_program.return_value
+        process.stdout = io.BytesIO(b"")
+        process.wait.return_value = 11
 
         with tempfile.TemporaryDirectory() as mount_point:
-            task = InstallFromImageTask(
-                sysroot="/mnt/root",
-                mount_point=mount_point
-            )
-
             with pytest.raises(PayloadInstallationError) as cm:
-                task.run()
+                self._run_task(mount_point)
 
         msg = "Failed to install image: rsync exited with code 11"
         assert str(cm.value) == msg
 
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    def test_copy_image_task(self, mocked_conf, start_program):
+        """Test installation from an image with the native copier."""
+        mocked_conf.payload.live_image_copier = "NATIVE"
+        callback = Mock()
+
+        with tempfile.TemporaryDirectory() as mount_point:
+            with tempfile.TemporaryDirectory() as sysroot:
+                os.makedirs(join_paths(mount_point, "/dev"))
+                os.makedirs(join_paths(mount_point, "/etc"))
+                touch(join_paths(mount_point, "/dev/null"))
+
+                with open(join_paths(mount_point, "/etc/os-release"), "w") as f:
+                    f.write("x" * 100)
+
+                with open(join_paths(mount_point, "/etc/machine-id"), "w") as f:
+                    f.write("x" * 100)
+
+                self._run_task(mount_point, callback, sysroot)
+
+                assert os.listdir(sysroot) == ["etc"]
+                assert os.listdir(join_paths(sysroot, "/etc")) == ["os-release"]
+
+        start_program.assert_not_called()
+
+        assert callback.mock_calls == [
+            call(0, "Installing software 0%"),
+            call(0, "Installing software 100%"),
+        ]
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.BlockDeployment")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    def test_deploy_image_task(self, mocked_conf, start_program, deployment_cls):
+        """Test installation from an image at the block level."""
+        mocked_conf.payload.block_copy_live_image = True
+        deployment = deployment_cls.return_value
+        deployment.check.return_value = True
+        deployment.image_size = 100
+        deployment.deploy.side_effect = lambda callback: callback(50)
+        callback = Mock()
+
+        self._run_task("/mnt/image", callback, image_path="/dev/mapper/live-base")
+
+        deployment_cls.assert_called_once_with("/dev/mapper/live-base", "/mnt/root", ANY)
+        start_program.assert_not_called()
+
+        assert callback.mock_calls == [
+            call(0, "Installing software 0%"),
+            call(0, "Installing software 50%"),
+            call(0, "Installing software 100%"),
+        ]
+
+        # Fail the deployment.
+        deployment.deploy.side_effect = OSError("Fake!")
+
+        with pytest.raises(PayloadInstallationError) as cm:
+            self._run_task("/mnt/image", image_path="/dev/mapper/live-base")
+
+        assert str(cm.value) == "Failed to deploy the image: Fake!"
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.BlockDeployment")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    def test_deploy_image_task_fallback(self, mocked_conf, start_program, deployment_cls):
+        """Test the fallback of the block deployment to the file copy."""
+        mocked_conf.payload.block_copy_live_image = True
+        mocked_conf.payload.live_image_copier = "RSYNC"
+        deployment_cls.return_value.check.return_value = False
+
+        process = start_program.return_value
+        process.stdout = io.BytesIO(self.RSYNC_OUTPUT)
+        process.wait.return_value = 0
+
+        with tempfile.TemporaryDirectory() as mount_point:
+            self._run_task(mount_point, image_path="/dev/mapper/live-base")
+
+        deployment_cls.return_value.deploy.assert_not_called()
+        start_program.assert_called_once_with(ANY, stderr=subprocess.STDOUT)
+
+        # The image path is not known.
+        deployment_cls.reset_mock()
+        process.stdout = io.BytesIO(self.RSYNC_OUTPUT)
+
+        with tempfile.TemporaryDirectory() as mount_point:
+            self._run_task(mount_point)
+
+        deployment_cls.assert_not_called()
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.TreeCopier")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.conf")
+    def test_copy_image_task_fallback(self, mocked_conf, start_program, copier_cls):
+        """Test the fallback of the native copier to rsync."""
+        mocked_conf.payload.live_image_copier = "NATIVE"
+        copier_cls.return_value.copy.side_effect = OSError("Fake!")
+
+        process = start_program.return_value
+        process.stdout = io.BytesIO(self.RSYNC_OUTPUT)
+        process.wait.return_value = 0
+
+        with tempfile.TemporaryDirectory() as mount_point:
+            self._run_task(mount_point)
+
+        copier_cls.assert_called_once_with(mount_point, "/mnt/root", ANY)
+        start_program.assert_called_once_with(ANY, stderr=subprocess.STDOUT)
+
 
 class InstallFromTarTaskTestCase(unittest.TestCase):
     """Test the InstallFromTarTask class."""
 
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.execWithRedirect")
-    def test_install_tar_task(self, exec_with_redirect, os_sync):
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation."
+           "IMAGE_DOWNLOAD_CHUNK_SIZE", 4)
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    def test_install_tar_task(self, start_program):
         """Test installation from a tarball."""
-        exec_with_redirect.return_value = 0
+        process = start_program.return_value
+        process.wait.return_value = 0
+        callback = Mock()
 
         with tempfile.NamedTemporaryFile("w") as f:
+            f.write("TARBALL")
+            f.flush()
+
             task = InstallFromTarTask(
                 sysroot="/mnt/root",
                 tarfile=f.name
             )
+            task.progress_changed_signal.connect(callback)
             task.run()
 
-        exec_with_redirect.assert_called_once_with("tar", [
+        start_program.assert_called_once_with([
+            "tar",
             "--numeric-owner",
             "--selinux",
             "--acls",
@@ -183,15 +319,65 @@ class InstallFromTarTaskTestCase(unittest.TestCase):
             "--exclude", "./boot/efi/loader",
             "--exclude", "./etc/machine-id",
             "--exclude", "./etc/machine-info",
-            "-xaf", f.name,
+            "-xf", "-",
             "-C", "/mnt/root"
-        ])
+        ], stdin=subprocess.PIPE, stdout=ANY, stderr=subprocess.STDOUT)
 
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.os.sync")
-    @patch("pyanaconda.modules.payloads.payload.live_image.installation.execWithRedirect")
-    def test_install_tar_task_failed_exception(self, exec_with_redirect, os_sync):
+        assert process.stdin.write.mock_calls == [
+            call(b"TARB"),
+            call(b"ALL"),
+        ]
+
+        assert callback.mock_calls == [
+            call(0, "Installing software 0%"),
+            call(0, "Installing software 57%"),
+            call(0, "Installing software 100%"),
+        ]
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    def test_install_compressed_tar_task(self, start_program):
+        """Test installation from a compressed tarball."""
+        process = start_program.return_value
+        process.wait.return_value = 0
+
+        with tempfile.NamedTemporaryFile("wb") as f:
+            f.write(b"\x1f\x8bTARBALL")
+            f.flush()
+
+            task = InstallFromTarTask(
+                sysroot="/mnt/root",
+                tarfile=f.name
+            )
+            task.run()
+
+        args, _kwargs = start_program.call_args
+        assert args[0][-5:] == ["--gzip", "-xf", "-", "-C", "/mnt/root"]
+
+    def test_compression_options(self):
+        """Test the detection of compressed tarballs."""
+        task = InstallFromTarTask(sysroot="/mnt/root", tarfile="/file")
+
+        data = {
+            b"\x1f\x9dTARBALL": ["--compress"],
+            b"\x1f\x8bTARBALL": ["--gzip"],
+            b"BZhTARBALL": ["--bzip2"],
+            b"LZIPTARBALL": ["--lzip"],
+            b"\xffLZMATARBALL": ["--lzma"],
+            b"\x5d\x00\x00\x80\x00TARBALL": ["--lzma"],
+            b"\x89LZO\x00\r\n\x1a\nTARBALL": ["--lzop"],
+            b"\xfd7zXZ\x00TARBALL": ["--xz"],
+            b"\x28\xb5\x2f\xfdTARBALL": ["--zstd"],
+            b"TARBALL": [],
+            b"": [],
+        }
+
+        for tarball, options in data.items():
+            assert task._get_compression_options(tarball) == options
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation.startProgram")
+    def test_install_tar_task_failed_exception(self, start_program):
         """Test installation from a tarball with an exception."""
-        exec_with_redirect.side_effect = OSError("Fake!")
+        start_program.side_effect = OSError("Fake!")
 
         with tempfile.NamedTemporaryFile("w") as f:
             task = InstallFromTarTask(
@@ -298,6 +484,66 @@ class DownloadProgressTestCase(unittest.TestCase):
         ]
 
 
+class VerifyCalculatedChecksumTestCase(unittest.TestCase):
+    """Test the VerifyImageChecksumTask class with a calculated checksum."""
+
+    def test_verify_calculated_checksum(self):
+        """Test the verification of a calculated checksum."""
+        data = LiveImageConfigurationData()
+        data.checksum = "ABCD"
+
+        task = VerifyImageChecksumTask(
+            configuration=data,
+            image_path="/nonexistent/image",
+            calculated_checksum="abcd"
+        )
+
+        with self.assertLogs(level="DEBUG") as cm:
+            task.run()
+
+        msg = "Checksum of the image does match."
+        assert msg in "\n".join(cm.output)
+
+        task = VerifyImageChecksumTask(
+            configuration=data,
+            image_path="/nonexistent/image",
+            calculated_checksum="efgh"
+        )
+
+        with pytest.raises(PayloadInstallationError):
+            task.run()
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation."
+           "IMAGE_CHECKSUM_BUFFER_SIZE", 4)
+    def test_calculate_checksum_progress(self):
+        """Test the progress of the checksum calculation."""
+        data = LiveImageConfigurationData()
+        data.checksum = \
+            "7190E29480A9081FD917E33990F00098" \
+            "DD9FBD348BC52B0775780348BDA3A617"
+
+        callback = Mock()
+
+        with tempfile.NamedTemporaryFile("w") as f:
+            f.write("IMAGE CONTENT")
+            f.flush()
+
+            task = VerifyImageChecksumTask(
+                configuration=data,
+                image_path=f.name
+            )
+            task.progress_changed_signal.connect(callback)
+            task.run()
+
+        assert callback.mock_calls == [
+            call(0, 'Checking image checksum'),
+            call(0, 'Checking image checksum (30%)'),
+            call(0, 'Checking image checksum (61%)'),
+            call(0, 'Checking image checksum (92%)'),
+            call(0, 'Checking image checksum (100%)'),
+        ]
+
+
 class DownloadImageTaskTestCase(unittest.TestCase):
     """Test the DownloadImageTask class."""
 
@@ -306,6 +552,7 @@ class DownloadImageTaskTestCase(unittest.TestCase):
         self.data = LiveImageConfigurationData()
         self.callback = Mock()
         self.directory = None
+        self.task = None
 
     @contextmanager
     def _create_directory(self):
@@ -339,6 +586,7 @@ class DownloadImageTaskTestCase(unittest.TestCase):
             download_path=self.download_path
         )
         task.progress_changed_signal.connect(self.callback)
+        self.task = task
         return task.run()
 
     def _download_local_file_as_remote(self, set_content_length):
@@ -380,7 +628,15 @@ class DownloadImageTaskTestCase(unittest.TestCase):
 
     def test_local_file_as_remote_stream(self):
         """Download a local file as a remote stream."""
+        self.data.checksum = \
+            "6E84B7846B9DB6ED1977602E5A96AE02" \
+            "B966520706C56F0027E19CCD3CD06F39"
+
         self._download_local_file_as_remote(set_content_length=True)
+        assert self.task.calculated_checksum == \
+            "6e84b7846b9db6ed1977602e5a96ae02" \
+            "b966520706c56f0027e19ccd3cd06f39"
+
         assert self.callback.mock_calls == [
             call(0, 'Downloading {} (0%)'.format(self.data.url)),
             call(0, 'Downloading {} (25%)'.format(self.data.url)),
@@ -442,6 +698,93 @@ class DownloadImageTaskTestCase(unittest.TestCase):
             assert str(cm.value) == "Error while downloading the image: Fake!"
 
 
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation."
+           "IMAGE_DOWNLOAD_MIN_SEGMENT_SIZE", 4)
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation."
+           "IMAGE_DOWNLOAD_CHUNK_SIZE", 2)
+    @patch_requests()
+    def test_remote_file_segments(self, session_getter):
+        """Mock a segmented download of a remote file."""
+        content = b"0123456789ABCDEFGHIJ"
+        interrupted = []
+
+        def get(url, headers=None, **kwargs):
+            response = MagicMock()
+            response.__enter__.return_value = response
+
+            if not headers:
+                response.status_code = 200
+                response.headers = {
+                    "content-length": str(len(content)),
+                    "accept-ranges": "bytes",
+                }
+                return response
+
+            start, end = headers["Range"].removeprefix("bytes=").split("-")
+            data = content[int(start):int(end) + 1]
+            response.status_code = 206
+
+            # Interrupt the first segment once.
+            if start == "0" and not interrupted:
+                interrupted.append(True)
+                data = data[:2]
+
+            response.iter_content.return_value = [
+                data[i:i + 2] for i in range(0, len(data), 2)
+            ]
+            return response
+
+        session = session_getter.return_value.__enter__.return_value
+        session.get.side_effect = get
+
+        with self._create_directory():
+            self.data.url = "http://source"
+            self.data.checksum = hashlib.sha256(content).hexdigest()
+            self._run_task()
+
+            with open(self.download_path, "rb") as f:
+                assert f.read() == content
+
+        assert self.task.calculated_checksum == self.data.checksum
+
+        ranges = sorted(
+            c.kwargs["headers"]["Range"] for c in session.get.call_args_list
+            if c.kwargs.get("headers")
+        )
+        assert ranges == [
+            "bytes=0-4", "bytes=10-14", "bytes=15-19", "bytes=2-4", "bytes=5-9"
+        ]
+
+        assert self.callback.mock_calls[0] == call(
+            0, 'Downloading http://source (0%)'
+        )
+        assert self.callback.mock_calls[-1] == call(
+            0, 'Downloading http://source (100%)'
+        )
+
+    @patch("pyanaconda.modules.payloads.payload.live_image.installation."
+           "IMAGE_DOWNLOAD_MIN_SEGMENT_SIZE", 4)
+    @patch_requests()
+    def test_remote_file_segments_failed(self, session_getter):
+        """Mock a failed segmented download of a remote file."""
+        session = session_getter.return_value.__enter__.return_value
+        response = session.get.return_value
+        response.status_code = 200
+        response.headers = {
+            "content-length": "20",
+            "accept-ranges": "bytes",
+        }
+
+        with self._create_directory():
+            self.data.url = "http://source"
+
+            with pytest.raises(PayloadInstallationError) as cm:
+                self._run_task()
+
+            assert str(cm.value) == \
+                "Error while downloading the image: The server ignored the range request."
+
+
 class MountImageTaskTestCase(unittest.TestCase):
     """Test the MountImageTask class."""
 
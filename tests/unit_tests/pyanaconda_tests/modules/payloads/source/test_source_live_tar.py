@@ -15,18 +15,24 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import hashlib
 import os.path
 import tarfile
 import tempfile
 import unittest
 
+import pytest
+import requests
+
 from contextlib import contextmanager
 from dasbus.typing import get_variant, Str, Bool
+from requests_file import FileAdapter
 from unittest.mock import patch
 
 from pyanaconda.core.constants import SOURCE_TYPE_LIVE_TAR
 from pyanaconda.core.path import touch, join_paths, make_directories
 from pyanaconda.modules.common.constants.interfaces import PAYLOAD_SOURCE_LIVE_IMAGE
+from pyanaconda.modules.common.errors.installation import PayloadInstallationError
 from pyanaconda.modules.common.structures.live_image import LiveImageConfigurationData
 from pyanaconda.modules.payloads.constants import SourceType
 from pyanaconda.modules.payloads.source.live_tar.installation import InstallLiveTarTask
@@ -119,7 +125,7 @@ class LiveTarInstallationTestCase(unittest.TestCase):
             yield
             self.directory = None
 
-    def _create_tar(self, files):
+    def _create_tar(self, files, mode="w"):
         """Create a new tarball."""
         # Create the content.
         for path in files:
@@ -128,7 +134,7 @@ class LiveTarInstallationTestCase(unittest.TestCase):
             touch(file_path)
 
         # Create a local tarball.
-        with tarfile.open(self.tarball, "w") as tar:
+        with tarfile.open(self.tarball, mode) as tar:
             for path in files:
                 tar.add(join_paths(self.directory, path), path)
 
@@ -185,3 +191,51 @@ class LiveTarInstallationTestCase(unittest.TestCase):
             '5.8.16-200.fc32.x86_64',
             '5.8.18-200.fc32.x86_64',
         ]
+
+    def _stream_tar(self, files, checksum=None):
+        """Install a compressed tarball streamed from a fake remote."""
+        with self._create_directory():
+            self._create_tar(files, mode="w:gz")
+            self.data.url = "fake://" + self.tarball
+
+            with open(self.tarball, "rb") as f:
+                self.data.checksum = checksum or hashlib.sha256(f.read()).hexdigest()
+
+            session = requests.Session()
+            session.mount("fake://", FileAdapter())
+
+            with patch("pyanaconda.modules.payloads.payload.live_image.installation."
+                       "requests_session") as session_getter:
+                session_getter.return_value = session
+                result = self._run_task()
+
+            self._check_content(files)
+            assert not os.path.exists(join_paths(self.sysroot, "source.tar"))
+
+        return result
+
+    @patch("pyanaconda.modules.payloads.source.live_tar.installation.conf")
+    def test_install_streamed_kernels(self, mocked_conf):
+        """Install a streamed tarball with kernels."""
+        mocked_conf.payload.stream_live_tarball = True
+
+        files = [
+            "/boot/vmlinuz-0-rescue-dbe69c1b88f94a67b689e3f44b0550c8",
+            "/boot/vmlinuz-5.8.15-201.fc32.x86_64",
+            "/boot/vmlinuz-5.8.16-200.fc32.x86_64",
+        ]
+
+        assert self._stream_tar(files) == [
+            '5.8.15-201.fc32.x86_64',
+            '5.8.16-200.fc32.x86_64',
+        ]
+
+    @patch("pyanaconda.modules.payloads.source.live_tar.installation.conf")
+    def test_install_streamed_wrong_checksum(self, mocked_conf):
+        """Install a streamed tarball with a wrong checksum."""
+        mocked_conf.payload.stream_live_tarball = True
+
+        with pytest.raises(PayloadInstallationError) as cm:
+            self._stream_tar(["f1"], checksum="incorrect")
+
+        assert str(cm.value) == "Checksum of the image does not match."
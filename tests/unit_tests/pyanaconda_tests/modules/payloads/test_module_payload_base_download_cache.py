@@ -0,0 +1,132 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import unittest
+
+from tempfile import TemporaryDirectory
+from unittest.mock import patch, Mock
+
+from pyanaconda.modules.payloads.base.download_cache import DownloadCache, get_download_cache
+
+
+class DownloadCacheTestCase(unittest.TestCase):
+    """Test the shared cache of downloaded content."""
+
+    def _write_file(self, path, content):
+        """Write a file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _read_file(self, path):
+        """Read a file."""
+        with open(path) as f:
+            return f.read()
+
+    def test_get_download_cache(self):
+        """Test the get_download_cache function."""
+        assert get_download_cache() is None
+
+        with patch("pyanaconda.modules.payloads.base.download_cache.conf") as conf:
+            conf.payload.download_cache = "/var/cache/anaconda"
+            cache = get_download_cache()
+
+        assert cache.location == "/var/cache/anaconda"
+        assert cache.is_remote is False
+
+    def test_remote_location(self):
+        """Test the remote location of the cache."""
+        assert DownloadCache("http://server/cache/").is_remote is True
+        assert DownloadCache("https://server/cache").is_remote is True
+        assert DownloadCache("http://server/cache/").location == "http://server/cache"
+
+    def test_restore_missing(self):
+        """Test the restore of a missing file."""
+        with TemporaryDirectory() as tmp:
+            cache = DownloadCache(os.path.join(tmp, "cache"))
+            path = os.path.join(tmp, "download", "a.rpm")
+
+            assert cache.restore("sha256", "abcd", path) is False
+            assert not os.path.exists(path)
+
+    def test_store_and_restore(self):
+        """Test the store and restore of a file."""
+        with TemporaryDirectory() as tmp:
+            cache = DownloadCache(os.path.join(tmp, "cache"))
+            path = os.path.join(tmp, "download", "a.rpm")
+            self._write_file(path, "Package A")
+
+            assert cache.store("SHA256", "ABCD", path) is True
+            assert cache.store("sha256", "abcd", path) is False
+
+            cached_path = os.path.join(tmp, "cache", "sha256", "ab", "abcd")
+            assert self._read_file(cached_path) == "Package A"
+
+            # The file is linked on the same file system.
+            assert os.path.samefile(path, cached_path)
+
+            restored_path = os.path.join(tmp, "new", "a.rpm")
+            assert cache.restore("sha256", "abcd", restored_path) is True
+            assert self._read_file(restored_path) == "Package A"
+
+    @patch("pyanaconda.modules.payloads.base.download_cache.os.link")
+    def test_store_copy(self, link):
+        """Test the store of a file on a different file system."""
+        link.side_effect = OSError("Invalid cross-device link")
+
+        with TemporaryDirectory() as tmp:
+            cache = DownloadCache(os.path.join(tmp, "cache"))
+            path = os.path.join(tmp, "download", "a.rpm")
+            self._write_file(path, "Package A")
+
+            assert cache.store("sha256", "abcd", path) is True
+
+            cached_path = os.path.join(tmp, "cache", "sha256", "ab", "abcd")
+            assert self._read_file(cached_path) == "Package A"
+            assert not os.path.samefile(path, cached_path)
+
+    @patch("pyanaconda.modules.payloads.base.download_cache.requests_session")
+    def test_restore_remote(self, session_getter):
+        """Test the restore of a file from the remote cache."""
+        session = session_getter.return_value.__enter__.return_value
+
+        response = Mock()
+        response.status_code = 200
+        response.iter_content.return_value = [b"Package ", b"A"]
+        session.get.return_value = response
+
+        with TemporaryDirectory() as tmp:
+            cache = DownloadCache("http://server/cache")
+            path = os.path.join(tmp, "download", "a.rpm")
+
+            assert cache.restore("sha256", "abcd", path) is True
+            assert self._read_file(path) == "Package A"
+
+            args, _kwargs = session.get.call_args
+            assert args == ("http://server/cache/sha256/ab/abcd", )
+
+            # The remote cache is read-only.
+            assert cache.store("sha256", "efgh", path) is False
+
+            # The file is missing.
+            response.status_code = 404
+            path = os.path.join(tmp, "download", "b.rpm")
+
+            assert cache.restore("sha256", "efgh", path) is False
+            assert not os.path.exists(path)
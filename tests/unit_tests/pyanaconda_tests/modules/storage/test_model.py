@@ -15,11 +15,21 @@
 # License and may only be used or replicated with the express permission of
 # Red Hat, Inc.
 #
+import gc
+import inspect
 import unittest
+import weakref
 
-from blivet.devices import StorageDevice
+from unittest.mock import patch, Mock, PropertyMock
+
+from blivet.deviceaction import ActionCreateFormat
+from blivet.devices import DiskDevice, StorageDevice
+from blivet.devicetree import DeviceTree
+from blivet.formats import get_format
+from blivet.size import Size
 
 from pyanaconda.modules.storage.devicetree import create_storage
+from pyanaconda.modules.storage.devicetree.model import _remove_disk_from_device_tree
 from pyanaconda.modules.storage.devicetree.root import Root
 
 
@@ -149,3 +159,221 @@ class InstallerStorageTestCase(unittest.TestCase):
         assert len(root2_copy.mounts) == 2
         assert "/" in root2_copy.mounts
         assert "/home" in root2_copy.mounts
+
+    def test_copy_roots_shared_devices(self):
+        """Test the copy method with roots that share devices."""
+        devices = []
+
+        for i in range(10):
+            device = StorageDevice("dev{}".format(i))
+            self._add_device(device)
+            devices.append(device)
+
+        for i in range(5):
+            self.storage.roots.append(Root(
+                name="Linux {}".format(i),
+                devices=devices,
+                mounts={"/": devices[i]},
+            ))
+
+        # Every device should be copied only once.
+        original_deepcopy = StorageDevice.__deepcopy__
+
+        with patch.object(StorageDevice, "__deepcopy__", autospec=True) as deepcopy_mock:
+            deepcopy_mock.side_effect = original_deepcopy
+            storage_copy = self.storage.copy()
+
+        assert deepcopy_mock.call_count == 10
+        assert len(storage_copy.roots) == 5
+
+        for i, root_copy in enumerate(storage_copy.roots):
+            assert root_copy.devices == storage_copy.devices
+            assert root_copy.mounts["/"] is storage_copy.devicetree.get_device_by_name(
+                "dev{}".format(i)
+            )
+
+    def test_copy_root(self):
+        """Test the copy method of a root."""
+        dev1 = StorageDevice("dev1")
+        self._add_device(dev1)
+
+        root1 = Root(
+            name="Linux 1",
+            devices=[dev1],
+            mounts={"/": dev1},
+        )
+
+        storage_copy = self.storage.copy()
+        dev1_copy = storage_copy.devicetree.get_device_by_name("dev1")
+
+        with patch("pyanaconda.modules.storage.devicetree.root.copy.deepcopy") as deepcopy_mock:
+            root1_copy = root1.copy(storage=storage_copy)
+
+        deepcopy_mock.assert_not_called()
+        assert root1_copy is not root1
+        assert root1_copy.name == "Linux 1"
+        assert root1_copy.devices == [dev1_copy]
+        assert root1_copy.mounts == {"/": dev1_copy}
+
+        # The original root is not changed.
+        assert root1.devices == [dev1]
+        assert root1.mounts == {"/": dev1}
+
+    @patch("blivet.formats.fs.FS.formattable", new_callable=PropertyMock, return_value=True)
+    def test_free_space_cache(self, formattable):
+        """Test the cache of the free space."""
+        dev1 = DiskDevice("dev1", size=Size("5 GiB"))
+        self._add_device(dev1)
+
+        dev2 = DiskDevice("dev2", size=Size("10 GiB"))
+        self._add_device(dev2)
+
+        with patch.object(self.storage, "get_free_space",
+                          wraps=self.storage.get_free_space) as get_free_space:
+            # The free space of all disks is computed in one pass.
+            assert self.storage.get_disk_free_space() == Size("15 GiB")
+            get_free_space.assert_called_once_with([dev1, dev2])
+            get_free_space.reset_mock()
+
+            # The cached free space is used until the next change.
+            assert self.storage.get_disk_free_space() == Size("15 GiB")
+            assert self.storage.get_disk_reclaimable_space() == Size(0)
+            assert self.storage.get_disks_free_space([dev2]) == {"dev2": Size("10 GiB")}
+            get_free_space.assert_not_called()
+
+            # Only the free space of a new disk is computed.
+            dev3 = DiskDevice("dev3", size=Size("1 GiB"))
+            self._add_device(dev3)
+
+            assert self.storage.get_disk_free_space() == Size("16 GiB")
+            get_free_space.assert_called_once_with([dev3])
+            get_free_space.reset_mock()
+
+            # The cache is dropped if an action is scheduled.
+            action = ActionCreateFormat(dev1, get_format("ext4"))
+            self.storage.devicetree.actions.add(action)
+
+            assert self.storage.get_disks_free_space() == {
+                "dev1": Size(0),
+                "dev2": Size("10 GiB"),
+                "dev3": Size("1 GiB"),
+            }
+            get_free_space.assert_called_once_with([dev1, dev2, dev3])
+            get_free_space.reset_mock()
+
+            # The cache is dropped if an action is canceled.
+            self.storage.devicetree.actions.remove(action)
+
+            assert self.storage.get_disk_free_space([dev1]) == Size("5 GiB")
+            get_free_space.assert_called_once_with([dev1])
+            get_free_space.reset_mock()
+
+            # The cache is dropped if a cached disk is removed.
+            self.storage.devicetree._remove_device(dev1)
+
+            assert self.storage.get_disk_free_space() == Size("11 GiB")
+            get_free_space.assert_called_once_with([dev2, dev3])
+
+    @patch("blivet.formats.fs.FS.formattable", new_callable=PropertyMock, return_value=True)
+    def test_free_space_cache_copy(self, formattable):
+        """Test the cache of the free space with a copy of the storage."""
+        dev1 = DiskDevice("dev1", size=Size("5 GiB"))
+        self._add_device(dev1)
+
+        storage_copy = self.storage.copy()
+        dev1_copy = storage_copy.devicetree.get_device_by_name("dev1")
+
+        assert self.storage.get_disk_free_space() == Size("5 GiB")
+        assert storage_copy.get_disk_free_space() == Size("5 GiB")
+
+        # Only the cache of the changed copy is dropped.
+        action = ActionCreateFormat(dev1_copy, get_format("ext4"))
+        storage_copy.devicetree.actions.add(action)
+
+        with patch.object(self.storage, "get_free_space") as get_free_space:
+            assert self.storage.get_disk_free_space() == Size("5 GiB")
+            get_free_space.assert_not_called()
+
+        assert storage_copy.get_disk_free_space() == Size(0)
+
+        # The callbacks don't keep the copy alive.
+        storage_copy = weakref.ref(storage_copy)
+        action = dev1_copy = None
+        gc.collect()
+
+        assert storage_copy() is None
+
+    @patch("pyanaconda.modules.storage.devicetree.model.udev")
+    def test_populate_incrementally(self, udev):
+        """Test the populate_incrementally method."""
+        dev1 = DiskDevice("dev1", exists=True, sysfs_path="/sys/block/dev1")
+        self._add_device(dev1)
+
+        udev.get_devices.return_value = [{"NAME": "dev1", "SYSFS_PATH": "/sys/block/dev1"}]
+        udev.device_get_sysfs_path.side_effect = lambda info: info["SYSFS_PATH"]
+
+        def populate():
+            for name in ["dev2", "dev3"]:
+                if not self.storage.devicetree.get_device_by_name(name):
+                    self._add_device(DiskDevice(name, exists=True))
+
+        self.storage.devicetree.populate = Mock(side_effect=populate)
+        self.storage.protected_devices = ["dev3"]
+
+        assert self.storage.populate_incrementally() == ["dev2", "dev3"]
+        self.storage.devicetree.populate.assert_called_once_with()
+
+        assert self.storage.devicetree.get_device_by_name("dev1") is dev1
+        assert self.storage.devicetree.get_device_by_name("dev3").protected is True
+        assert self.storage.devicetree.get_device_by_name("dev2").protected is False
+
+        # Nothing is added if there are no new devices.
+        assert self.storage.populate_incrementally() == []
+
+    @patch("pyanaconda.modules.storage.devicetree.model.udev")
+    def test_populate_incrementally_removed(self, udev):
+        """Test the populate_incrementally method with removed disks."""
+        dev1 = DiskDevice("dev1", exists=True, sysfs_path="/sys/block/dev1")
+        dev2 = DiskDevice("dev2", exists=True, sysfs_path="/sys/block/dev2")
+        dev3 = DiskDevice("dev3", exists=True, sysfs_path="/sys/block/dev3")
+        dev4 = StorageDevice("dev4", exists=True, sysfs_path="/sys/block/dev4")
+        self._add_device(dev1)
+        self._add_device(dev2)
+        self._add_device(dev3)
+        self._add_device(dev4)
+        self.storage.devicetree.hide(dev3)
+
+        action1 = ActionCreateFormat(dev1, get_format("ext4"))
+        self.storage.devicetree.actions.add(action1)
+
+        action2 = ActionCreateFormat(dev2, get_format("ext4"))
+        self.storage.devicetree.actions.add(action2)
+
+        # Only the first disk is still in the system.
+        udev.get_devices.return_value = [{"NAME": "dev1", "SYSFS_PATH": "/sys/block/dev1"}]
+        udev.device_get_sysfs_path.side_effect = lambda info: info["SYSFS_PATH"]
+        self.storage.devicetree.populate = Mock()
+
+        assert self.storage.populate_incrementally() == []
+
+        # The missing disks and their actions are removed.
+        assert self.storage.devicetree.actions.find() == [action1]
+
+        # Hidden disks stay hidden.
+        assert self.storage.devicetree.get_device_by_name("dev3", hidden=True) is dev3
+
+        # Other devices can be inactive, so they are kept.
+        assert self.storage.devicetree.devices == [dev1, dev4]
+
+    def test_remove_disk_api(self):
+        """Test the private API of Blivet used to remove disks."""
+        # The removal of missing disks depends on this method.
+        # See the _remove_disk_from_device_tree function.
+        method = getattr(DeviceTree, "_remove_device")
+        assert "modparent" in inspect.signature(method).parameters
+
+        dev1 = DiskDevice("dev1", exists=True, sysfs_path="/sys/block/dev1")
+        self._add_device(dev1)
+
+        _remove_disk_from_device_tree(self.storage.devicetree, dev1)
+        assert self.storage.devicetree.devices == []
@@ -19,6 +19,8 @@
 #
 import os
 import tempfile
+import threading
+import time
 import unittest
 import pytest
 
@@ -40,6 +42,7 @@ from pyanaconda.modules.storage.bootloader.efi import EFIGRUB, MacEFIGRUB, Aarch
 from pyanaconda.modules.storage.bootloader.extlinux import EXTLINUX
 from pyanaconda.modules.storage.bootloader.grub2 import GRUB2, IPSeriesGRUB2, PowerNVGRUB2
 from pyanaconda.modules.storage.bootloader.zipl import ZIPL
+from pyanaconda.modules.common.errors.installation import BootloaderInstallationError
 from pyanaconda.modules.common.errors.storage import UnavailableStorageError
 from pyanaconda.modules.storage.constants import BootloaderMode
 
@@ -52,6 +55,7 @@ from pyanaconda.modules.storage.bootloader.bootloader_interface import Bootloade
 from pyanaconda.modules.storage.bootloader.installation import ConfigureBootloaderTask, \
     InstallBootloaderTask, FixZIPLBootloaderTask, FixBTRFSBootloaderTask, RecreateInitrdsTask, \
     CreateRescueImagesTask, CreateBLSEntriesTask
+from pyanaconda.modules.storage.bootloader.utils import _get_initramfs_max_workers
 
 
 class BootloaderInterfaceTestCase(unittest.TestCase):
@@ -246,6 +250,7 @@ class BootloaderTasksTestCase(unittest.TestCase):
     def test_create_rescue_images(self, exec_mock):
         """Test the installation task that creates rescue images."""
         version = "4.17.7-200.fc28.x86_64"
+        exec_mock.return_value = 0
 
         with tempfile.TemporaryDirectory() as root:
             task = CreateRescueImagesTask(
@@ -282,7 +287,7 @@ class BootloaderTasksTestCase(unittest.TestCase):
                 mock.call(
                     "new-kernel-pkg", [
                         "--rpmposttrans", "4.17.7-200.fc28.x86_64"
-                    ], root=root
+                    ], root=root, output_callback=task.report_progress
                 )
             ])
 
@@ -313,19 +318,19 @@ class BootloaderTasksTestCase(unittest.TestCase):
                     "/etc/kernel/postinst.d/a", [
                         "4.17.7-200.fc28.x86_64",
                         "/boot/vmlinuz-4.17.7-200.fc28.x86_64"
-                    ], root=root
+                    ], root=root, output_callback=task.report_progress
                 ),
                 mock.call(
                     "/etc/kernel/postinst.d/b", [
                         "4.17.7-200.fc28.x86_64",
                         "/boot/vmlinuz-4.17.7-200.fc28.x86_64"
-                    ], root=root
+                    ], root=root, output_callback=task.report_progress
                 ),
                 mock.call(
                     "/etc/kernel/postinst.d/c", [
                         "4.17.7-200.fc28.x86_64",
                         "/boot/vmlinuz-4.17.7-200.fc28.x86_64"
-                    ], root=root
+                    ], root=root, output_callback=task.report_progress
                 ),
             ])
 
@@ -485,6 +490,8 @@ class BootloaderTasksTestCase(unittest.TestCase):
         """Test the installation task that recreates initrds."""
         storage = Mock(bootloader=EFIGRUB())
         version = "4.17.7-200.fc28.x86_64"
+        exec_mock.return_value = 0
+        conf_mock.bootloader.initramfs_max_workers = 0
 
         with tempfile.TemporaryDirectory() as root:
             task = RecreateInitrdsTask(
@@ -512,13 +519,13 @@ class BootloaderTasksTestCase(unittest.TestCase):
                 mock.call(
                     "depmod", [
                         "-a", "4.17.7-200.fc28.x86_64"
-                    ], root=root
+                    ], root=root, output_callback=task.report_progress
                 ),
                 mock.call(
                     "dracut", [
                         "-f", "/boot/initramfs-4.17.7-200.fc28.x86_64.img",
                         "4.17.7-200.fc28.x86_64"
-                    ], root=root)
+                    ], root=root, output_callback=task.report_progress)
             ])
 
         exec_mock.reset_mock()
@@ -541,7 +548,7 @@ class BootloaderTasksTestCase(unittest.TestCase):
                     "new-kernel-pkg", [
                         "--mkinitrd", "--dracut", "--depmod",
                         "--update", "4.17.7-200.fc28.x86_64"
-                    ], root=root
+                    ], root=root, output_callback=task.report_progress
                 )
             ])
 
@@ -563,8 +570,139 @@ class BootloaderTasksTestCase(unittest.TestCase):
                     "-f", "/boot/initramfs-4.17.7-200.fc28.x86_64.img",
                     "4.17.7-200.fc28.x86_64"
                 ],
-                root=root
+                root=root,
+                output_callback=task.report_progress
+            )
+
+    @patch('pyanaconda.modules.storage.bootloader.utils.execWithRedirect')
+    @patch('pyanaconda.modules.storage.bootloader.utils.conf')
+    def test_recreate_initrds_in_parallel(self, conf_mock, exec_mock):
+        """Test the parallel recreation of initrds."""
+        storage = Mock(bootloader=EFIGRUB())
+        versions = ["6.1.0-1.fc38.x86_64", "6.2.0-1.fc38.x86_64"]
+        conf_mock.target.is_image = True
+        conf_mock.bootloader.initramfs_max_workers = 2
+
+        # Both kernels have to be processed at the same time.
+        barrier = threading.Barrier(2, timeout=10)
+        exec_mock.side_effect = lambda *args, **kwargs: barrier.wait() and 0
+
+        with tempfile.TemporaryDirectory() as root:
+            task = RecreateInitrdsTask(
+                storage=storage,
+                sysroot=root,
+                payload_type=PAYLOAD_TYPE_LIVE_IMAGE,
+                kernel_versions=versions
+            )
+
+            with patch.object(task, "report_progress") as callback:
+                task.run()
+
+            assert exec_mock.call_count == 2
+            assert {c.args[0] for c in callback.call_args_list} == {
+                "Recreating initrd for 6.1.0-1.fc38.x86_64",
+                "Recreating initrd for 6.2.0-1.fc38.x86_64",
+            }
+
+    @patch('pyanaconda.modules.storage.bootloader.utils.execWithRedirect')
+    @patch('pyanaconda.modules.storage.bootloader.utils.conf')
+    def test_recreate_initrds_in_sequence(self, conf_mock, exec_mock):
+        """Test the sequential recreation of initrds with new-kernel-pkg."""
+        storage = Mock(bootloader=EFIGRUB())
+        versions = ["6.1.0-1.fc38.x86_64", "6.2.0-1.fc38.x86_64"]
+        conf_mock.target.is_image = False
+        conf_mock.bootloader.initramfs_max_workers = 2
+        lock = threading.Lock()
+        running = []
+
+        def run_command(*args, **kwargs):
+            # The command fails if another one is running.
+            if not lock.acquire(blocking=False):
+                return 1
+
+            running.append(args[1][-1])
+            time.sleep(0.1)
+            lock.release()
+            return 0
+
+        exec_mock.side_effect = run_command
+
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(root + "/usr/sbin/", exist_ok=True)
+            open(root + "/usr/sbin/new-kernel-pkg", 'wb').close()
+
+            task = RecreateInitrdsTask(
+                storage=storage,
+                sysroot=root,
+                payload_type=PAYLOAD_TYPE_LIVE_IMAGE,
+                kernel_versions=versions
             )
+            task.run()
+
+        # The kernels are processed one after another.
+        assert running == versions
+
+    @patch('pyanaconda.modules.storage.bootloader.utils.execWithRedirect')
+    @patch('pyanaconda.modules.storage.bootloader.utils.conf')
+    def test_recreate_initrds_failed(self, conf_mock, exec_mock):
+        """Test the failed recreation of initrds."""
+        storage = Mock(bootloader=EFIGRUB())
+        versions = ["6.1.0-1.fc38.x86_64", "6.2.0-1.fc38.x86_64", "6.3.0-1.fc38.x86_64"]
+        conf_mock.target.is_image = True
+        conf_mock.bootloader.initramfs_max_workers = 0
+
+        def run_dracut(cmd, argv, **kwargs):
+            if argv[-1] == "6.2.0-1.fc38.x86_64":
+                raise OSError("Fake error.")
+
+            return 1
+
+        exec_mock.side_effect = run_dracut
+
+        with tempfile.TemporaryDirectory() as root:
+            task = RecreateInitrdsTask(
+                storage=storage,
+                sysroot=root,
+                payload_type=PAYLOAD_TYPE_LIVE_IMAGE,
+                kernel_versions=versions
+            )
+
+            with pytest.raises(BootloaderInstallationError) as cm:
+                task.run()
+
+        # The other kernels are processed and only the errors are reported.
+        assert exec_mock.call_count == 3
+        assert str(cm.value) == \
+            "Failed to recreate the initrds.\n6.2.0-1.fc38.x86_64: Fake error."
+
+    @patch('pyanaconda.modules.storage.bootloader.utils.os.cpu_count')
+    @patch('pyanaconda.modules.storage.bootloader.utils.blivet_util.available_memory')
+    @patch('pyanaconda.modules.storage.bootloader.utils.conf')
+    def test_initramfs_max_workers(self, conf_mock, available_memory, cpu_count):
+        """Test the number of workers for initramfs images."""
+        conf_mock.bootloader.initramfs_max_workers = 0
+
+        # Limited by the number of CPUs.
+        cpu_count.return_value = 2
+        available_memory.return_value = Size("16 GiB")
+        assert _get_initramfs_max_workers(4) == 2
+
+        # Limited by the available memory.
+        cpu_count.return_value = 8
+        available_memory.return_value = Size("3.5 GiB")
+        assert _get_initramfs_max_workers(4) == 3
+
+        # Limited by the number of kernels.
+        available_memory.return_value = Size("16 GiB")
+        assert _get_initramfs_max_workers(4) == 4
+
+        # At least one worker.
+        available_memory.side_effect = OSError("Fake error.")
+        assert _get_initramfs_max_workers(4) == 1
+
+        # Limited by the configuration.
+        conf_mock.bootloader.initramfs_max_workers = 1
+        assert _get_initramfs_max_workers(4) == 1
 
     @patch('pyanaconda.modules.storage.bootloader.installation.conf')
     @patch('pyanaconda.modules.storage.bootloader.installation.InstallBootloaderTask')
@@ -17,6 +17,10 @@
 #
 # Red Hat Author(s): Vendula Poncova <vponcova@redhat.com>
 #
+import copy
+import os
+import shutil
+import struct
 import tempfile
 import unittest
 import pytest
@@ -36,13 +40,14 @@ from blivet.size import Size
 from dasbus.typing import *  # pylint: disable=wildcard-import
 from pyanaconda.core.kernel import KernelArguments
 from pyanaconda.modules.common.errors.storage import UnknownDeviceError, MountFilesystemError
-from pyanaconda.modules.common.structures.storage import DeviceFormatData
+from pyanaconda.modules.common.structures.storage import DeviceData, DeviceFormatData
 from pyanaconda.modules.storage.devicetree import DeviceTreeModule, create_storage, utils
 from pyanaconda.modules.storage.devicetree.devicetree_interface import DeviceTreeInterface
 from pyanaconda.modules.storage.devicetree.populate import FindDevicesTask
 from pyanaconda.modules.storage.devicetree.rescue import FindExistingSystemsTask, \
     MountExistingSystemTask
-from pyanaconda.modules.storage.devicetree.root import Root
+from pyanaconda.modules.storage.devicetree.root import Root, ProbeCache, \
+    find_existing_installations, _read_change_marker
 
 
 class DeviceTreeInterfaceTestCase(unittest.TestCase):
@@ -163,6 +168,34 @@ class DeviceTreeInterfaceTestCase(unittest.TestCase):
         with pytest.raises(UnknownDeviceError):
             self.interface.GetDeviceData("dev1")
 
+    def test_get_devices_data(self):
+        """Test GetDevicesData."""
+        for i in range(1, 501):
+            self._add_device(StorageDevice(
+                "dev{}".format(i),
+                fmt=get_format("ext4"),
+                size=Size("{} MiB".format(i))
+            ))
+
+        names = ["dev{}".format(i) for i in range(500, 0, -1)]
+        devices_data = DeviceData.from_structure_list(
+            self.interface.GetDevicesData(names)
+        )
+
+        assert [d.name for d in devices_data] == names
+        assert [d.size for d in devices_data] == [
+            Size("{} MiB".format(i)).get_bytes() for i in range(500, 0, -1)
+        ]
+
+        assert self.interface.GetDevicesData(["dev1"]) == [
+            self.interface.GetDeviceData("dev1")
+        ]
+
+        assert self.interface.GetDevicesData([]) == []
+
+        with pytest.raises(UnknownDeviceError):
+            self.interface.GetDevicesData(["dev1", "devX"])
+
     def test_get_dasd_device_data(self):
         """Test GetDeviceData for DASD."""
         self._add_device(DASDDevice(
@@ -309,6 +342,29 @@ class DeviceTreeInterfaceTestCase(unittest.TestCase):
             'description': get_variant(Str, 'LUKS'),
         }
 
+    def test_get_formats_data(self):
+        """Test GetFormatsData."""
+        self._add_device(StorageDevice(
+            "dev1",
+            fmt=get_format("ext4", mountpoint="/home"),
+            size=Size("10 GiB")
+        ))
+        self._add_device(StorageDevice(
+            "dev2",
+            fmt=get_format("swap"),
+            size=Size("1 GiB")
+        ))
+
+        assert self.interface.GetFormatsData(["dev2", "dev1"]) == [
+            self.interface.GetFormatData("dev2"),
+            self.interface.GetFormatData("dev1"),
+        ]
+
+        assert self.interface.GetFormatsData([]) == []
+
+        with pytest.raises(UnknownDeviceError):
+            self.interface.GetFormatsData(["dev1", "devX"])
+
     def test_get_format_type_data(self):
         """Test GetFormatTypeData."""
         assert self.interface.GetFormatTypeData("swap") == {
@@ -500,6 +556,42 @@ class DeviceTreeInterfaceTestCase(unittest.TestCase):
         with pytest.raises(UnknownDeviceError):
             self.interface.GetDiskFreeSpace(["dev1", "dev2", "devX"])
 
+    @patch("blivet.formats.disklabel.DiskLabel.free", new_callable=PropertyMock)
+    @patch("blivet.formats.disklabel.DiskLabel.get_platform_label_types")
+    def test_get_disks_free_space(self, label_types, free):
+        """Test GetDisksFreeSpace."""
+        label_types.return_value = ["msdos", "gpt"]
+        free.return_value = Size("4 GiB")
+
+        self._add_device(DiskDevice(
+            "dev1",
+            fmt=get_format("disklabel", label_type="msdos"),
+            size=Size("5 GiB"))
+        )
+
+        self._add_device(DiskDevice(
+            "dev2",
+            fmt=get_format("disklabel", label_type="gpt"),
+            size=Size("5 GiB"))
+        )
+
+        self._add_device(DiskDevice(
+            "dev3",
+            fmt=get_format("disklabel", label_type="dasd"),
+            size=Size("5 GiB")
+        ))
+
+        assert self.interface.GetDisksFreeSpace([]) == {}
+
+        assert self.interface.GetDisksFreeSpace(["dev1", "dev2", "dev3"]) == {
+            "dev1": Size("4 GiB").get_bytes(),
+            "dev2": Size("4 GiB").get_bytes(),
+            "dev3": 0,
+        }
+
+        with pytest.raises(UnknownDeviceError):
+            self.interface.GetDisksFreeSpace(["dev1", "dev2", "devX"])
+
     @patch("blivet.formats.disklabel.DiskLabel.get_platform_label_types")
     def test_get_disk_reclaimable_space(self, label_types):
         """Test GetDiskReclaimableSpace."""
@@ -768,7 +860,7 @@ class DeviceTreeInterfaceTestCase(unittest.TestCase):
 
         obj = check_task_creation(task_path, publisher, FindExistingSystemsTask)
 
-        assert obj.implementation._devicetree == self.module.storage.devicetree
+        assert obj.implementation._storage == self.module.storage
 
         roots = [Root(name="My Linux")]
         obj.implementation._set_result(roots)
@@ -795,7 +887,7 @@ class DeviceTreeInterfaceTestCase(unittest.TestCase):
 
         obj = check_task_creation(task_path, publisher, FindDevicesTask)
 
-        assert obj.implementation._devicetree == self.module.storage.devicetree
+        assert obj.implementation._storage == self.module.storage
 
     def test_get_device_mount_options(self):
         """Test GetDeviceMountOptions."""
@@ -838,6 +930,132 @@ class DeviceTreeTasksTestCase(unittest.TestCase):
         task = FindExistingSystemsTask(storage.devicetree)
         assert task.run() == []
 
+    def _create_device(self, name, fstab):
+        """Create a mock of a probed device."""
+        device = Mock(direct=True, controllable=True, path="/dev/" + name)
+        device.name = name
+        device.format.type = "ext4"
+        device.format.uuid = name + "-uuid"
+        device.format.options = "defaults"
+        device.format.linux_native = True
+        device.format.mountable = True
+        device.format.exists = True
+
+        def mount(options, mountpoint):
+            assert options == "defaults,ro"
+            os.makedirs(mountpoint + "/etc")
+
+            if fstab is not None:
+                with open(mountpoint + "/etc/fstab", "w") as f:
+                    f.write(fstab)
+
+        device.format.mount.side_effect = mount
+        return device
+
+    @patch("pyanaconda.modules.storage.devicetree.root._read_change_marker")
+    @patch("pyanaconda.modules.storage.devicetree.root.blivet_util")
+    def test_find_existing_installations(self, blivet_util, read_marker):
+        """Test the find_existing_installations function."""
+        dev1 = self._create_device("dev1", "/dev/dev2 / ext4 defaults 0 0\n")
+        dev2 = self._create_device("dev2", "")
+        dev3 = self._create_device("dev3", None)
+        dev4 = self._create_device("dev4", "/dev/dev4 / ext4 defaults 0 0\n")
+
+        devicetree = Mock(devices=[dev1, dev2, dev3, dev4])
+        devicetree.resolve_device.side_effect = \
+            lambda spec, **kwargs: dev2 if spec == "/dev/dev2" else None
+
+        # Only the dev1 device has a change marker.
+        read_marker.side_effect = lambda path, fstype: (1, 2) if path == "/dev/dev1" else None
+        blivet_util.capture_output.return_value = "x86_64"
+
+        # The unmounted mount points are empty.
+        blivet_util.umount.side_effect = \
+            lambda mountpoint: shutil.rmtree(mountpoint + "/etc", ignore_errors=True)
+
+        probe_cache = ProbeCache()
+        assert copy.deepcopy(probe_cache) is probe_cache
+
+        with tempfile.TemporaryDirectory() as d, \
+                patch("pyanaconda.modules.storage.devicetree.root.PROBE_CACHE_DIR", d):
+
+            roots = find_existing_installations(devicetree, probe_cache)
+
+            assert len(roots) == 1
+            assert roots[0].devices == [dev2]
+            assert roots[0].mounts == {"/": dev2}
+
+            # All devices are mounted on private mount points.
+            mount_points = {
+                dev.format.mount.call_args.kwargs["mountpoint"]
+                for dev in (dev1, dev2, dev3, dev4)
+            }
+            assert len(mount_points) == 4
+
+            # Devices without an installation are torn down.
+            dev1.teardown.assert_not_called()
+            dev2.teardown.assert_not_called()
+            dev3.teardown.assert_called_once_with()
+            devicetree.teardown_all.assert_called_once_with()
+
+            # Only the files of the cached probe are kept.
+            assert len(os.listdir(d)) == 1
+
+            # The cached probe is used if the device has not changed.
+            for dev in (dev1, dev2, dev3, dev4):
+                dev.format.mount.reset_mock()
+
+            roots = find_existing_installations(devicetree, probe_cache)
+
+            assert len(roots) == 1
+            assert roots[0].mounts == {"/": dev2}
+            dev1.format.mount.assert_not_called()
+            dev2.format.mount.assert_called_once()
+
+            # The device is probed again if it has changed.
+            files = os.listdir(d)
+            read_marker.side_effect = lambda path, fstype: (1, 3) if path == "/dev/dev1" else None
+            find_existing_installations(devicetree, probe_cache)
+            dev1.format.mount.assert_called_once()
+
+            # The files of the replaced probe are removed.
+            assert len(os.listdir(d)) == 1
+            assert os.listdir(d) != files
+
+            # The files of devices that are not probed anymore are removed.
+            devicetree.devices = [dev2, dev3, dev4]
+            find_existing_installations(devicetree, probe_cache)
+            assert os.listdir(d) == []
+
+            # Nothing is cached without the cache.
+            devicetree.devices = [dev1, dev2, dev3, dev4]
+            find_existing_installations(devicetree)
+            assert os.listdir(d) == []
+
+    def test_read_change_marker(self):
+        """Test the _read_change_marker function."""
+        with tempfile.NamedTemporaryFile() as f:
+            data = bytearray(0x10100)
+            struct.pack_into("<IIH", data, 1024 + 0x2C, 10, 20, 0)
+            struct.pack_into("<H", data, 1024 + 0x38, 0xEF53)
+            data[0x10040:0x10048] = b"_BHRfS_M"
+            struct.pack_into("<Q", data, 0x10048, 30)
+            f.write(data)
+            f.flush()
+
+            assert _read_change_marker(f.name, "ext4") == (10, 20)
+            assert _read_change_marker(f.name, "btrfs") == (30, )
+            assert _read_change_marker(f.name, "xfs") is None
+
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(bytes(0x10100))
+            f.flush()
+
+            assert _read_change_marker(f.name, "ext4") is None
+            assert _read_change_marker(f.name, "btrfs") is None
+
+        assert _read_change_marker("/nonexistent", "ext4") is None
+
     @patch('pyanaconda.modules.storage.devicetree.rescue.mount_existing_system')
     def test_mount_existing_system(self, mount):
         storage = create_storage()
@@ -855,11 +1073,14 @@ class DeviceTreeTasksTestCase(unittest.TestCase):
 
     def test_find_devices(self):
         storage = Mock()
+        storage.populate_incrementally.return_value = ["dev1"]
 
-        task = FindDevicesTask(storage.devicetree)
-        task.run()
+        task = FindDevicesTask(storage)
+        assert task.run() == ["dev1"]
 
-        storage.devicetree.populate.assert_called_once_with()
+        storage.populate_incrementally.assert_called_once_with()
+        storage.devicetree.populate.assert_not_called()
+        storage.devicetree.teardown_all.assert_called_once_with()
 
 
 class DeviceTreeUtilsTestCase(unittest.TestCase):
@@ -46,6 +46,7 @@ from pyanaconda.modules.storage.partitioning.constants import PartitioningMethod
 from pyanaconda.modules.storage.partitioning.interactive.interactive_module import \
     InteractivePartitioningModule
 from pyanaconda.modules.storage.devicetree import create_storage
+from pyanaconda.modules.storage.devicetree.root import ProbeCache
 from pyanaconda.modules.storage.platform import S390
 from tests.unit_tests.pyanaconda_tests import check_kickstart_interface, check_task_creation, \
     patch_dbus_publish_object, check_dbus_property, patch_dbus_get_proxy, \
@@ -138,6 +139,11 @@ class StorageInterfaceTestCase(unittest.TestCase):
 
         assert obj.implementation._storage is not None
 
+        # The scanned copy shares the cache of probed devices.
+        probe_cache = self.storage_module.storage.probe_cache
+        assert isinstance(probe_cache, ProbeCache)
+        assert obj.implementation._storage.probe_cache is probe_cache
+
         # Check the side affects.
         storage_changed_callback = Mock()
         self.storage_module.storage_changed.connect(storage_changed_callback)
@@ -1527,7 +1533,8 @@ class StorageTasksTestCase(unittest.TestCase):
         core_run_program.assert_any_call(
                 ['mount', '--rbind', '/mnt/sysimage', '/mnt/sysroot'],
                 stdin=None, stdout=None, root='/', env_prune=None,
-                log_output=True, binary_output=False)
+                log_output=True, binary_output=False, capture_output=False,
+                output_callback=None)
 
     @patch_dbus_get_proxy
     @patch("pyanaconda.modules.storage.installation.conf")
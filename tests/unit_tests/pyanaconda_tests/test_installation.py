@@ -0,0 +1,134 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import threading
+import time
+import unittest
+from unittest.mock import patch, call, Mock
+
+from pyanaconda.installation import RunInstallationTask
+from pyanaconda.installation_tasks import Task, TaskQueue, RESOURCE_CHROOT
+
+
+class RunInstallationTaskTestCase(unittest.TestCase):
+    """Test the RunInstallationTask class."""
+
+    def _create_queue(self):
+        """Create a queue with a nested queue."""
+        queue = TaskQueue("Main queue")
+        nested_queue = TaskQueue("Nested queue")
+        nested_queue.append(Task("Task 1", lambda: None))
+        nested_queue.append(Task("Task 2", lambda: None))
+        queue.append(nested_queue)
+        return queue
+
+    @patch("pyanaconda.installation.BOSS")
+    @patch("pyanaconda.installation.conf")
+    def test_connect_resource_sampler(self, conf, boss):
+        """Test the reporting of the phases and tasks to the Boss."""
+        # The queue runs in the user interface, so the sampler
+        # in the Boss module is updated over DBus.
+        conf.anaconda.resource_sampling_interval = 1
+        boss_proxy = boss.get_proxy.return_value
+
+        queue = self._create_queue()
+        RunInstallationTask._connect_resource_sampler(queue)
+        queue.start()
+
+        assert boss_proxy.mock_calls == [
+            call.SetInstallationPhase("Nested queue"),
+            call.StartInstallationTask("Task 1"),
+            call.FinishInstallationTask("Task 1"),
+            call.StartInstallationTask("Task 2"),
+            call.FinishInstallationTask("Task 2"),
+        ]
+
+    @patch("pyanaconda.installation.BOSS")
+    @patch("pyanaconda.installation.conf")
+    def test_connect_resource_sampler_disabled(self, conf, boss):
+        """Test the reporting with the disabled resource sampling."""
+        conf.anaconda.resource_sampling_interval = 0
+
+        queue = self._create_queue()
+        RunInstallationTask._connect_resource_sampler(queue)
+        queue.start()
+
+        boss.get_proxy.assert_not_called()
+
+    def _mock_module(self, *task_names):
+        """Mock a DBus module with installation tasks."""
+        module_proxy = Mock()
+        module_proxy.InstallWithTasks.return_value = list(task_names)
+        module_proxy.InstallWithTask.return_value = task_names[0]
+
+        def get_proxy(path=None):
+            if path in task_names:
+                return Mock(Name=path)
+
+            return module_proxy
+
+        return Mock(get_proxy=Mock(side_effect=get_proxy))
+
+    @patch("pyanaconda.installation_tasks.sync_run_task")
+    @patch("pyanaconda.installation.is_module_available", return_value=True)
+    @patch("pyanaconda.installation.conf")
+    def test_system_configuration(self, conf, is_module_available, sync_run_task):
+        """Test that tasks running commands in the chroot never overlap."""
+        conf.target.can_configure_network = True
+        modules = {
+            "SECURITY": self._mock_module("Configure authselect"),
+            "TIMEZONE": self._mock_module("Configure timezone", "Configure NTP"),
+            "SERVICES": self._mock_module("Configure services"),
+            "LOCALIZATION": self._mock_module("Configure locale"),
+            "NETWORK": self._mock_module("Configure firewall"),
+        }
+
+        lock = threading.Lock()
+        running = []
+        overlaps = []
+
+        def run_task(task_proxy):
+            with lock:
+                running.append(task_proxy.Name)
+                overlaps.append(len(running) > 1)
+
+            time.sleep(0.05)
+
+            with lock:
+                running.remove(task_proxy.Name)
+
+        sync_run_task.side_effect = run_task
+
+        with patch.multiple("pyanaconda.installation", **modules):
+            queue = RunInstallationTask._prepare_system_configuration()
+
+        assert [task.name for task in queue.items] == [
+            "Configure authselect",
+            "Configure timezone",
+            "Configure NTP",
+            "Configure services",
+            "Configure locale",
+            "Configure firewall",
+        ]
+
+        for task in queue.items:
+            assert queue.get_resources(task) == {RESOURCE_CHROOT}
+
+        queue.start()
+
+        assert sync_run_task.call_count == 6
+        assert not any(overlaps)
@@ -17,10 +17,14 @@
 # subject to the GNU General Public License and may only be used or replicated
 # with the express permission of Red Hat, Inc.
 #
+import threading
 import unittest
+import pytest
 
 from textwrap import dedent
+from unittest.mock import patch, call
 
+from pyanaconda.errors import ERROR_RAISE
 from pyanaconda.installation_tasks import Task
 from pyanaconda.installation_tasks import TaskQueue
 
@@ -261,3 +265,107 @@ class InstallTasksTestCase(unittest.TestCase):
         assert self._task_completed_count == 4
         assert self._queue_started_count == 3
         assert self._queue_completed_count == 3
+
+    def test_task_queue_requirements(self):
+        """Check the requirements and resources of the queue items."""
+        queue = TaskQueue(name="queue")
+        task1 = Task("task 1", self._increment_var1)
+        task2 = Task("task 2", self._increment_var1)
+        task3 = Task("task 3", self._increment_var1)
+        task4 = Task("task 4", self._increment_var1)
+
+        queue.append(task1)
+        queue.append(task2, resources=["A"])
+        queue.append(task3, requires=[task1])
+
+        assert queue.max_workers == 1
+        assert queue.get_requirements(task1) == []
+        assert queue.get_requirements(task2) == [task1]
+        assert queue.get_requirements(task3) == [task1]
+        assert queue.get_resources(task1) == set()
+        assert queue.get_resources(task2) == {"A"}
+
+        with pytest.raises(ValueError):
+            queue.append(task4, requires=[Task("task 5", self._increment_var1)])
+
+    def test_concurrent_task_queue(self):
+        """Check that independent tasks run concurrently."""
+        event = threading.Event()
+        results = []
+
+        def wait_for_event():
+            assert event.wait(timeout=5)
+            results.append("waited")
+
+        def set_event():
+            event.set()
+            results.append("set")
+
+        def check_results():
+            results.append("checked {}".format(len(results)))
+
+        queue = TaskQueue(name="queue", max_workers=2)
+        task1 = Task("wait", wait_for_event)
+        task2 = Task("set", set_event)
+        queue.append(task1, requires=[])
+        queue.append(task2, requires=[])
+        queue.append(Task("check", check_results))
+
+        queue.start()
+        assert results == ["set", "waited", "checked 2"]
+
+    def test_concurrent_task_queue_resources(self):
+        """Check that tasks with the same resource don't overlap."""
+        lock = threading.Lock()
+        active = []
+        overlaps = []
+
+        def run_exclusively():
+            with lock:
+                active.append(1)
+                overlaps.append(len(active))
+
+            threading.Event().wait(0.05)
+
+            with lock:
+                active.pop()
+
+        queue = TaskQueue(name="queue", max_workers=4)
+
+        for i in range(4):
+            queue.append(Task("task {}".format(i), run_exclusively), requires=[], resources=["A"])
+
+        queue.start()
+        assert overlaps == [1, 1, 1, 1]
+
+    @patch("pyanaconda.installation_tasks.errorHandler")
+    def test_concurrent_task_queue_failure(self, error_handler):
+        """Check that a failure in a concurrent queue is raised."""
+        error_handler.cb.return_value = ERROR_RAISE
+
+        def fail():
+            raise RuntimeError("Fake!")
+
+        queue = TaskQueue(name="queue", max_workers=2)
+        task1 = Task("fail", fail)
+        task2 = Task("increment var 1", self._increment_var1)
+        queue.append(task1, requires=[])
+        queue.append(task2, requires=[task1])
+
+        with pytest.raises(RuntimeError):
+            queue.start()
+
+        error_handler.cb.assert_called_once()
+        assert self._test_variable1 == 0
+
+    @patch("pyanaconda.installation_tasks.tracer")
+    def test_task_queue_tracing(self, tracer):
+        """Check that tasks and queues are traced."""
+        queue = TaskQueue(name="queue")
+        queue.append(Task("task", self._increment_var1))
+        queue.start()
+
+        assert tracer.span.call_args_list == [
+            call("queue", "queue", parent=None),
+            call("task", "task", parent="queue"),
+        ]
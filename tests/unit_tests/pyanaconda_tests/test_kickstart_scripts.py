@@ -0,0 +1,139 @@
+#
+# Copyright (C) 2026  Red Hat, Inc.
+#
+# This copyrighted material is made available to anyone wishing to use,
+# modify, copy, or redistribute it subject to the terms and conditions of
+# the GNU General Public License v.2, or (at your option) any later version.
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY expressed or implied, including the implied warranties of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General
+# Public License for more details.  You should have received a copy of the
+# GNU General Public License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301, USA.  Any Red Hat trademarks that are incorporated in the
+# source code or documentation are not subject to the GNU General Public
+# License and may only be used or replicated with the express permission of
+# Red Hat, Inc.
+#
+import os
+import tempfile
+import unittest
+import pytest
+
+from textwrap import dedent
+from unittest.mock import patch
+
+from pykickstart.constants import KS_SCRIPT_PRE
+from pyanaconda.kickstart import AnacondaKSParser, AnacondaKSScript, superclass, \
+    runPreScripts, _group_scripts
+
+
+class KickstartScriptsTestCase(unittest.TestCase):
+    """Test the kickstart scripts."""
+
+    def _parse(self, kickstart):
+        """Parse the kickstart and return its scripts."""
+        handler = superclass()
+        parser = AnacondaKSParser(handler)
+        parser.readKickstartFromString(dedent(kickstart))
+        return handler.scripts
+
+    def _create_script(self, body, parallel=False, **kwargs):
+        """Create a %pre script."""
+        return AnacondaKSScript(body, type=KS_SCRIPT_PRE, parallel=parallel, **kwargs)
+
+    def test_parse_parallel(self):
+        """Test the --parallel option."""
+        scripts = self._parse("""
+        %pre --parallel
+        echo 1
+        %end
+
+        %pre-install --parallel --erroronfail
+        echo 2
+        %end
+
+        %post --nochroot
+        echo 3
+        %end
+        """)
+
+        assert [s.parallel for s in scripts] == [True, True, False]
+        assert scripts[1].errorOnFail is True
+        assert str(scripts[0]) == "\n%pre --parallel\necho 1\n%end\n"
+        assert str(scripts[1]) == "\n%pre-install --erroronfail --parallel\necho 2\n%end\n"
+        assert str(scripts[2]) == "\n%post --nochroot\necho 3\n%end\n"
+
+    def test_group_scripts(self):
+        """Test the groups of scripts."""
+        s1 = self._create_script("1", parallel=True)
+        s2 = self._create_script("2", parallel=True)
+        s3 = self._create_script("3")
+        s4 = self._create_script("4", parallel=True)
+        s5 = self._create_script("5")
+        s6 = self._create_script("6", parallel=True)
+        s7 = self._create_script("7", parallel=True)
+
+        assert _group_scripts([]) == []
+        assert _group_scripts([s1, s2, s3, s4, s5, s6, s7]) == [
+            [s1, s2], [s3], [s4], [s5], [s6, s7]
+        ]
+
+    def test_run_parallel_scripts(self):
+        """Test concurrent scripts."""
+        with tempfile.TemporaryDirectory() as d:
+            # The scripts wait for each other, so they have to run concurrently.
+            body = "touch {d}/{name}; for i in $(seq 100); do " \
+                   "[ -e {d}/{other} ] && echo {name} >> {d}/done && exit 0; " \
+                   "sleep 0.1; done; exit 1"
+
+            scripts = [
+                self._create_script(body.format(d=d, name="a", other="b"), parallel=True),
+                self._create_script(body.format(d=d, name="b", other="a"), parallel=True),
+                self._create_script("echo c >> {}/done".format(d)),
+            ]
+
+            runPreScripts(scripts)
+
+            with open(os.path.join(d, "done")) as f:
+                lines = f.read().split()
+
+            assert sorted(lines[:2]) == ["a", "b"]
+            assert lines[2] == "c"
+
+    @patch("pyanaconda.kickstart.util.ipmi_report")
+    @patch("pyanaconda.kickstart.errorHandler")
+    def test_run_parallel_scripts_error_on_fail(self, error_handler, ipmi_report):
+        """Test concurrent scripts with --erroronfail."""
+        with tempfile.TemporaryDirectory() as d:
+            scripts = [
+                self._create_script("exit 1", parallel=True, errorOnFail=True),
+                self._create_script("sleep 0.5; touch {}/b".format(d), parallel=True),
+                self._create_script("touch {}/c".format(d)),
+            ]
+
+            with pytest.raises(SystemExit):
+                runPreScripts(scripts)
+
+            # The group is finished, but the next script is not started.
+            assert os.path.exists(os.path.join(d, "b"))
+            assert not os.path.exists(os.path.join(d, "c"))
+
+        error_handler.cb.assert_called_once()
+
+    @patch("pyanaconda.kickstart.util.ipmi_report")
+    @patch("pyanaconda.kickstart.errorHandler")
+    def test_run_parallel_scripts_multiple_errors(self, error_handler, ipmi_report):
+        """Test concurrent scripts with multiple fatal errors."""
+        scripts = [
+            self._create_script("exit 1", parallel=True, errorOnFail=True),
+            self._create_script("exit 2", parallel=True, errorOnFail=True),
+            self._create_script("exit 3", parallel=True, errorOnFail=True),
+        ]
+
+        with pytest.raises(SystemExit):
+            runPreScripts(scripts)
+
+        # Only the first error is reported.
+        error_handler.cb.assert_called_once()
+        ipmi_report.assert_called_once()